@@ -1,11 +1,89 @@
 import numpy
-from typing import Iterable, Optional, Union, Dict
+from typing import Iterable, Optional, Union, Dict, Type
 from copy import deepcopy
 
 from amulet.api.partial_3d_array import UnboundedPartial3DArray
+from amulet.api.partial_3d_array.data_types import Integer, IntegerType
+
+
+def _compact_dtype(max_value: int) -> Type[numpy.unsignedinteger]:
+    """Get the smallest unsigned dtype that can store all values up to max_value."""
+    if max_value <= 0xFF:
+        return numpy.uint8
+    elif max_value <= 0xFFFF:
+        return numpy.uint16
+    return numpy.uint32
+
+
+def _required_dtype(value) -> Type[numpy.unsignedinteger]:
+    """Get the smallest unsigned dtype that can store the given value or array without changing it."""
+    if isinstance(value, Integer):
+        value = int(value)
+        return _compact_dtype(value) if value >= 0 else numpy.uint32
+    value = numpy.asarray(value)
+    if not value.size:
+        return numpy.uint8
+    if value.dtype.kind != "u" and value.min() < 0:
+        return numpy.uint32
+    return _compact_dtype(int(value.max()))
+
+
+def uniform_sub_chunk(value: int) -> numpy.ndarray:
+    """
+    Create a sub-chunk array where every block has the same value.
+
+    Only the single value is stored. The array is a read only view that repeats it.
+
+    :param value: The value of every block in the sub-chunk.
+    :return: A read only (16, 16, 16) numpy array.
+    """
+    value = int(value)
+    return numpy.broadcast_to(_required_dtype(value)(value), (16, 16, 16))
+
+
+def is_uniform_sub_chunk(sub_chunk: numpy.ndarray) -> bool:
+    """
+    Check if a sub-chunk array was created by :func:`uniform_sub_chunk`.
+
+    This only checks how the array is stored. It does not check the values in the array.
+
+    :param sub_chunk: The sub-chunk array to check.
+    :return: True if every entry in the array views the same value.
+    """
+    return sub_chunk.size > 0 and not any(sub_chunk.strides)
+
+
+def remap_sub_chunk(lut: numpy.ndarray, sub_chunk: numpy.ndarray) -> numpy.ndarray:
+    """
+    Look up every value in a sub-chunk array in a lookup table.
+
+    This is equivalent to ``lut[sub_chunk]`` except uniform sub-chunks stay uniform.
+
+    :param lut: The lookup table.
+    :param sub_chunk: The sub-chunk array of indexes into the lookup table.
+    :return: The remapped sub-chunk array.
+    """
+    if is_uniform_sub_chunk(sub_chunk):
+        return uniform_sub_chunk(lut[sub_chunk[0, 0, 0]])
+    return lut[sub_chunk]
 
 
 class Blocks(UnboundedPartial3DArray):
+    """
+    The block array for a chunk.
+
+    To save memory the sub-chunk arrays are stored in the smallest unsigned dtype that can store their largest value.
+    Most sub-chunks only use the first 256 palette indexes so use a quarter of the memory of a uint32 array.
+    This is transparent to users of the class. The values read are always the same as if they were stored as uint32.
+    Writing a larger value through the indexing methods automatically promotes the sub-chunk to a larger dtype.
+    :meth:`get_sub_chunk` always returns a uint32 array because the caller may write any value to it.
+    Use :meth:`get_compact_sub_chunk` to read the sub-chunk without promoting it
+    and :meth:`get_writable_sub_chunk` to write to it while keeping it compact.
+
+    Sub-chunks where every block is the same, such as all air or all stone, only store that one value.
+    See :func:`uniform_sub_chunk`. The full array is only created when the sub-chunk is written to.
+    """
+
     def __init__(
         self,
         input_array: Optional[Union[Dict[int, numpy.ndarray], "Blocks"]] = None,
@@ -13,10 +91,58 @@ class Blocks(UnboundedPartial3DArray):
         if input_array is None:
             input_array = {}
         if isinstance(input_array, Blocks):
-            input_array: dict = deepcopy(input_array._sections)
+            input_array: dict = input_array._copy_sections()
         if not isinstance(input_array, dict):
             raise Exception(f"Input array must be Blocks or dict, got {input_array}")
-        super().__init__(numpy.uint32, 0, (16, 16, 16), (0, 16), sections=input_array)
+        super().__init__(numpy.uint32, 0, (16, 16, 16), (0, 16))
+        for cy, sub_chunk in input_array.items():
+            if not isinstance(cy, int):
+                raise ValueError("All keys must be ints")
+            self.add_sub_chunk(cy, sub_chunk)
+
+    def _copy_sections(self) -> Dict[int, numpy.ndarray]:
+        # Uniform sections are read only so they can be shared.
+        # Copying them with numpy would create the full array.
+        return {
+            cy: section if is_uniform_sub_chunk(section) else section.copy()
+            for cy, section in self._sections.items()
+        }
+
+    def __deepcopy__(self, memodict=None):
+        if memodict is None:
+            memodict = {}
+        cls = self.__class__
+        result = cls.__new__(cls)
+        memodict[id(self)] = result
+        for k, v in self.__dict__.items():
+            if k == "_sections":
+                v = self._copy_sections()
+            else:
+                v = deepcopy(v, memodict)
+            setattr(result, k, v)
+        return result
+
+    def to_raw(self) -> Dict[int, Union[int, numpy.ndarray]]:
+        """Don't use this method. Use to pickle data."""
+        return {
+            cy: (int(section[0, 0, 0]) if is_uniform_sub_chunk(section) else section)
+            for cy, section in self._sections.items()
+        }
+
+    @classmethod
+    def from_raw(cls, sections: Dict[int, Union[int, numpy.ndarray]]) -> "Blocks":
+        """Don't use this method. Use to unpickle data."""
+        blocks = cls()
+        for cy, section in sections.items():
+            if isinstance(section, int):
+                section = uniform_sub_chunk(section)
+            # Compact sections that were promoted before they were pickled.
+            blocks.add_section(cy, section)
+        return blocks
+
+    def __reduce__(self):
+        # numpy would pickle the full array for uniform sections.
+        return self.from_raw, (self.to_raw(),)
 
     @property
     def sub_chunks(self) -> Iterable[int]:
@@ -32,15 +158,81 @@ class Blocks(UnboundedPartial3DArray):
 
     def get_sub_chunk(self, cy: int) -> numpy.ndarray:
         """Get the section ndarray for a given section index.
+        The stored array is promoted to uint32 so that any value can be written to it.
+        Use :meth:`get_compact_sub_chunk` if the array is only read.
+        :param cy: The section y index
+        :return: Numpy array for this section
+        """
+        section = self.get_compact_sub_chunk(cy)
+        if section.dtype != self._dtype or not section.flags.writeable:
+            section = self._sections[cy] = section.astype(self._dtype)
+        return section
+
+    def get_compact_sub_chunk(self, cy: int) -> numpy.ndarray:
+        """Get the section ndarray for a given section index in the dtype it is stored in.
+        This may be uint8, uint16 or uint32. It must not be modified. Use :meth:`get_sub_chunk` to modify the array.
+        If every block in the sub-chunk is the same this is a read only :func:`uniform_sub_chunk` array.
+        :param cy: The section y index
+        :return: Numpy array for this section
+        """
+        if cy not in self._sections:
+            self.create_section(cy)
+        return self._sections[cy]
+
+    def get_writable_sub_chunk(self, cy: int, value) -> numpy.ndarray:
+        """Get the section ndarray for a given section index so that the given value can be written to it.
+        The stored array is only promoted as far as needed to store the value so it may be uint8, uint16 or uint32.
+        Unlike :meth:`get_sub_chunk` this keeps the array compact when the written values are small.
         :param cy: The section y index
+        :param value: The value or array of values that will be written to the array
         :return: Numpy array for this section
         """
-        return self.get_section(cy)
+        return self._get_writable_section(cy, value)
 
     def add_sub_chunk(self, cy: int, sub_chunk: numpy.ndarray):
         """Add a sub-chunk. Overwrite if already exists
+        The array is stored in the smallest dtype that can store its values so it may be copied.
+        If every value in the array is the same only that value is stored.
         :param cy: The section y index
         :param sub_chunk: The Numpy array to add at this location
         :return:
         """
         self.add_section(cy, sub_chunk)
+
+    def create_section(self, sy: IntegerType):
+        self._sections[int(sy)] = uniform_sub_chunk(self.default_value)
+
+    def add_section(self, sy: IntegerType, section: numpy.ndarray):
+        if section.shape != self._section_shape:
+            raise ValueError(
+                f"The size of all sections must be equal to the section_shape. Expected shape {self._section_shape}, got {section.shape}"
+            )
+        if section.dtype.kind != "u":
+            section = section.astype(self._dtype)
+        if is_uniform_sub_chunk(section):
+            section = uniform_sub_chunk(section[0, 0, 0])
+        else:
+            max_value = int(section.max())
+            if max_value == section.min():
+                section = uniform_sub_chunk(max_value)
+            else:
+                dtype = _compact_dtype(max_value)
+                if section.dtype != dtype:
+                    section = section.astype(dtype)
+        self._sections[int(sy)] = section
+
+    def get_section(self, sy: Union[int, numpy.integer]) -> numpy.ndarray:
+        # The uint32 copy is not stored so reading does not undo the compaction.
+        # Changes to the returned array are only stored if the section is already uint32.
+        section = super().get_section(sy)
+        if section.dtype != self._dtype or not section.flags.writeable:
+            section = section.astype(self._dtype)
+        return section
+
+    def _get_writable_section(self, sy: IntegerType, value) -> numpy.ndarray:
+        section = self.get_compact_sub_chunk(int(sy))
+        dtype = numpy.promote_types(section.dtype, _required_dtype(value))
+        if section.dtype != dtype or not section.flags.writeable:
+            # This also creates the full array for uniform sections.
+            section = self._sections[int(sy)] = section.astype(dtype)
+        return section
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Union, Iterable, Dict
+from typing import Union, Iterable, Dict, Callable, Optional
 import time
 import numpy
 import pickle
@@ -16,6 +16,7 @@ from amulet.api.chunk import (
     BlockEntityDict,
     EntityList,
 )
+from amulet.api.chunk.blocks import remap_sub_chunk
 from amulet.api.entity import Entity
 from amulet.api.data_types import ChunkCoordinates, VersionIdentifierType
 from amulet.api.history.changeable import Changeable
@@ -50,6 +51,33 @@ class Chunk(Changeable):
         self._native_version: VersionIdentifierType = ("java", 0)
         self._native_entities = EntityList()
 
+        # A function that translates a lazily loaded chunk to the universal format.
+        # It is run the first time the blocks, biomes or entities are accessed.
+        self._lazy_translate: Optional[Callable[[Chunk], None]] = None
+
+    def __getstate__(self):
+        # The translate function cannot be pickled so the chunk is translated first.
+        self._translate_lazy()
+        return self.__dict__
+
+    @property
+    def is_lazy(self) -> bool:
+        """
+        Has the chunk been loaded lazily and not yet translated to the universal format.
+
+        The status and misc data of a lazy chunk can be read without translating it.
+        The chunk is translated the first time the blocks, biomes or entities are accessed.
+        """
+        return self._lazy_translate is not None
+
+    def _translate_lazy(self):
+        """Translate a lazily loaded chunk to the universal format. Does nothing if the chunk is already translated."""
+        translate = self._lazy_translate
+        if translate is not None:
+            # The translation accesses the blocks so clear this first.
+            self._lazy_translate = None
+            translate(self)
+
     def __repr__(self):
         return f"Chunk({self.cx}, {self.cz}, {repr(self._blocks)}, {repr(self._entities)}, {repr(self._block_entities)})"
 
@@ -59,11 +87,12 @@ class Chunk(Changeable):
 
         :return: Pickled output.
         """
+        self._translate_lazy()
         chunk_data = (
             self._cx,
             self._cz,
             self._changed_time,
-            {sy: self.blocks.get_sub_chunk(sy) for sy in self.blocks.sub_chunks},
+            self.blocks.to_raw(),
             self.biomes.to_raw(),
             self._entities.data,
             tuple(self._block_entities.data.values()),
@@ -92,7 +121,7 @@ class Chunk(Changeable):
         chunk_data = pickle.loads(pickled_bytes)
         self = cls(*chunk_data[:2])
         (
-            self.blocks,
+            blocks,
             biomes,
             self.entities,
             self.block_entities,
@@ -102,6 +131,7 @@ class Chunk(Changeable):
             self._native_version,
         ) = chunk_data[3:]
 
+        self._blocks = Blocks.from_raw(blocks)
         self._biomes = Biomes.from_raw(*biomes)
 
         self._changed_time = chunk_data[2]
@@ -164,15 +194,14 @@ class Chunk(Changeable):
 
         The values in the arrays are indexes into :attr:`block_palette`.
         """
+        self._translate_lazy()
         if self._blocks is None:
             self._blocks = Blocks()
         return self._blocks
 
     @blocks.setter
     def blocks(self, value: Union[Dict[int, numpy.ndarray], Blocks, None]):
-        if isinstance(value, dict):
-            value: Dict[int, numpy.ndarray]
-            value = {k: v.astype(numpy.uint32) for k, v in value.items()}
+        self._translate_lazy()
         self._blocks = Blocks(value)
 
     def get_block(self, dx: int, y: int, dz: int) -> Block:
@@ -201,6 +230,7 @@ class Chunk(Changeable):
     def _block_palette(self) -> BlockManager:
         """The block block_palette for the chunk.
         Usually will refer to a global block block_palette."""
+        self._translate_lazy()
         return self.__block_palette
 
     @_block_palette.setter
@@ -210,6 +240,7 @@ class Chunk(Changeable):
         Only use this if you know what you are doing.
         Designed for internal use. You probably want to use Chunk.block_palette"""
         assert isinstance(new_block_palette, BlockManager)
+        self._translate_lazy()
         self.__block_palette = new_block_palette
 
     @property
@@ -242,7 +273,10 @@ class Chunk(Changeable):
                 )
                 for cy in self.blocks.sub_chunks:
                     self.blocks.add_sub_chunk(
-                        cy, block_lut[self.blocks.get_sub_chunk(cy)]
+                        cy,
+                        remap_sub_chunk(
+                            block_lut, self.blocks.get_compact_sub_chunk(cy)
+                        ),
                     )
 
             self.__block_palette = new_block_palette
@@ -256,12 +290,14 @@ class Chunk(Changeable):
 
         The values in the arrays are indexes into :attr:`biome_palette`.
         """
+        self._translate_lazy()
         if self._biomes is None:
             self._biomes = Biomes()
         return self._biomes
 
     @biomes.setter
     def biomes(self, value: Union[Biomes, Dict[int, numpy.ndarray]]):
+        self._translate_lazy()
         self._biomes = Biomes(value)
 
     @property
@@ -271,6 +307,7 @@ class Chunk(Changeable):
 
         Usually will refer to a global biome_palette.
         """
+        self._translate_lazy()
         return self.__biome_palette
 
     @_biome_palette.setter
@@ -285,6 +322,7 @@ class Chunk(Changeable):
         Designed for internal use. You probably want to use Chunk.biome_palette
         """
         assert isinstance(new_biome_palette, BiomeManager)
+        self._translate_lazy()
         self.__biome_palette = new_biome_palette
 
     @property
@@ -332,6 +370,7 @@ class Chunk(Changeable):
 
         :return: A list of all the entities contained in the chunk
         """
+        self._translate_lazy()
         return self._entities
 
     @entities.setter
@@ -341,6 +380,7 @@ class Chunk(Changeable):
         :type value: list
         :return:
         """
+        self._translate_lazy()
         if self._entities != value:
             self._entities = EntityList(value)
 
@@ -351,6 +391,7 @@ class Chunk(Changeable):
 
         :return: A list of all the block entities contained in the chunk
         """
+        self._translate_lazy()
         return self._block_entities
 
     @block_entities.setter
@@ -360,6 +401,7 @@ class Chunk(Changeable):
         :type value: list
         :return:
         """
+        self._translate_lazy()
         if self._block_entities != value:
             self._block_entities = BlockEntityDict(value)
 
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
 import time
-from typing import Union, Generator, Optional, Tuple, Callable, Set, Iterable
+from typing import (
+    Union,
+    Generator,
+    Optional,
+    Tuple,
+    Callable,
+    Set,
+    Iterable,
+    AsyncIterator,
+    Dict,
+)
 import traceback
 import numpy
 import itertools
@@ -9,6 +19,9 @@ import warnings
 import logging
 import copy
 import os
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from amulet.api.block import Block, UniversalAirBlock
 from amulet.api.block_entity import BlockEntity
@@ -82,6 +95,14 @@ class BaseLevel:
         self.history_manager.register(self._chunks, True)
         self.history_manager.register(self._players, True)
 
+        # The executor used by the async methods. Created when first needed.
+        self._async_executor: Optional[ThreadPoolExecutor] = None
+        self._async_max_workers = 4
+        # The chunks currently being loaded by the async methods
+        self._async_loads: Dict[
+            Tuple[asyncio.AbstractEventLoop, Dimension, int, int], asyncio.Future
+        ] = {}
+
     def __del__(self):
         self.close()
 
@@ -252,6 +273,65 @@ class BaseLevel:
             else:
                 yield chunk, box
 
+    async def aget_chunk_boxes(
+        self,
+        dimension: Dimension,
+        selection: Union[SelectionGroup, SelectionBox, None] = None,
+        create_missing_chunks=False,
+    ) -> AsyncIterator[Tuple[Chunk, SelectionBox]]:
+        """
+        The async version of :meth:`get_chunk_boxes`.
+
+        The chunks are loaded on the async executor ahead of when they are needed
+        and are yielded in the same order as :meth:`get_chunk_boxes`.
+
+        >>> async for chunk, box in level.aget_chunk_boxes(dimension, selection):
+        >>>     ...
+
+        :param dimension: The dimension to take effect in.
+        :param selection: SelectionGroup or SelectionBox into the level. If None will use :meth:`bounds` for the dimension.
+        :param create_missing_chunks: If a chunk does not exist an empty one will be created (defaults to false). Use this with care.
+        """
+        loop = asyncio.get_running_loop()
+        coord_boxes = await loop.run_in_executor(
+            self._get_async_executor(),
+            lambda: list(
+                self.get_coord_box(dimension, selection, create_missing_chunks)
+            ),
+        )
+        # the chunks being loaded ahead of the one being yielded
+        pending: deque[Tuple[ChunkCoordinates, SelectionBox, asyncio.Future]] = deque()
+        coord_box_iter = iter(coord_boxes)
+        try:
+            while True:
+                while len(pending) < self._async_max_workers * 2:
+                    try:
+                        (cx, cz), box = next(coord_box_iter)
+                    except StopIteration:
+                        break
+                    pending.append(
+                        (
+                            (cx, cz),
+                            box,
+                            asyncio.ensure_future(self.aget_chunk(cx, cz, dimension)),
+                        )
+                    )
+                if not pending:
+                    break
+                (cx, cz), box, future = pending.popleft()
+                try:
+                    chunk = await future
+                except ChunkDoesNotExist:
+                    if create_missing_chunks:
+                        yield self.create_chunk(cx, cz, dimension), box
+                except ChunkLoadError:
+                    log.error(f"Error loading chunk\n{traceback.format_exc()}")
+                else:
+                    yield chunk, box
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
     def get_chunk_slice_box(
         self,
         dimension: Dimension,
@@ -449,58 +529,90 @@ class BaseLevel:
 
         output_dimension_map = wrapper.dimensions
 
-        # perhaps make this check if the directory is the same rather than if the class is the same
-        save_as = wrapper is not self.level_wrapper
-        if save_as:
-            # The input wrapper is not the same as the loading wrapper (save-as)
-            # iterate through every chunk in the input level and save them to the wrapper
-            log.info(
-                f"Converting level {self.level_wrapper.path} to level {wrapper.path}"
-            )
-            wrapper.translation_manager = (
-                self.level_wrapper.translation_manager
-            )  # TODO: this might cause issues in the future
-            for dimension in self.level_wrapper.dimensions:
-                chunk_count += len(list(self.level_wrapper.all_chunk_coords(dimension)))
-
-            for dimension in self.level_wrapper.dimensions:
-                try:
-                    if dimension not in output_dimension_map:
+        with wrapper.batch_write():
+            # perhaps make this check if the directory is the same rather than if the class is the same
+            save_as = wrapper is not self.level_wrapper
+            if save_as:
+                # The input wrapper is not the same as the loading wrapper (save-as)
+                # iterate through every chunk in the input level and save them to the wrapper
+                log.info(
+                    f"Converting level {self.level_wrapper.path} to level {wrapper.path}"
+                )
+                wrapper.translation_manager = (
+                    self.level_wrapper.translation_manager
+                )  # TODO: this might cause issues in the future
+                for dimension in self.level_wrapper.dimensions:
+                    chunk_count += len(
+                        list(self.level_wrapper.all_chunk_coords(dimension))
+                    )
+
+                # If the formats are compatible the unmodified chunks can be copied without being decoded.
+                # The modified chunks are saved below.
+                copy_compressed = self.level_wrapper.can_copy_compressed_chunks(wrapper)
+                changed_chunk_set = set(changed_chunks)
+
+                for dimension in self.level_wrapper.dimensions:
+                    try:
+                        if dimension not in output_dimension_map:
+                            continue
+                        for cx, cz in self.level_wrapper.all_chunk_coords(dimension):
+                            try:
+                                # Chunks that are not fully generated are never saved to the new level.
+                                if not copy_compressed:
+                                    # The chunk is loaded lazily so reading the status does not translate it.
+                                    chunk = self.level_wrapper.load_chunk(
+                                        cx, cz, dimension, lazy=True
+                                    )
+                                    if (
+                                        chunk.status.as_type(StatusFormats.Java_14)
+                                        == "full"
+                                    ):
+                                        log.info(
+                                            f"Converting chunk {dimension} {cx}, {cz}"
+                                        )
+                                        wrapper.commit_chunk(chunk, dimension)
+                                elif (dimension, cx, cz) not in changed_chunk_set:
+                                    # The status is read without decoding the chunk.
+                                    status = self.level_wrapper.get_chunk_status(
+                                        cx, cz, dimension
+                                    )
+                                    if status.as_type(StatusFormats.Java_14) == "full":
+                                        log.info(
+                                            f"Copying chunk {dimension} {cx}, {cz}"
+                                        )
+                                        self.level_wrapper.copy_compressed_chunk(
+                                            cx, cz, dimension, wrapper
+                                        )
+                            except ChunkLoadError:
+                                log.info(
+                                    f"Error loading chunk {cx} {cz}", exc_info=True
+                                )
+                            chunk_index += 1
+                            yield chunk_index, chunk_count
+                            if not chunk_index % 10000:
+                                wrapper.save()
+                                self.level_wrapper.unload()
+                                wrapper.unload()
+                    except DimensionDoesNotExist:
                         continue
-                    for cx, cz in self.level_wrapper.all_chunk_coords(dimension):
-                        log.info(f"Converting chunk {dimension} {cx}, {cz}")
-                        try:
-                            chunk = self.level_wrapper.load_chunk(cx, cz, dimension)
-                            if chunk.status.as_type(StatusFormats.Java_14) == "full":
-                                wrapper.commit_chunk(chunk, dimension)
-                        except ChunkLoadError:
-                            log.info(f"Error loading chunk {cx} {cz}", exc_info=True)
-                        chunk_index += 1
-                        yield chunk_index, chunk_count
-                        if not chunk_index % 10000:
-                            wrapper.save()
-                            self.level_wrapper.unload()
-                            wrapper.unload()
-                except DimensionDoesNotExist:
-                    continue
 
-        for dimension, cx, cz in changed_chunks:
-            if dimension not in output_dimension_map:
-                continue
-            try:
-                chunk = self.get_chunk(cx, cz, dimension)
-            except ChunkDoesNotExist:
-                wrapper.delete_chunk(cx, cz, dimension)
-            except ChunkLoadError:
-                pass
-            else:
-                wrapper.commit_chunk(chunk, dimension)
-                chunk.changed = False
-            chunk_index += 1
-            yield chunk_index, chunk_count
-            if not chunk_index % 10000:
-                wrapper.save()
-                wrapper.unload()
+            for dimension, cx, cz in changed_chunks:
+                if dimension not in output_dimension_map:
+                    continue
+                try:
+                    chunk = self.get_chunk(cx, cz, dimension)
+                except ChunkDoesNotExist:
+                    wrapper.delete_chunk(cx, cz, dimension)
+                except ChunkLoadError:
+                    pass
+                else:
+                    wrapper.commit_chunk(chunk, dimension)
+                    chunk.changed = False
+                chunk_index += 1
+                yield chunk_index, chunk_count
+                if not chunk_index % 10000:
+                    wrapper.save()
+                    wrapper.unload()
 
         self.history_manager.mark_saved()
         log.info(f"Saving changes to level {wrapper.path}")
@@ -522,6 +634,9 @@ class BaseLevel:
 
         Use changed method to check if there are any changes that should be saved before closing.
         """
+        if self._async_executor is not None:
+            self._async_executor.shutdown(wait=True)
+            self._async_executor = None
         self.level_wrapper.close()
         self._history_db.close(compact=False)
 
@@ -581,6 +696,60 @@ class BaseLevel:
         """
         return self._chunks.get_chunk(dimension, cx, cz)
 
+    @property
+    def async_max_workers(self) -> int:
+        """
+        The maximum number of threads the async methods use to load chunks. Defaults to 4.
+        """
+        return self._async_max_workers
+
+    @async_max_workers.setter
+    def async_max_workers(self, max_workers: int):
+        if max_workers < 1:
+            raise ValueError("async_max_workers must be at least 1")
+        self._async_max_workers = max_workers
+        if self._async_executor is not None:
+            # the running jobs will still finish
+            self._async_executor.shutdown(wait=False)
+            self._async_executor = None
+
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        if self._async_executor is None:
+            self._async_executor = ThreadPoolExecutor(
+                self._async_max_workers, thread_name_prefix="amulet"
+            )
+        return self._async_executor
+
+    async def aget_chunk(self, cx: int, cz: int, dimension: Dimension) -> Chunk:
+        """
+        The async version of :meth:`get_chunk`.
+
+        The chunk is loaded on a thread pool so that the event loop is not blocked.
+        The number of threads is set by :attr:`async_max_workers`.
+        Concurrent requests for the same chunk share one load.
+
+        >>> chunk = await level.aget_chunk(cx, cz, dimension)
+
+        :param cx: The X coordinate of the desired chunk
+        :param cz: The Z coordinate of the desired chunk
+        :param dimension: The dimension to get the chunk from
+        :return: A Chunk object containing the data for the chunk
+        :raises:
+            :class:`~amulet.api.errors.ChunkDoesNotExist`: If the chunk does not exist (was deleted or never created)
+
+            :class:`~amulet.api.errors.ChunkLoadError`: If the chunk was not able to be loaded. Eg. If the chunk is corrupt or some error occurred when loading.
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, dimension, cx, cz)
+        future = self._async_loads.get(key)
+        if future is None:
+            future = self._async_loads[key] = loop.run_in_executor(
+                self._get_async_executor(), self.get_chunk, cx, cz, dimension
+            )
+            future.add_done_callback(lambda _: self._async_loads.pop(key, None))
+        # cancelling one request must not cancel the load shared by the others
+        return await asyncio.shield(future)
+
     def create_chunk(self, cx: int, cz: int, dimension: Dimension) -> Chunk:
         """
         Create an empty chunk and put it at the given location.
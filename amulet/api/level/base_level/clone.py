@@ -190,9 +190,11 @@ def clone(
                                         and src_cy in src_chunk.blocks
                                     ):
                                         # TODO implement support for individual block rotation
-                                        block_ids = src_chunk.blocks.get_sub_chunk(
-                                            src_cy
-                                        )[tuple(src_blocks.T % 16)]
+                                        block_ids = (
+                                            src_chunk.blocks.get_compact_sub_chunk(
+                                                src_cy
+                                            )[tuple(src_blocks.T % 16)]
+                                        )
 
                                         for block_id in numpy.unique(block_ids):
                                             block = src_chunk.block_palette[block_id]
@@ -204,11 +206,14 @@ def clone(
                                                     block, transform
                                                 )
 
-                                                dst_chunk.blocks.get_sub_chunk(dst_cy)[
-                                                    tuple(dst_blocks_.T % 16)
-                                                ] = dst_chunk.block_palette.get_add_block(
+                                                dst_block_id = dst_chunk.block_palette.get_add_block(
                                                     transformed_block
                                                 )
+                                                dst_chunk.blocks.get_writable_sub_chunk(
+                                                    dst_cy, dst_block_id
+                                                )[
+                                                    tuple(dst_blocks_.T % 16)
+                                                ] = dst_block_id
 
                                                 src_blocks_ = src_blocks[mask]
                                                 for src_location, dst_location in zip(
@@ -242,11 +247,12 @@ def clone(
 
                                                 dst_chunk.changed = True
                                     elif UniversalAirBlock not in blocks_to_skip:
-                                        dst_chunk.blocks.get_sub_chunk(dst_cy)[
-                                            tuple(dst_blocks.T % 16)
-                                        ] = dst_chunk.block_palette.get_add_block(
+                                        air_id = dst_chunk.block_palette.get_add_block(
                                             UniversalAirBlock
                                         )
+                                        dst_chunk.blocks.get_writable_sub_chunk(
+                                            dst_cy, air_id
+                                        )[tuple(dst_blocks.T % 16)] = air_id
                                         for location in dst_blocks:
                                             location = tuple(location.tolist())
                                             if location in dst_chunk.block_entities:
@@ -87,7 +87,7 @@ class VoidFormatWrapper(FormatWrapper[VersionNumberTuple]):
         pass
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(self, dimension: Dimension) -> Iterable[ChunkCoordinates]:
         yield from ()
@@ -354,7 +354,8 @@ class BoundedPartial3DArray(BasePartial3DArray):
                                 )
                             )
                 if out:
-                    return numpy.concatenate(out)
+                    # the sections may be stored in different dtypes
+                    return numpy.concatenate(out).astype(self.dtype, copy=False)
                 else:
                     return numpy.full(0, self.default_value, self.dtype)
             elif numpy.issubdtype(item.dtype, numpy.integer):
@@ -420,11 +421,10 @@ class BoundedPartial3DArray(BasePartial3DArray):
                     and numpy.issubdtype(self.dtype, numpy.integer)
                 ) or (isinstance(value, bool) and self.dtype == bool):
                     for sy, slices, _ in self._iter_slices(stacked_slices):
-                        if sy in self._sections:
-                            self._sections[sy][slices] = value
-                        elif value != self.default_value:
-                            self._parent_array.create_section(sy)
-                            self._sections[sy][slices] = value
+                        if sy in self._sections or value != self.default_value:
+                            self._parent_array._get_writable_section(sy, value)[
+                                slices
+                            ] = value
                 elif (
                     isinstance(value, (numpy.ndarray, BoundedPartial3DArray))
                     and (
@@ -444,11 +444,10 @@ class BoundedPartial3DArray(BasePartial3DArray):
                     for sy, slices, relative_slices in size_array._iter_slices(
                         stacked_slices
                     ):
-                        if sy not in self._sections:
-                            self._parent_array.create_section(sy)
-                        self._sections[sy][slices] = numpy.asarray(
-                            value[relative_slices]
-                        )
+                        sub_value = numpy.asarray(value[relative_slices])
+                        self._parent_array._get_writable_section(sy, sub_value)[
+                            slices
+                        ] = sub_value
                 else:
                     raise ValueError(f"Bad value {value}")
 
@@ -465,11 +464,12 @@ class BoundedPartial3DArray(BasePartial3DArray):
                         self.slices_tuple
                     ):
                         bool_array = numpy.asarray(item[relative_slices])
-                        if sy in self._sections:
-                            self._sections[sy][slices][bool_array] = value
-                        elif value != self.default_value and numpy.any(bool_array):
-                            self._parent_array.create_section(sy)
-                            self._sections[sy][slices][bool_array] = value
+                        if sy in self._sections or (
+                            value != self.default_value and numpy.any(bool_array)
+                        ):
+                            self._parent_array._get_writable_section(sy, value)[slices][
+                                bool_array
+                            ] = value
                 elif isinstance(value, numpy.ndarray):
                     start = 0
                     true_count = numpy.count_nonzero(item)
@@ -487,8 +487,6 @@ class BoundedPartial3DArray(BasePartial3DArray):
                             (_, slices_y, slices_z),
                             (_, relative_slices_y, relative_slices_z),
                         ) in self._iter_slices(self.slices_tuple):
-                            if sy not in self._sections:
-                                self._parent_array.create_section(sy)
                             bool_array = numpy.asarray(
                                 item[
                                     relative_slices_x,
@@ -497,9 +495,10 @@ class BoundedPartial3DArray(BasePartial3DArray):
                                 ]
                             )
                             count: int = numpy.count_nonzero(bool_array)
-                            self._sections[sy][slices_x, slices_y, slices_z][
-                                bool_array
-                            ] = value[start : start + count]
+                            sub_value = value[start : start + count]
+                            self._parent_array._get_writable_section(sy, sub_value)[
+                                slices_x, slices_y, slices_z
+                            ][bool_array] = sub_value
                             start += count
                 else:
                     raise ValueError(
@@ -110,6 +110,21 @@ class UnboundedPartial3DArray(BasePartial3DArray):
             self.create_section(int(sy))
         return self._sections[sy]
 
+    def _get_writable_section(
+        self, sy: IntegerType, value: Union[int, numpy.integer, numpy.ndarray]
+    ) -> numpy.ndarray:
+        """
+        Get the section array that the value is going to be written to.
+
+        If the section is not defined it will be populated using :meth:`create_section`.
+        Subclasses may replace the section array with one that can store the value.
+
+        :param sy: The section index to get.
+        :param value: The value or array of values that will be written to the section.
+        :return: Numpy array for this section
+        """
+        return self.get_section(sy)
+
     def __setitem__(
         self,
         slices: Tuple[
@@ -136,7 +151,7 @@ class UnboundedPartial3DArray(BasePartial3DArray):
         """
         if isinstance(value, Integer) and all(isinstance(s, Integer) for s in slices):
             sy, dy = self._section_index(slices[1])
-            self.get_section(sy)[(slices[0], dy, slices[2])] = value
+            self._get_writable_section(sy, value)[(slices[0], dy, slices[2])] = value
         else:
             self[slices][:, :, :] = value
 
@@ -63,6 +63,16 @@ class Interface(ABC):
     def decode(self, *args, **kwargs) -> Tuple["Chunk", AnyNDArray]:
         raise NotImplementedError
 
+    def decode_status(self, data: Any) -> Optional[Union[float, int, str]]:
+        """
+        Read the generation status of a chunk without decoding the rest of the chunk.
+        The data is not modified.
+
+        :param data: The raw chunk data.
+        :return: The status value to set in :attr:`Chunk.status` or None if the chunk must be decoded to find it.
+        """
+        return None
+
     def _decode_entity(
         self,
         nbt: NamedTag,
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from typing import Tuple, Optional, NamedTuple, Hashable, Dict, Set
+import os
+import pickle
+import atexit
+import logging
+
+import PyMCTranslate
+
+import amulet
+from amulet.api.block import Block
+from amulet.utils.lru_cache import LRUCache
+from amulet.api.data_types import (
+    TranslateBlockCallback,
+    TranslateBlockCallbackReturn,
+    GetBlockCallback,
+    BlockCoordinates,
+)
+
+log = logging.getLogger(__name__)
+
+# The direction, the translator key and the input block.
+TranslationCacheKey = Tuple[str, Hashable, Block]
+# The direction and the translator key.
+PersistentCacheKey = Tuple[str, Hashable]
+
+
+def get_default_persistent_directory() -> str:
+    """The default directory for the persistent translation cache. This is in the CACHE_DIR."""
+    return os.environ.get("AMULET_TRANSLATION_CACHE_DIR", None) or os.path.join(
+        os.environ.get("CACHE_DIR"), "translation_cache"
+    )
+
+
+class TranslationCacheInfo(NamedTuple):
+    """Statistics about a :class:`TranslationCache`."""
+
+    # The number of translations that were found in the cache.
+    hits: int
+    # The number of translations that were not found in the cache.
+    misses: int
+    # The maximum number of translations the cache can store.
+    max_size: int
+    # The number of translations currently in the cache.
+    current_size: int
+    # The number of translations that were not in the cache but were found in the persistent cache.
+    persistent_hits: int = 0
+
+
+class TranslationCache(LRUCache[TranslationCacheKey, TranslateBlockCallbackReturn]):
+    """
+    A thread safe, bounded cache of block translations.
+
+    Every chunk translates each block in its palette but most chunks contain the same blocks.
+    The key is the direction of the translation, the translator key and the input :class:`Block`.
+    The value is the output of the translate block function.
+    Translations that need information about the surrounding blocks are not cached.
+    The least recently used entries are removed when the cache is full.
+
+    Optionally the translations can also be stored on disk so that new processes do not need to translate them again.
+    The persistent cache has a file for each translation direction and translator version.
+    Each file is only loaded when a translation from it is first needed.
+    The files are stored in a sub-directory for the Amulet and PyMCTranslate versions so they do not need invalidating.
+    New translations are written when :meth:`save` is called and when the process exits.
+    """
+
+    def __init__(self, max_size: int = 16384, persistent_directory: str = None):
+        """
+        :param max_size: The maximum number of translations to cache.
+        :param persistent_directory: The directory to store translations on disk. If None, translations are not stored on disk.
+        """
+        super().__init__(max_size)
+        self._persistent_hits = 0
+        self._persistent_directory: Optional[str] = persistent_directory
+        # The loaded persistent cache files. The key is the full blockstate of the input block.
+        self._persistent: Dict[
+            PersistentCacheKey, Dict[str, TranslateBlockCallbackReturn]
+        ] = {}
+        # The translations not yet saved to disk.
+        self._unsaved: Dict[
+            PersistentCacheKey, Dict[str, TranslateBlockCallbackReturn]
+        ] = {}
+
+    def cache_info(self) -> TranslationCacheInfo:
+        """Get statistics about the cache. This can be used to choose :attr:`max_size`."""
+        with self._lock:
+            return TranslationCacheInfo(
+                *super().cache_info(),
+                self._persistent_hits,
+            )
+
+    def clear(self):
+        """
+        Remove all entries from the cache and reset the statistics.
+        Unsaved translations are discarded. The files on disk are not modified.
+        """
+        with self._lock:
+            super().clear()
+            self._persistent_hits = 0
+            self._persistent.clear()
+            self._unsaved.clear()
+
+    @property
+    def persistent_directory(self) -> Optional[str]:
+        """
+        The directory the translations are stored in on disk. None if the persistent cache is disabled.
+        Unsaved translations are saved before this is changed.
+        """
+        return self._persistent_directory
+
+    @persistent_directory.setter
+    def persistent_directory(self, persistent_directory: Optional[str]):
+        with self._lock:
+            self.save()
+            self._persistent_directory = persistent_directory
+            self._persistent.clear()
+
+    def _get_persistent_path(self, key: PersistentCacheKey) -> str:
+        direction, (platform, version_number) = key
+        if isinstance(version_number, tuple):
+            version_number = ".".join(map(str, version_number))
+        return os.path.join(
+            self._persistent_directory,
+            f"{amulet.__version__}-{PyMCTranslate.__version__}-{PyMCTranslate.build_number}",
+            f"{direction}_{platform}_{version_number}.pickle",
+        )
+
+    def _read_persistent(
+        self, key: PersistentCacheKey
+    ) -> Dict[str, TranslateBlockCallbackReturn]:
+        path = self._get_persistent_path(key)
+        if os.path.isfile(path):
+            try:
+                with open(path, "rb") as f:
+                    translations = pickle.load(f)
+                if isinstance(translations, dict):
+                    return translations
+            except Exception as e:
+                # The file is only a cache. It will be rewritten.
+                log.warning(f"Could not load translation cache {path}. {e}")
+        return {}
+
+    def _get_persistent(
+        self, key: PersistentCacheKey
+    ) -> Dict[str, TranslateBlockCallbackReturn]:
+        """Get the persistent translations for a direction and translator version. They are loaded from disk if required."""
+        translations = self._persistent.get(key)
+        if translations is None:
+            translations = self._persistent[key] = self._read_persistent(key)
+        return translations
+
+    def save(self):
+        """
+        Write the new translations to the persistent cache.
+        Translations written by other processes since the file was loaded are kept.
+        This does nothing if the persistent cache is disabled.
+        """
+        with self._lock:
+            if self._persistent_directory is not None:
+                for key, unsaved in self._unsaved.items():
+                    path = self._get_persistent_path(key)
+                    translations = self._read_persistent(key)
+                    translations.update(unsaved)
+                    temp_path = f"{path}.{os.getpid()}.tmp"
+                    try:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        with open(temp_path, "wb") as f:
+                            pickle.dump(translations, f, pickle.HIGHEST_PROTOCOL)
+                        os.replace(temp_path, path)
+                    except Exception as e:
+                        log.warning(f"Could not save translation cache {path}. {e}")
+            self._unsaved.clear()
+
+    def wrap(
+        self,
+        direction: str,
+        translator_key: Hashable,
+        translate_block: TranslateBlockCallback,
+    ) -> TranslateBlockCallback:
+        """
+        Wrap a translate block function so that translations without a block callback are cached.
+
+        :param direction: The direction of the translation. Either "to_universal" or "from_universal".
+        :param translator_key: The key identifying the translator version.
+        :param translate_block: The function to wrap.
+        :return: The wrapped function.
+        """
+
+        def cached_translate_block(
+            input_object: Block,
+            get_block_callback: Optional[GetBlockCallback],
+            block_location: BlockCoordinates,
+        ) -> TranslateBlockCallbackReturn:
+            if get_block_callback is not None:
+                # The translation depends on the surrounding blocks.
+                return translate_block(input_object, get_block_callback, block_location)
+            key = (direction, translator_key, input_object)
+            entry = self.get(key)
+            if entry is None:
+                with self._lock:
+                    if self._persistent_directory is None:
+                        persistent = None
+                    else:
+                        persistent = self._get_persistent((direction, translator_key))
+                        entry = persistent.get(input_object.full_blockstate)
+                        if entry is not None:
+                            self._persistent_hits += 1
+                if entry is None:
+                    entry = translate_block(
+                        input_object, get_block_callback, block_location
+                    )
+                    if entry[3]:
+                        # The block needs the surrounding blocks to translate fully.
+                        return entry
+                    if persistent is not None:
+                        with self._lock:
+                            persistent[input_object.full_blockstate] = entry
+                            self._unsaved.setdefault((direction, translator_key), {})[
+                                input_object.full_blockstate
+                            ] = entry
+                self.set(key, entry)
+            block, block_entity, entities, extra = entry
+            # The entity list is mutable so give each caller its own.
+            return block, block_entity, list(entities), extra
+
+        return cached_translate_block
+
+
+# The translation cache shared by all the translators.
+# Set the AMULET_PERSISTENT_TRANSLATION_CACHE environment variable to 1 or set persistent_directory to enable the persistent cache.
+translation_cache = TranslationCache(
+    persistent_directory=get_default_persistent_directory()
+    if os.environ.get("AMULET_PERSISTENT_TRANSLATION_CACHE") == "1"
+    else None
+)
+atexit.register(translation_cache.save)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple, Optional, TYPE_CHECKING
+from typing import Tuple, Optional, TYPE_CHECKING, Dict, List
 import copy
 import math
 import logging
@@ -13,6 +13,9 @@ from amulet.api.block import Block
 from amulet.api.block_entity import BlockEntity
 from amulet.api.entity import Entity
 from amulet.api.chunk import Chunk, BiomesShape
+from amulet.api.chunk.blocks import is_uniform_sub_chunk, remap_sub_chunk
+from amulet.utils.world_utils import fast_unique
+from .translation_cache import translation_cache
 from amulet.api.data_types import (
     AnyNDArray,
     BlockNDArray,
@@ -67,11 +70,18 @@ class Translator:
         full_translate: bool,
     ):
         if full_translate:
-            todo = []
+            todo = set()
             output_block_entities = []
             output_entities = []
             finished = BlockManager()
-            palette_mappings = {}
+            palette_size = len(chunk.block_palette)
+            # The new palette index for each old palette index.
+            # Blocks that are not mapped (or are translated later) become index 0.
+            palette_lut = numpy.zeros(palette_size, dtype=numpy.uint32)
+            # True for the old palette indexes that need processing at each location.
+            location_lut = numpy.zeros(palette_size, dtype=bool)
+            block_entity_mappings: Dict[int, BlockEntity] = {}
+            entity_mappings: Dict[int, List[Entity]] = {}
 
             # translate each block without using the callback
             for i, input_block in enumerate(chunk.block_palette):
@@ -83,114 +93,129 @@ class Translator:
                     extra,
                 ) = translate_block(input_block, None, (0, 0, 0))
                 if extra and get_chunk_callback:
-                    todo.append(i)
+                    todo.add(i)
+                    location_lut[i] = True
                 elif output_block is not None:
-                    palette_mappings[i] = finished.get_add_block(output_block)
+                    palette_lut[i] = finished.get_add_block(output_block)
                     if output_block_entity is not None:
-                        for cy in chunk.blocks.sub_chunks:
-                            for x, y, z in zip(
-                                *numpy.where(chunk.blocks.get_sub_chunk(cy) == i)
-                            ):
-                                output_block_entities.append(
-                                    output_block_entity.new_at_location(
-                                        x + chunk.cx * 16,
-                                        y + cy * 16,
-                                        z + chunk.cz * 16,
-                                    )
-                                )
+                        block_entity_mappings[i] = output_block_entity
+                        location_lut[i] = True
                 else:
                     # TODO: this should only happen if the object is an entity, set the block to air
                     pass
 
                 if output_entity and entity_support:
-                    for cy in chunk.blocks.sub_chunks:
-                        for x, y, z in zip(
-                            *numpy.where(chunk.blocks.get_sub_chunk(cy) == i)
-                        ):
-                            x += chunk.cx * 16
-                            y += cy * 16
-                            z += chunk.cz * 16
-                            for entity in output_entity:
-                                e = copy.deepcopy(entity)
-                                e.location += (x, y, z)
-                                output_entities.append(e)
-
-            # re-translate the blocks that require extra information
-            block_mappings = {}
-            for index in todo:
+                    entity_mappings[i] = output_entity
+                    location_lut[i] = True
+
+            # Find the locations of all blocks that need processing with one pass over each sub-chunk.
+            # The locations are grouped by palette index in sub-chunk then x, y, z order.
+            locations: List[Tuple[int, int, int, int]] = []
+            if location_lut.any():
+                location_arrays = []
                 for cy in chunk.blocks.sub_chunks:
-                    for x, y, z in zip(
-                        *numpy.where(chunk.blocks.get_sub_chunk(cy) == index)
+                    sub_chunk = chunk.blocks.get_compact_sub_chunk(cy)
+                    if (
+                        is_uniform_sub_chunk(sub_chunk)
+                        and not location_lut[sub_chunk[0, 0, 0]]
                     ):
-                        y += cy * 16
-
-                        def get_block_at(
-                            pos: BlockCoordinates,
-                        ) -> Tuple[Block, Optional[BlockEntity]]:
-                            """Get a block at a location relative to the current block"""
-                            nonlocal x, y, z, chunk, cy
-
-                            # calculate position relative to chunk base
-                            dx, dy, dz = pos
-                            dx += x
-                            dy += y
-                            dz += z
-
-                            abs_x = dx + chunk.cx * 16
-                            abs_y = dy
-                            abs_z = dz + chunk.cz * 16
-
-                            # calculate relative chunk position
-                            cx = dx // 16
-                            cz = dz // 16
-                            if cx == 0 and cz == 0:
-                                # if it is the current chunk
-                                block = chunk.block_palette[chunk.blocks[dx, dy, dz]]
-                                return (
-                                    block,
-                                    chunk.block_entities.get((abs_x, abs_y, abs_z)),
-                                )
+                        continue
+                    x, y, z = numpy.nonzero(location_lut[sub_chunk])
+                    location_arrays.append(
+                        numpy.stack(
+                            [sub_chunk[x, y, z].astype(numpy.int64), x, y + cy * 16, z]
+                        )
+                    )
+                if location_arrays:
+                    location_array = numpy.concatenate(location_arrays, axis=1)
+                    location_array = location_array[
+                        :, numpy.argsort(location_array[0], kind="stable")
+                    ]
+                    locations = list(zip(*location_array.tolist()))
+
+            for i, x, y, z in locations:
+                x += chunk.cx * 16
+                z += chunk.cz * 16
+                if i in block_entity_mappings:
+                    output_block_entities.append(
+                        block_entity_mappings[i].new_at_location(x, y, z)
+                    )
+                if i in entity_mappings:
+                    for entity in entity_mappings[i]:
+                        e = copy.deepcopy(entity)
+                        e.location += (x, y, z)
+                        output_entities.append(e)
 
-                            # if it is in a different chunk
-                            local_chunk = get_chunk_callback(cx, cz)
-                            block = local_chunk.block_palette[
-                                local_chunk.blocks[dx % 16, dy, dz % 16]
-                            ]
+            # re-translate the blocks that require extra information
+            block_mappings = {}
+            for index, x, y, z in locations:
+                if index in todo:
+
+                    def get_block_at(
+                        pos: BlockCoordinates,
+                    ) -> Tuple[Block, Optional[BlockEntity]]:
+                        """Get a block at a location relative to the current block"""
+                        nonlocal x, y, z, chunk
+
+                        # calculate position relative to chunk base
+                        dx, dy, dz = pos
+                        dx += x
+                        dy += y
+                        dz += z
+
+                        abs_x = dx + chunk.cx * 16
+                        abs_y = dy
+                        abs_z = dz + chunk.cz * 16
+
+                        # calculate relative chunk position
+                        cx = dx // 16
+                        cz = dz // 16
+                        if cx == 0 and cz == 0:
+                            # if it is the current chunk
+                            block = chunk.block_palette[chunk.blocks[dx, dy, dz]]
                             return (
                                 block,
-                                local_chunk.block_entities.get((abs_x, abs_y, abs_z)),
+                                chunk.block_entities.get((abs_x, abs_y, abs_z)),
                             )
 
-                        input_block = chunk.block_palette[chunk.blocks[x, y, z]]
-                        (
-                            output_block,
-                            output_block_entity,
-                            output_entity,
-                            _,
-                        ) = translate_block(
-                            input_block,
-                            get_block_at,
-                            (x + chunk.cx * 16, y, z + chunk.cz * 16),
+                        # if it is in a different chunk
+                        local_chunk = get_chunk_callback(cx, cz)
+                        block = local_chunk.block_palette[
+                            local_chunk.blocks[dx % 16, dy, dz % 16]
+                        ]
+                        return (
+                            block,
+                            local_chunk.block_entities.get((abs_x, abs_y, abs_z)),
                         )
-                        if output_block is not None:
-                            block_mappings[(x, y, z)] = finished.get_add_block(
-                                output_block
-                            )
-                            if output_block_entity is not None:
-                                output_block_entities.append(
-                                    output_block_entity.new_at_location(
-                                        x + chunk.cx * 16, y, z + chunk.cz * 16
-                                    )
+
+                    input_block = chunk.block_palette[index]
+                    (
+                        output_block,
+                        output_block_entity,
+                        output_entity,
+                        _,
+                    ) = translate_block(
+                        input_block,
+                        get_block_at,
+                        (x + chunk.cx * 16, y, z + chunk.cz * 16),
+                    )
+                    if output_block is not None:
+                        block_mappings[(x, y, z)] = finished.get_add_block(output_block)
+                        if output_block_entity is not None:
+                            output_block_entities.append(
+                                output_block_entity.new_at_location(
+                                    x + chunk.cx * 16, y, z + chunk.cz * 16
                                 )
-                        else:
-                            # TODO: set the block to air
-                            pass
+                            )
+                    else:
+                        # TODO: set the block to air
+                        pass
 
-                        if output_entity and entity_support:
-                            for entity in output_entity:
-                                e = copy.deepcopy(entity)
-                                e.location += (x, y, z)
-                                output_entities.append(e)
+                    if output_entity and entity_support:
+                        for entity in output_entity:
+                            e = copy.deepcopy(entity)
+                            e.location += (x, y, z)
+                            output_entities.append(e)
 
             if entity_support:
                 for entity in chunk.entities:
@@ -214,11 +239,12 @@ class Translator:
                             output_entities.append(e)
 
             for cy in chunk.blocks.sub_chunks:
-                old_blocks = chunk.blocks.get_sub_chunk(cy)
-                new_blocks = numpy.zeros(old_blocks.shape, dtype=old_blocks.dtype)
-                for old, new in palette_mappings.items():
-                    new_blocks[old_blocks == old] = new
-                chunk.blocks.add_sub_chunk(cy, new_blocks)
+                chunk.blocks.add_sub_chunk(
+                    cy,
+                    remap_sub_chunk(
+                        palette_lut, chunk.blocks.get_compact_sub_chunk(cy)
+                    ),
+                )
             for (x, y, z), new in block_mappings.items():
                 chunk.blocks[x, y, z] = new
             chunk.block_entities = output_block_entities
@@ -315,7 +341,9 @@ class Translator:
         self._translate(
             chunk,
             get_chunk_callback,
-            translate_block,
+            translation_cache.wrap(
+                "to_universal", self._translator_key(chunk_version), translate_block
+            ),
             translate_entity,
             full_translate,
         )
@@ -424,7 +452,11 @@ class Translator:
         self._translate(
             chunk,
             get_chunk_callback,
-            translate_block,
+            translation_cache.wrap(
+                "from_universal",
+                self._translator_key(max_world_version_number),
+                translate_block,
+            ),
             translate_entity,
             full_translate,
         )
@@ -481,10 +513,8 @@ class Translator:
         version = translation_manager.get_version(*version_identifier)
 
         if chunk.biomes.dimension == BiomesShape.Shape2D:
-            biome_int_palette, biome_array = numpy.unique(
-                chunk.biomes, return_inverse=True
-            )
-            chunk.biomes = biome_array.reshape(chunk.biomes.shape)
+            biome_int_palette, biome_array = fast_unique(chunk.biomes)
+            chunk.biomes = biome_array
             chunk._biome_palette = BiomeManager(
                 [version.biome.unpack(biome) for biome in biome_int_palette]
             )
@@ -493,20 +523,15 @@ class Translator:
             palette = []
             palette_length = 0
             for sy in chunk.biomes.sections:
-                biome_int_palette, biome_array = numpy.unique(
-                    chunk.biomes.get_section(sy), return_inverse=True
-                )
-                biomes[sy] = (
-                    biome_array.reshape(chunk.biomes.section_shape) + palette_length
+                biome_int_palette, biome_array = fast_unique(
+                    chunk.biomes.get_section(sy)
                 )
+                biomes[sy] = biome_array + palette_length
                 palette_length += len(biome_int_palette)
                 palette.append(biome_int_palette)
 
             if palette:
-                chunk_palette, lut = numpy.unique(
-                    numpy.concatenate(palette), return_inverse=True
-                )
-                lut = lut.astype(numpy.uint32)
+                chunk_palette, lut = fast_unique(numpy.concatenate(palette))
                 for sy in biomes:
                     biomes[sy] = lut[biomes[sy]]
 
@@ -15,7 +15,9 @@ from typing import (
     Union,
     TypeVar,
     Generic,
+    Iterator,
 )
+from contextlib import contextmanager
 import copy
 import numpy
 import os
@@ -25,9 +27,12 @@ import logging
 import PyMCTranslate
 
 from amulet.api import level as api_level, wrapper as api_wrapper
-from amulet.api.chunk import Chunk
+from amulet.api.chunk import Chunk, Status
+from amulet.api.chunk.blocks import remap_sub_chunk
+from amulet.api.wrapper.neighbour_cache import NeighbourCache
 from amulet.api.registry import BlockManager
 from amulet.api.block import UniversalAirBlock
+from amulet.utils.world_utils import fast_unique
 from amulet.api.errors import (
     ChunkLoadError,
     ChunkDoesNotExist,
@@ -87,6 +92,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         self._version = None
         self._bounds: Dict[Dimension, SelectionGroup] = {}
         self._changed: bool = False
+        self._neighbour_cache = NeighbourCache()
 
     @property
     def sub_chunk_size(self) -> int:
@@ -95,6 +101,15 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         """
         return 16
 
+    @property
+    def neighbour_cache(self) -> NeighbourCache:
+        """
+        The cache of neighbouring chunks decoded while loading chunks.
+
+        Use :meth:`NeighbourCache.cache_info` to find how many decodes were avoided.
+        """
+        return self._neighbour_cache
+
     @property
     def path(self) -> str:
         """The path to the data on disk."""
@@ -117,6 +132,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
     def translation_manager(self, value: PyMCTranslate.TranslationManager):
         # TODO: this should not be settable.
         self._translation_manager = value
+        self._neighbour_cache.clear()
 
     @property
     def exists(self) -> bool:
@@ -384,6 +400,21 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         yield 1
         return False
 
+    @contextmanager
+    def batch_write(self) -> Iterator[None]:
+        """
+        A context manager to group the chunk writes made within it.
+
+        Implementations may buffer the data committed within this context and write it in bulk
+        when the context exits or when :meth:`save` is called.
+        The default implementation does nothing.
+
+        >>> with wrapper.batch_write():
+        >>>     for chunk in chunks:
+        >>>         wrapper.commit_chunk(chunk, dimension)
+        """
+        yield
+
     def save(self):
         """Save the data back to the level."""
         self._verify_has_lock()
@@ -399,6 +430,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         if self.is_open:
             self._is_open = False
             self._has_lock = False
+            self._neighbour_cache.clear()
             self._close()
 
     @abstractmethod
@@ -408,7 +440,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
     @abstractmethod
     def unload(self):
         """Unload data stored in the FormatWrapper class"""
-        raise NotImplementedError
+        self._neighbour_cache.clear()
 
     @abstractmethod
     def all_chunk_coords(self, dimension: Dimension) -> Iterable[ChunkCoordinates]:
@@ -447,13 +479,25 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
             log.error(msg.format(*args), exc_info=True)
             raise load_error(e) from e
 
-    def load_chunk(self, cx: int, cz: int, dimension: Dimension) -> Chunk:
+    def load_chunk(
+        self, cx: int, cz: int, dimension: Dimension, lazy: bool = False
+    ) -> Chunk:
         """
         Loads and creates a universal :class:`~amulet.api.chunk.Chunk` object from chunk coordinates.
 
+        If lazy is True the chunk is decoded but not translated to the universal format.
+        The status and misc data can be read without translating the chunk.
+        It is translated the first time the blocks, biomes or entities are accessed so this must happen before the level is closed.
+        Errors translating a lazy chunk are raised when it is accessed.
+
+        >>> chunk = wrapper.load_chunk(0, 0, "minecraft:overworld", lazy=True)
+        >>> chunk.status.value  # does not translate the chunk
+        >>> chunk.blocks  # translates the chunk
+
         :param cx: The x coordinate of the chunk.
         :param cz: The z coordinate of the chunk.
         :param dimension: The dimension to load the chunk from.
+        :param lazy: If True, only translate the chunk when its contents are first accessed.
         :return: The chunk at the given coordinates.
         :raises:
             ChunkDoesNotExist: If the chunk does not exist (was deleted or never created)
@@ -461,14 +505,53 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         """
         return self._safe_load(
             self._load_chunk,
-            (cx, cz, dimension),
+            (cx, cz, dimension, True, lazy),
             "Error loading chunk {} {} {}",
             ChunkLoadError,
             ChunkDoesNotExist,
         )
 
+    def get_chunk_status(self, cx: int, cz: int, dimension: Dimension) -> Status:
+        """
+        Get the generation status of a chunk.
+
+        If the interface supports it the status is read from the raw chunk data without decoding or translating the chunk.
+        This is much faster than reading :attr:`Chunk.status` from a loaded chunk.
+
+        :param cx: The x coordinate of the chunk.
+        :param cz: The z coordinate of the chunk.
+        :param dimension: The dimension to load the chunk from.
+        :return: The status of the chunk.
+        :raises:
+            ChunkDoesNotExist: If the chunk does not exist (was deleted or never created)
+            ChunkLoadError: If the chunk was not able to be loaded. Eg. If the chunk is corrupt or some error occurred when loading.
+        """
+        return self._safe_load(
+            self._get_chunk_status,
+            (cx, cz, dimension),
+            "Error loading chunk status {} {} {}",
+            ChunkLoadError,
+            ChunkDoesNotExist,
+        )
+
+    def _get_chunk_status(self, cx: int, cz: int, dimension: Dimension) -> Status:
+        raw_chunk_data = self._get_raw_chunk_data(cx, cz, dimension)
+        interface = self._get_interface(raw_chunk_data)
+        value = interface.decode_status(raw_chunk_data)
+        if value is None:
+            chunk, _ = self._decode(interface, dimension, cx, cz, raw_chunk_data)
+            return chunk.status
+        status = Status()
+        status.value = value
+        return status
+
     def _load_chunk(
-        self, cx: int, cz: int, dimension: Dimension, recurse: bool = True
+        self,
+        cx: int,
+        cz: int,
+        dimension: Dimension,
+        recurse: bool = True,
+        lazy: bool = False,
     ) -> Chunk:
         """
         Loads and creates a universal :class:`~amulet.api.chunk.Chunk` object from chunk coordinates.
@@ -477,11 +560,34 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         :param cz: The z coordinate of the chunk.
         :param dimension: The dimension to load the chunk from.
         :param recurse: bool: look in boundary chunks if required to fully define data
+        :param lazy: If True, only translate the chunk when its contents are first accessed.
         :return: The chunk at the given coordinates.
         """
 
-        # Gets an interface (the code that actually reads the chunk data)
         raw_chunk_data = self._get_raw_chunk_data(cx, cz, dimension)
+        return self._load_raw_chunk(cx, cz, dimension, raw_chunk_data, recurse, lazy)
+
+    def _load_raw_chunk(
+        self,
+        cx: int,
+        cz: int,
+        dimension: Dimension,
+        raw_chunk_data: Any,
+        recurse: bool = True,
+        lazy: bool = False,
+    ) -> Chunk:
+        """
+        Create a universal :class:`~amulet.api.chunk.Chunk` object from raw chunk data.
+
+        :param cx: The x coordinate of the chunk.
+        :param cz: The z coordinate of the chunk.
+        :param dimension: The dimension the chunk is in.
+        :param raw_chunk_data: The raw chunk data as returned by :meth:`_get_raw_chunk_data`.
+        :param recurse: bool: look in boundary chunks if required to fully define data
+        :param lazy: If True, only translate the chunk when its contents are first accessed.
+        :return: The chunk.
+        """
+        # Gets an interface (the code that actually reads the chunk data)
         interface, translator, game_version = self._get_interface_and_translator(
             raw_chunk_data
         )
@@ -491,6 +597,22 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
             interface, dimension, cx, cz, raw_chunk_data
         )
         block_palette: AnyNDArray
+
+        if lazy:
+            # The chunk keeps the native palette and arrays until they are needed.
+            def translate(chunk_: Chunk):
+                changed = chunk_.changed
+                self._unpack(translator, game_version, chunk_, block_palette)
+                self._convert_to_load(
+                    chunk_, translator, game_version, dimension, recurse=recurse
+                )
+                if changed:
+                    chunk_.changed = True
+
+            chunk._lazy_translate = translate
+            chunk.changed = False
+            return chunk
+
         chunk = self._unpack(translator, game_version, chunk, block_palette)
         return self._convert_to_load(
             chunk, translator, game_version, dimension, recurse=recurse
@@ -528,15 +650,16 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         # set up a callback that translator can use to get chunk data
         cx, cz = chunk.cx, chunk.cz
         if recurse:
-            chunk_cache: Dict[ChunkCoordinates, Chunk] = {}
 
             def get_chunk_callback(x: int, z: int) -> Chunk:
+                # The neighbours are shared with the other chunks loaded from this wrapper.
                 cx_, cz_ = cx + x, cz + z
-                if (cx_, cz_) not in chunk_cache:
-                    chunk_cache[(cx_, cz_)] = self._load_chunk(
-                        cx_, cz_, dimension, recurse=False
-                    )
-                return chunk_cache[(cx_, cz_)]
+                key = (dimension, cx_, cz_)
+                neighbour = self._neighbour_cache.get(key)
+                if neighbour is None:
+                    neighbour = self._load_chunk(cx_, cz_, dimension, recurse=False)
+                    self._neighbour_cache.set(key, neighbour)
+                return neighbour
 
         else:
             get_chunk_callback = None
@@ -587,6 +710,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         raw_chunk_data = self._encode(interface, chunk, dimension, chunk_palette)
 
         self._put_raw_chunk_data(cx, cz, raw_chunk_data, dimension)
+        self._neighbour_cache.invalidate((dimension, cx, cz))
 
     def _convert_to_save(
         self,
@@ -600,22 +724,18 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         palette: List[numpy.ndarray] = []
         palette_len = 0
         for cy in chunk.blocks.sub_chunks:
-            sub_chunk_palette, sub_chunk = numpy.unique(
-                chunk.blocks.get_sub_chunk(cy), return_inverse=True
-            )
-            chunk.blocks.add_sub_chunk(
-                cy, sub_chunk.astype(numpy.uint32).reshape((16, 16, 16)) + palette_len
+            sub_chunk_palette, sub_chunk = fast_unique(
+                chunk.blocks.get_compact_sub_chunk(cy)
             )
+            chunk.blocks.add_sub_chunk(cy, sub_chunk + palette_len)
             palette_len += len(sub_chunk_palette)
             palette.append(sub_chunk_palette)
 
         if palette:
-            chunk_palette, lut = numpy.unique(
-                numpy.concatenate(palette), return_inverse=True
-            )
+            chunk_palette, lut = fast_unique(numpy.concatenate(palette))
             for cy in chunk.blocks.sub_chunks:
                 chunk.blocks.add_sub_chunk(
-                    cy, lut.astype(numpy.uint32)[chunk.blocks.get_sub_chunk(cy)]
+                    cy, remap_sub_chunk(lut, chunk.blocks.get_compact_sub_chunk(cy))
                 )
             chunk._block_palette = BlockManager(
                 numpy.vectorize(chunk.block_palette.__getitem__)(chunk_palette)
@@ -660,6 +780,7 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         :param dimension: The dimension to load the data from.
         """
         self._delete_chunk(cx, cz, dimension)
+        self._neighbour_cache.invalidate((dimension, cx, cz))
         self._changed = True
 
     @abstractmethod
@@ -679,11 +800,50 @@ class FormatWrapper(Generic[VersionNumberT], ABC):
         """
         self._verify_has_lock()
         self._put_raw_chunk_data(cx, cz, data, dimension)
+        self._neighbour_cache.invalidate((dimension, cx, cz))
 
     @abstractmethod
     def _put_raw_chunk_data(self, cx: int, cz: int, data: Any, dimension: Dimension):
         raise NotImplementedError
 
+    def can_copy_compressed_chunks(self, wrapper: FormatWrapper) -> bool:
+        """
+        Can chunk data be copied from this wrapper to the given wrapper without decoding it.
+
+        If True, :meth:`copy_compressed_chunk` can be used to copy unmodified chunks
+        which is much faster than loading and committing them.
+        The default implementation returns False.
+
+        :param wrapper: The wrapper the chunk data would be copied to.
+        :return: True if :meth:`copy_compressed_chunk` is supported.
+        """
+        return False
+
+    def copy_compressed_chunk(
+        self, cx: int, cz: int, dimension: Dimension, wrapper: FormatWrapper
+    ):
+        """
+        Copy the stored data for a chunk to another wrapper without decoding it.
+
+        This is only valid if :meth:`can_copy_compressed_chunks` returns True for the wrapper.
+
+        :param cx: The x coordinate of the chunk.
+        :param cz: The z coordinate of the chunk.
+        :param dimension: The dimension to copy the chunk from and to.
+        :param wrapper: The wrapper to copy the chunk data to.
+        :raises:
+            ChunkDoesNotExist: If the chunk does not exist.
+        """
+        wrapper._verify_has_lock()
+        self._copy_compressed_chunk(cx, cz, dimension, wrapper)
+        wrapper._neighbour_cache.invalidate((dimension, cx, cz))
+        wrapper._changed = True
+
+    def _copy_compressed_chunk(
+        self, cx: int, cz: int, dimension: Dimension, wrapper: FormatWrapper
+    ):
+        raise NotImplementedError
+
     def get_raw_chunk_data(self, cx: int, cz: int, dimension: Dimension) -> Any:
         """
         Return the raw data as loaded from disk.
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from amulet.api.chunk import Chunk
+from amulet.api.data_types import Dimension
+from amulet.utils.lru_cache import LRUCache, LRUCacheInfo
+
+# The dimension and the chunk coordinates.
+NeighbourCacheKey = Tuple[Dimension, int, int]
+
+
+# Statistics about a :class:`NeighbourCache`. A hit is a decode that was avoided.
+NeighbourCacheInfo = LRUCacheInfo
+
+
+class NeighbourCache(LRUCache[NeighbourCacheKey, Chunk]):
+    """
+    A thread safe, bounded cache of the neighbouring chunks used to translate a chunk.
+
+    Some blocks need the surrounding blocks to translate so loading a chunk may also decode the chunks around it.
+    The neighbours are only decoded and unpacked, not fully translated, so they can be reused by the chunks around them.
+    The key is the dimension and chunk coordinates and the value is the partially translated :class:`Chunk`.
+    The chunks in the cache must be treated as read only.
+    :meth:`invalidate` must be called when the stored chunk data changes.
+    The least recently used entries are removed when the cache is full.
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+        :param max_size: The maximum number of neighbour chunks to cache.
+        """
+        super().__init__(max_size)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+import logging
+from typing import Dict, Tuple, Iterable, Optional
+
+import numpy
+
+from amulet.api.data_types import RegionCoordinates
+
+log = logging.getLogger(__name__)
+
+ChunkIndexFileName = "amulet_chunk_index.npz"
+
+
+class ChunkIndex:
+    """
+    A sidecar file caching which chunks exist in each region file in a directory.
+
+    Each region is stored with the modification time, change time and size of the region file when it was indexed.
+    An entry is only used if none of these have changed since so the index never needs to be invalidated manually.
+    Chunks are stored as their index in the region (cx + cz * 32).
+
+    The region headers are not read to validate the index because avoiding that is the point of the index.
+    A region file that is rewritten with the same size within the timestamp resolution of the file system
+    will not be detected. On Windows the change time is the creation time
+    so a tool that writes the same size and then restores the modification time will not be detected either.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: The path of the index file.
+        """
+        self._path = path
+        self._entries: Optional[
+            Dict[RegionCoordinates, Tuple[int, int, int, numpy.ndarray]]
+        ] = None
+        self._changed = False
+
+    @property
+    def path(self) -> str:
+        """The path of the index file."""
+        return self._path
+
+    def _load(self) -> Dict[RegionCoordinates, Tuple[int, int, int, numpy.ndarray]]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.isfile(self._path):
+                try:
+                    with numpy.load(self._path) as data:
+                        regions = data["regions"]
+                        mtimes = data["mtimes"]
+                        ctimes = data["ctimes"]
+                        sizes = data["sizes"]
+                        counts = data["counts"]
+                        chunks = numpy.split(data["chunks"], numpy.cumsum(counts)[:-1])
+                except Exception as e:
+                    # The index is only a cache. It will be rebuilt.
+                    log.warning(f"Could not load chunk index {self._path}. {e}")
+                else:
+                    for (rx, rz), mtime, ctime, size, region_chunks in zip(
+                        regions.tolist(),
+                        mtimes.tolist(),
+                        ctimes.tolist(),
+                        sizes.tolist(),
+                        chunks,
+                    ):
+                        self._entries[(rx, rz)] = (mtime, ctime, size, region_chunks)
+        return self._entries
+
+    def get(
+        self, key: RegionCoordinates, stat: os.stat_result
+    ) -> Optional[numpy.ndarray]:
+        """
+        Get the chunk indexes stored in a region file.
+
+        :param key: The region coordinates.
+        :param stat: The current stat result of the region file.
+        :return: The chunk indexes or None if the region is not indexed or has changed since it was indexed.
+        """
+        entry = self._load().get(key)
+        if (
+            entry is not None
+            and entry[0] == stat.st_mtime_ns
+            and entry[1] == stat.st_ctime_ns
+            and entry[2] == stat.st_size
+        ):
+            return entry[3]
+        return None
+
+    def set(self, key: RegionCoordinates, stat: os.stat_result, chunks: numpy.ndarray):
+        """
+        Set the chunk indexes stored in a region file.
+
+        :param key: The region coordinates.
+        :param stat: The stat result of the region file from before the chunks were read.
+        :param chunks: The chunk indexes (cx + cz * 32) in the region.
+        """
+        self._load()[key] = (
+            stat.st_mtime_ns,
+            stat.st_ctime_ns,
+            stat.st_size,
+            numpy.asarray(chunks, dtype=numpy.uint16),
+        )
+        self._changed = True
+
+    def retain(self, keys: Iterable[RegionCoordinates]):
+        """Remove all regions not in keys."""
+        entries = self._load()
+        keys = set(keys)
+        for key in list(entries):
+            if key not in keys:
+                del entries[key]
+                self._changed = True
+
+    def save(self):
+        """Write the index to disk if it has changed."""
+        if not self._changed or self._entries is None:
+            return
+        if not os.path.isdir(os.path.dirname(self._path)):
+            return
+        keys = list(self._entries)
+        entries = [self._entries[key] for key in keys]
+        temp_path = f"{self._path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                numpy.savez(
+                    f,
+                    regions=numpy.array(keys, dtype=numpy.int32).reshape(-1, 2),
+                    mtimes=numpy.array([entry[0] for entry in entries], numpy.int64),
+                    ctimes=numpy.array([entry[1] for entry in entries], numpy.int64),
+                    sizes=numpy.array([entry[2] for entry in entries], numpy.int64),
+                    counts=numpy.array(
+                        [len(entry[3]) for entry in entries], numpy.int32
+                    ),
+                    chunks=numpy.concatenate(
+                        [entry[3] for entry in entries]
+                        or [numpy.zeros(0, numpy.uint16)]
+                    ).astype(numpy.uint16),
+                )
+            os.replace(temp_path, self._path)
+        except OSError as e:
+            log.warning(f"Could not save chunk index {self._path}. {e}")
+        else:
+            self._changed = False
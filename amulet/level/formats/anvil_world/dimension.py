@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional, Iterator, Tuple, List, NamedTuple
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
 import re
 import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 
+import numpy
 from amulet_nbt import NamedTag
 
 from amulet.utils import world_utils
@@ -13,14 +17,38 @@ from amulet.api.data_types import (
     ChunkCoordinates,
     RegionCoordinates,
 )
-from .region import AnvilRegionInterface
+from .region import (
+    AnvilRegionInterface,
+    RegionFileVersion,
+    DefaultCompressionLevel,
+    _compress,
+    _decompress,
+    _validate_compression,
+)
+from ._chunk_index import ChunkIndex, ChunkIndexFileName
 
 InternalDimension = str
 
+# The default number of bytes of compressed chunk data a batch buffers before writing it.
+DefaultMaxBatchSize = 16 * 1024 * 1024
+
 
 ChunkDataType = Dict[str, NamedTag]
 
 
+class RegionCacheInfo(NamedTuple):
+    """Statistics about the region interfaces held by an :class:`AnvilRegionManager`."""
+
+    # The number of times a region was requested and was already loaded.
+    hits: int
+    # The number of times a region was requested and had to be loaded.
+    misses: int
+    # The maximum number of loaded regions. None if unbounded.
+    max_regions: Optional[int]
+    # The number of currently loaded regions.
+    current_regions: int
+
+
 class AnvilDimensionManager:
     """
     A class to manage the data for a dimension.
@@ -29,16 +57,138 @@ class AnvilDimensionManager:
 
     level_regex = re.compile(r"DIM(?P<level>-?\d+)")
 
-    def __init__(self, directory: str, *, mcc=False, layers=("region",)):
+    def __init__(
+        self,
+        directory: str,
+        *,
+        mcc=False,
+        layers=("region",),
+        memory_map=False,
+        compression: RegionFileVersion = RegionFileVersion.VERSION_DEFLATE,
+        compression_level: int = DefaultCompressionLevel,
+        chunk_index=False,
+        max_regions: Optional[int] = None,
+        max_batch_size: int = DefaultMaxBatchSize,
+    ):
+        _validate_compression(compression, compression_level)
         self._directory = directory
+        self._max_regions = max_regions
+        self._max_batch_size = max_batch_size
         self._mcc = mcc
+        self._memory_map = memory_map
+        self._chunk_index = chunk_index
+        self._compression = compression
+        self._compression_level = compression_level
         self.__layers: Dict[str, AnvilRegionManager] = {
-            layer: AnvilRegionManager(
-                os.path.join(self._directory, layer), mcc=self._mcc
-            )
-            for layer in layers
+            layer: self._create_layer(layer) for layer in layers
         }
         self.__default_layer = self.__layers[layers[0]]
+        # The exit stack of the active batch if there is one
+        self._batch: Optional[ExitStack] = None
+
+    def _create_layer(self, layer_name: str) -> AnvilRegionManager:
+        return AnvilRegionManager(
+            os.path.join(self._directory, layer_name),
+            mcc=self._mcc,
+            memory_map=self._memory_map,
+            compression=self._compression,
+            compression_level=self._compression_level,
+            chunk_index=self._chunk_index,
+            max_regions=self._max_regions,
+            max_batch_size=self._max_batch_size,
+        )
+
+    @property
+    def max_regions(self) -> Optional[int]:
+        """The maximum number of region files each layer keeps loaded. None if unbounded."""
+        return self._max_regions
+
+    @max_regions.setter
+    def max_regions(self, max_regions: Optional[int]):
+        for layer in self.__layers.values():
+            layer.max_regions = max_regions
+        self._max_regions = max_regions
+
+    @property
+    def max_batch_size(self) -> int:
+        """The approximate number of bytes of compressed chunk data each layer buffers in a batch before writing it."""
+        return self._max_batch_size
+
+    @max_batch_size.setter
+    def max_batch_size(self, max_batch_size: int):
+        for layer in self.__layers.values():
+            layer.max_batch_size = max_batch_size
+        self._max_batch_size = max_batch_size
+
+    def region_cache_info(self) -> Dict[str, RegionCacheInfo]:
+        """Get the region cache statistics for each layer."""
+        return {
+            layer_name: layer.region_cache_info()
+            for layer_name, layer in self.__layers.items()
+        }
+
+    @property
+    def chunk_index(self) -> bool:
+        """Is the list of chunks cached in a sidecar index file."""
+        return self._chunk_index
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: bool):
+        self._chunk_index = bool(chunk_index)
+        for layer in self.__layers.values():
+            layer.chunk_index = self._chunk_index
+
+    @property
+    def memory_map(self) -> bool:
+        """Are region files read through memory maps."""
+        return self._memory_map
+
+    @memory_map.setter
+    def memory_map(self, memory_map: bool):
+        self._memory_map = bool(memory_map)
+        for layer in self.__layers.values():
+            layer.memory_map = self._memory_map
+
+    def set_compression(
+        self,
+        compression: RegionFileVersion,
+        compression_level: int = DefaultCompressionLevel,
+    ):
+        """
+        Set the compression used when writing chunk data to all layers.
+
+        See :meth:`AnvilRegionInterface.set_compression` for more information.
+        """
+        _validate_compression(compression, compression_level)
+        self._compression = compression
+        self._compression_level = compression_level
+        for layer in self.__layers.values():
+            layer.set_compression(compression, compression_level)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Buffer the chunk writes and deletions made to all layers within this context.
+
+        See :meth:`AnvilRegionManager.batch` for more information.
+        """
+        if self._batch is not None:
+            # already in a batch
+            yield
+            return
+        with ExitStack() as stack:
+            for layer in self.__layers.values():
+                stack.enter_context(layer.batch())
+            self._batch = stack
+            try:
+                yield
+            finally:
+                self._batch = None
+
+    def flush(self):
+        """Write all buffered chunk data to the region files."""
+        for layer in self.__layers.values():
+            layer.flush()
 
     def all_chunk_coords(self) -> Iterable[ChunkCoordinates]:
         yield from self.__default_layer.all_chunk_coords()
@@ -58,6 +208,20 @@ class AnvilDimensionManager:
         # get the region key
         return self.__default_layer.get_chunk_data(cx, cz)
 
+    def get_chunk_data_many(
+        self, coords: Iterable[ChunkCoordinates], max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[ChunkCoordinates, NamedTag]]:
+        """
+        Get the NamedTag for many chunks from the database.
+        The data is decompressed on a pool of threads and yielded in the order it finishes loading.
+        Chunks that do not exist are skipped.
+
+        :param coords: The chunk coordinates to load.
+        :param max_workers: The number of threads used to decompress the data.
+        :return: An iterator of the chunk coordinates and the NamedTag for that chunk.
+        """
+        return self.__default_layer.get_chunk_data_many(coords, max_workers)
+
     def get_chunk_data_layers(self, cx: int, cz: int) -> ChunkDataType:
         """Get the chunk data for each layer"""
         chunk_data = {}
@@ -76,19 +240,50 @@ class AnvilDimensionManager:
         """pass data to the region file class"""
         self.__default_layer.put_chunk_data(cx, cz, data)
 
+    def _get_layer(self, layer_name: str) -> Optional[AnvilRegionManager]:
+        """Get a layer, creating it if it does not exist. Returns None if the layer name is not valid."""
+        if (
+            layer_name not in self.__layers
+            and layer_name.isalpha()
+            and layer_name.islower()
+        ):
+            layer = self.__layers[layer_name] = self._create_layer(layer_name)
+            if self._batch is not None:
+                self._batch.enter_context(layer.batch())
+        return self.__layers.get(layer_name)
+
     def put_chunk_data_layers(self, cx: int, cz: int, data_layers: ChunkDataType):
         """Put one or more layers of data"""
         for layer_name, data in data_layers.items():
-            if (
-                layer_name not in self.__layers
-                and layer_name.isalpha()
-                and layer_name.islower()
-            ):
-                self.__layers[layer_name] = AnvilRegionManager(
-                    os.path.join(self._directory, layer_name), mcc=self._mcc
-                )
-            if layer_name in self.__layers:
-                self.__layers[layer_name].put_chunk_data(cx, cz, data)
+            layer = self._get_layer(layer_name)
+            if layer is not None:
+                layer.put_chunk_data(cx, cz, data)
+
+    def get_compressed_chunk_data_layers(self, cx: int, cz: int) -> Dict[str, bytes]:
+        """
+        Get the compressed data for each layer without decompressing it.
+        Will raise ChunkDoesNotExist if the chunk does not exist in any layer.
+        """
+        chunk_data = {}
+        for layer_name, layer in self.__layers.items():
+            try:
+                chunk_data[layer_name] = layer.get_compressed_chunk_data(cx, cz)
+            except ChunkDoesNotExist:
+                pass
+
+        if chunk_data:
+            return chunk_data
+        else:
+            raise ChunkDoesNotExist
+
+    def put_compressed_chunk_data_layers(
+        self, cx: int, cz: int, data_layers: Dict[str, bytes]
+    ):
+        """Put one or more layers of compressed data. Eg from :meth:`get_compressed_chunk_data_layers`."""
+        for layer_name, data in data_layers.items():
+            layer = self._get_layer(layer_name)
+            if layer is not None:
+                layer.put_compressed_chunk_data(cx, cz, data)
 
     def delete_chunk(self, cx: int, cz: int):
         for layer in self.__layers.values():
@@ -98,16 +293,254 @@ class AnvilDimensionManager:
 class AnvilRegionManager:
     """A class to manage a directory of region files."""
 
-    def __init__(self, directory: str, *, mcc=False):
+    def __init__(
+        self,
+        directory: str,
+        *,
+        mcc=False,
+        memory_map=False,
+        max_memory_maps: int = 64,
+        compression: RegionFileVersion = RegionFileVersion.VERSION_DEFLATE,
+        compression_level: int = DefaultCompressionLevel,
+        chunk_index=False,
+        max_regions: Optional[int] = None,
+        max_batch_size: int = DefaultMaxBatchSize,
+    ):
+        """
+        :param directory: The directory containing the region files.
+        :param mcc: Is support for .mcc files enabled
+        :param memory_map: Should region files be read through read-only memory maps.
+        :param max_memory_maps: The maximum number of region files that can be memory mapped at once.
+            The least recently read region is closed when this is exceeded.
+        :param compression: The compression format used when writing chunk data.
+        :param compression_level: The zlib compression level (1-9). Only used by VERSION_DEFLATE.
+        :param chunk_index: Should the chunks in each region be cached in a sidecar index file in the directory.
+            This makes :meth:`all_chunk_coords` much faster because the region headers do not need to be read.
+        :param max_regions: The maximum number of region files to keep loaded.
+            The parsed header of the least recently used region is unloaded when this is exceeded.
+            None for no limit.
+        :param max_batch_size: The approximate number of bytes of compressed chunk data to buffer in a batch.
+            The buffered data is written when this is exceeded.
+        """
+        if max_memory_maps < 1:
+            raise ValueError("max_memory_maps must be at least 1")
+        if max_regions is not None and max_regions < 1:
+            raise ValueError("max_regions must be at least 1")
+        if max_batch_size < 0:
+            raise ValueError("max_batch_size must be positive")
+        _validate_compression(compression, compression_level)
+        self._compression = compression
+        self._compression_level = compression_level
         self._directory = directory
-        self._regions: Dict[RegionCoordinates, AnvilRegionInterface] = {}
+        # The loaded regions ordered from least to most recently used
+        self._regions: OrderedDict[
+            RegionCoordinates, AnvilRegionInterface
+        ] = OrderedDict()
+        self._max_regions = max_regions
+        # The number of callers using each region. These regions are not evicted.
+        self._region_users: Dict[RegionCoordinates, int] = {}
+        self._region_hits = 0
+        self._region_misses = 0
         self._mcc = mcc
+        self._memory_map = memory_map
+        self._max_memory_maps = max_memory_maps
+        # The regions with an open memory map ordered from least to most recently read
+        self._mapped_regions: OrderedDict[
+            RegionCoordinates, AnvilRegionInterface
+        ] = OrderedDict()
+        # The number of batch contexts currently entered
+        self._batch_depth = 0
+        # Compressed chunk data waiting to be written. None means the chunk is to be deleted.
+        self._pending: Dict[
+            RegionCoordinates, Dict[ChunkCoordinates, Optional[bytes]]
+        ] = {}
+        self._pending_size = 0
+        self._max_batch_size = max_batch_size
+        # The sidecar index of the chunks in each region if enabled
+        self._chunk_index: Optional[ChunkIndex] = None
         self._lock = threading.RLock()
+        self.chunk_index = chunk_index
+
+    @property
+    def max_regions(self) -> Optional[int]:
+        """The maximum number of region files to keep loaded. None if unbounded."""
+        return self._max_regions
+
+    @max_regions.setter
+    def max_regions(self, max_regions: Optional[int]):
+        if max_regions is not None and max_regions < 1:
+            raise ValueError("max_regions must be at least 1")
+        with self._lock:
+            self._max_regions = max_regions
+            self._evict_regions()
+
+    @property
+    def max_batch_size(self) -> int:
+        """The approximate number of bytes of compressed chunk data to buffer in a batch before writing it."""
+        return self._max_batch_size
+
+    @max_batch_size.setter
+    def max_batch_size(self, max_batch_size: int):
+        if max_batch_size < 0:
+            raise ValueError("max_batch_size must be positive")
+        self._max_batch_size = max_batch_size
+
+    def region_cache_info(self) -> RegionCacheInfo:
+        """Get statistics about the loaded regions. This can be used to choose :attr:`max_regions`."""
+        with self._lock:
+            return RegionCacheInfo(
+                self._region_hits,
+                self._region_misses,
+                self._max_regions,
+                len(self._regions),
+            )
+
+    def _evict_regions(self):
+        """
+        Unload the least recently used regions until the number of loaded regions is within the limit.
+
+        Regions that are in use and the most recently used region are not evicted.
+        If those exceed the limit the regions are evicted when they are released.
+        """
+        with self._lock:
+            if self._max_regions is None:
+                return
+            for key in list(self._regions)[:-1]:
+                if len(self._regions) <= self._max_regions:
+                    break
+                if key in self._region_users:
+                    continue
+                region = self._regions.pop(key)
+                self._mapped_regions.pop(key, None)
+                region.unload()
+
+    @property
+    def chunk_index(self) -> bool:
+        """
+        Is the list of chunks cached in a sidecar index file.
+
+        The index is validated against the modification time, change time and size of each region file.
+        The region headers are not read so a region file rewritten with the same size
+        within the timestamp resolution of the file system may be missed.
+        """
+        return self._chunk_index is not None
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: bool):
+        with self._lock:
+            if not chunk_index:
+                self._chunk_index = None
+            elif self._chunk_index is None:
+                self._chunk_index = ChunkIndex(
+                    os.path.join(self._directory, ChunkIndexFileName)
+                )
+
+    @property
+    def memory_map(self) -> bool:
+        """Are region files read through memory maps."""
+        return self._memory_map
+
+    @memory_map.setter
+    def memory_map(self, memory_map: bool):
+        with self._lock:
+            self._memory_map = bool(memory_map)
+            for region in self._regions.values():
+                region.memory_map = self._memory_map
+            if not self._memory_map:
+                self._mapped_regions.clear()
+
+    def set_compression(
+        self,
+        compression: RegionFileVersion,
+        compression_level: int = DefaultCompressionLevel,
+    ):
+        """
+        Set the compression used when writing chunk data.
+        Data already buffered by a batch keeps the compression it was buffered with.
+
+        See :meth:`AnvilRegionInterface.set_compression` for more information.
+        """
+        _validate_compression(compression, compression_level)
+        with self._lock:
+            self._compression = compression
+            self._compression_level = compression_level
+            for region in self._regions.values():
+                region.set_compression(compression, compression_level)
+
+    def _close_memory_maps(self):
+        with self._lock:
+            for region in self._mapped_regions.values():
+                region.close_memory_map()
+            self._mapped_regions.clear()
+
+    def _track_memory_map(self, key: RegionCoordinates, region: AnvilRegionInterface):
+        """Mark the region as most recently read and close the least recently read maps over the limit."""
+        with self._lock:
+            if region.is_memory_mapped:
+                self._mapped_regions[key] = region
+                self._mapped_regions.move_to_end(key)
+                while len(self._mapped_regions) > self._max_memory_maps:
+                    _, old_region = self._mapped_regions.popitem(last=False)
+                    old_region.close_memory_map()
+            else:
+                self._mapped_regions.pop(key, None)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Buffer the chunk writes and deletions made within this context.
+
+        The buffered data is written when the outermost context exits, when :meth:`flush` is called
+        or when more than :attr:`max_batch_size` bytes are buffered.
+        Each region file is opened once, sectors are reserved for all the buffered chunks,
+        the data is written in file order and the header is written once.
+
+        >>> with region_manager.batch():
+        >>>     for cx, cz, data in chunks:
+        >>>         region_manager.put_chunk_data(cx, cz, data)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def flush(self):
+        """Write all buffered chunk data to the region files."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_size = 0
+            for (rx, rz), chunks in sorted(pending.items()):
+                if chunks:
+                    self._get_region(rx, rz, create=True)._write_data_many(chunks)
 
     def unload(self):
         with self._lock:
+            self.flush()
+            self._close_memory_maps()
             self._regions.clear()
 
+    def compact(self) -> int:
+        """
+        Rewrite every region file with the chunks stored contiguously and remove the unused space.
+        Any buffered chunk data is written first.
+
+        See :meth:`AnvilRegionInterface.compact` for more information.
+
+        :return: The total number of bytes reclaimed.
+        """
+        with self._lock:
+            self.flush()
+            reclaimed = 0
+            for region in self._iter_regions():
+                self._mapped_regions.pop((region.rx, region.rz), None)
+                reclaimed += region.compact()
+            return reclaimed
+
     def _region_path(self, rx, rz) -> str:
         """Get the file path for a region file."""
         return os.path.join(self._directory, f"r.{rx}.{rz}.mca")
@@ -119,59 +552,323 @@ class AnvilRegionManager:
     def _get_region(self, rx: int, rz: int, create=False) -> AnvilRegionInterface:
         with self._lock:
             if (rx, rz) in self._regions:
+                self._region_hits += 1
+                self._regions.move_to_end((rx, rz))
                 return self._regions[(rx, rz)]
             elif create or self._has_region(rx, rz):
+                self._region_misses += 1
                 region = self._regions[(rx, rz)] = AnvilRegionInterface(
-                    self._region_path(rx, rz), mcc=self._mcc
+                    self._region_path(rx, rz),
+                    mcc=self._mcc,
+                    memory_map=self._memory_map,
+                    compression=self._compression,
+                    compression_level=self._compression_level,
                 )
+                self._evict_regions()
                 return region
             else:
                 raise ChunkDoesNotExist
 
-    def _iter_regions(self) -> Iterable[AnvilRegionInterface]:
+    @contextmanager
+    def _use_region(
+        self, rx: int, rz: int, create=False
+    ) -> Iterator[AnvilRegionInterface]:
+        """
+        Get a region interface and stop it being evicted until the context exits.
+
+        An evicted interface must not be used because a new interface would be created for the same file.
+        Will raise ChunkDoesNotExist if the region does not exist and create is False.
+        """
+        key = (rx, rz)
+        with self._lock:
+            region = self._get_region(rx, rz, create)
+            self._region_users[key] = self._region_users.get(key, 0) + 1
+        try:
+            yield region
+        finally:
+            with self._lock:
+                users = self._region_users.pop(key) - 1
+                if users:
+                    self._region_users[key] = users
+                else:
+                    self._evict_regions()
+
+    def _iter_region_coords(self) -> Iterable[RegionCoordinates]:
         if os.path.isdir(self._directory):
             for region_file_name in os.listdir(self._directory):
                 rx, rz = AnvilRegionInterface.get_coords(region_file_name)
                 if rx is None:
                     continue
-                yield self._get_region(rx, rz)
+                yield rx, rz
+
+    def _iter_regions(self) -> Iterable[AnvilRegionInterface]:
+        for rx, rz in self._iter_region_coords():
+            yield self._get_region(rx, rz)
+
+    def _iter_region_chunk_coords(
+        self,
+    ) -> Iterable[Tuple[RegionCoordinates, Iterable[ChunkCoordinates]]]:
+        """Get the chunk coordinates stored in each region file."""
+        if self._chunk_index is None:
+            for rx, rz in self._iter_region_coords():
+                with self._use_region(rx, rz) as region:
+                    chunk_coords = list(region.all_chunk_coords())
+                yield (rx, rz), chunk_coords
+        else:
+            yield from self._iter_indexed_chunk_coords()
+
+    def _iter_indexed_chunk_coords(
+        self,
+    ) -> List[Tuple[RegionCoordinates, Iterable[ChunkCoordinates]]]:
+        """
+        Get the chunk coordinates stored in each region file using the sidecar index.
+        Only the headers of region files that have changed since they were indexed are read.
+        """
+        region_chunks = []
+        if not os.path.isdir(self._directory):
+            return region_chunks
+        with self._lock:
+            index = self._chunk_index
+            with os.scandir(self._directory) as entries:
+                for entry in entries:
+                    rx, rz = AnvilRegionInterface.get_coords(entry.name)
+                    if rx is None or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    chunks = index.get((rx, rz), stat)
+                    if chunks is None:
+                        chunks = numpy.array(
+                            [
+                                (cx & 0x1F) + (cz & 0x1F) * 32
+                                for cx, cz in self._get_region(
+                                    rx, rz
+                                ).all_chunk_coords()
+                            ],
+                            numpy.uint16,
+                        )
+                        index.set((rx, rz), stat, chunks)
+                    region_chunks.append(((rx, rz), chunks))
+            index.retain(key for key, _ in region_chunks)
+            index.save()
+        return [
+            (
+                (rx, rz),
+                zip(
+                    ((chunks & 0x1F) + rx * 32).tolist(),
+                    ((chunks >> 5) + rz * 32).tolist(),
+                ),
+            )
+            for (rx, rz), chunks in region_chunks
+        ]
 
     def all_chunk_coords(self) -> Iterable[ChunkCoordinates]:
-        for region in self._iter_regions():
-            yield from region.all_chunk_coords()
+        with self._lock:
+            pending = {key: dict(chunks) for key, chunks in self._pending.items()}
+        for (rx, rz), chunk_coords in self._iter_region_chunk_coords():
+            region_pending = pending.pop((rx, rz), None)
+            if region_pending:
+                for cx, cz in chunk_coords:
+                    if (cx & 0x1F, cz & 0x1F) not in region_pending:
+                        yield cx, cz
+                yield from self._pending_chunk_coords(rx, rz, region_pending)
+            else:
+                yield from chunk_coords
+        # regions that only exist in the buffer
+        for (rx, rz), region_pending in pending.items():
+            yield from self._pending_chunk_coords(rx, rz, region_pending)
+
+    @staticmethod
+    def _pending_chunk_coords(
+        rx: int, rz: int, region_pending: Dict[ChunkCoordinates, Optional[bytes]]
+    ) -> Iterable[ChunkCoordinates]:
+        for (cx, cz), data in region_pending.items():
+            if data is not None:
+                yield cx + rx * 32, cz + rz * 32
+
+    def _get_pending(self, cx: int, cz: int) -> Optional[bytes]:
+        """Get the buffered data for a chunk. Raises KeyError if the chunk is not buffered."""
+        return self._pending[world_utils.chunk_coords_to_region_coords(cx, cz)][
+            (cx & 0x1F, cz & 0x1F)
+        ]
+
+    def _pop_pending(self, key: RegionCoordinates, chunk_coords: ChunkCoordinates):
+        """Remove a chunk from the buffer and its data from the buffered size."""
+        old_data = self._pending.get(key, {}).pop(chunk_coords, None)
+        if old_data is not None:
+            self._pending_size -= len(old_data)
 
     def has_chunk(self, cx: int, cz: int) -> bool:
+        if self._pending:
+            try:
+                return self._get_pending(cx, cz) is not None
+            except KeyError:
+                pass
         try:
-            region = self._get_region(
+            with self._use_region(
                 *world_utils.chunk_coords_to_region_coords(cx, cz)
-            )
+            ) as region:
+                return region.has_chunk(cx & 0x1F, cz & 0x1F)
         except ChunkDoesNotExist:
             return False
-        else:
-            return region.has_chunk(cx & 0x1F, cz & 0x1F)
 
     def get_chunk_data(self, cx: int, cz: int) -> NamedTag:
         """
         Get a NamedTag of a chunk from the database.
         Will raise ChunkDoesNotExist if the region or chunk does not exist
         """
+        if self._pending:
+            try:
+                data = self._get_pending(cx, cz)
+            except KeyError:
+                pass
+            else:
+                if data is None:
+                    raise ChunkDoesNotExist
+                return _decompress(data)
         # get the region key
-        return self._get_region(
+        key = world_utils.chunk_coords_to_region_coords(cx, cz)
+        with self._use_region(*key) as region:
+            if not self._memory_map:
+                return region.get_data(cx & 0x1F, cz & 0x1F)
+            try:
+                return region.get_data(cx & 0x1F, cz & 0x1F)
+            finally:
+                self._track_memory_map(key, region)
+
+    def get_chunk_data_many(
+        self, coords: Iterable[ChunkCoordinates], max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[ChunkCoordinates, NamedTag]]:
+        """
+        Get the NamedTag for many chunks.
+
+        The compressed data for each region is read sequentially in the order it is stored in the file.
+        Decompressing and parsing the data is done on a pool of threads.
+        Chunks are yielded in the order they finish loading, not the order they were requested.
+        Chunks that do not exist are skipped.
+
+        :param coords: The chunk coordinates to load.
+        :param max_workers: The number of threads used to decompress the data. Defaults to the ThreadPoolExecutor default.
+        :return: An iterator of the chunk coordinates and the NamedTag for that chunk.
+        """
+        regions: Dict[RegionCoordinates, List[ChunkCoordinates]] = {}
+        for cx, cz in coords:
+            regions.setdefault(
+                world_utils.chunk_coords_to_region_coords(cx, cz), []
+            ).append((cx, cz))
+
+        if max_workers is None:
+            # the ThreadPoolExecutor default
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        elif max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        executor = ThreadPoolExecutor(max_workers)
+        # limit the number of buffers held in memory at once
+        max_pending = max_workers * 4
+        futures: Dict[Future, ChunkCoordinates] = {}
+
+        def get_done() -> Iterator[Tuple[ChunkCoordinates, NamedTag]]:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_coords = futures.pop(future)
+                try:
+                    yield chunk_coords, future.result()
+                except ChunkDoesNotExist:
+                    pass
+
+        try:
+            for (rx, rz), region_coords in sorted(regions.items()):
+                with self._lock:
+                    region_pending = dict(self._pending.get((rx, rz), ()))
+                stored_coords = []
+                for cx, cz in region_coords:
+                    if (cx & 0x1F, cz & 0x1F) in region_pending:
+                        # the chunk has been modified but not written yet
+                        data = region_pending[(cx & 0x1F, cz & 0x1F)]
+                        if data is not None:
+                            futures[executor.submit(_decompress, data)] = (cx, cz)
+                    else:
+                        stored_coords.append((cx & 0x1F, cz & 0x1F))
+                    if len(futures) >= max_pending:
+                        yield from get_done()
+                if stored_coords and self._has_region(rx, rz):
+                    with self._use_region(rx, rz) as region:
+                        buffers = region._read_buffers(stored_coords)
+                        decompress_buffer = region._decompress_buffer
+                    for (cx, cz), buffer in buffers:
+                        futures[executor.submit(decompress_buffer, cx, cz, buffer)] = (
+                            cx + rx * 32,
+                            cz + rz * 32,
+                        )
+                        if len(futures) >= max_pending:
+                            yield from get_done()
+            while futures:
+                yield from get_done()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def get_compressed_chunk_data(self, cx: int, cz: int) -> bytes:
+        """
+        Get the data for a chunk without decompressing it.
+        Will raise ChunkDoesNotExist if the region or chunk does not exist
+
+        :return: The compression type byte followed by the compressed data.
+        """
+        if self._pending:
+            try:
+                data = self._get_pending(cx, cz)
+            except KeyError:
+                pass
+            else:
+                if data is None:
+                    raise ChunkDoesNotExist
+                return data
+        with self._use_region(
             *world_utils.chunk_coords_to_region_coords(cx, cz)
-        ).get_data(cx & 0x1F, cz & 0x1F)
+        ) as region:
+            return region.get_compressed_data(cx & 0x1F, cz & 0x1F)
 
     def put_chunk_data(self, cx: int, cz: int, data: NamedTag):
         """pass data to the region file class"""
-        self._get_region(
+        with self._lock:
+            if self._batch_depth:
+                self.put_compressed_chunk_data(
+                    cx, cz, _compress(data, self._compression, self._compression_level)
+                )
+                return
+        with self._use_region(
             *world_utils.chunk_coords_to_region_coords(cx, cz), create=True
-        ).write_data(cx & 0x1F, cz & 0x1F, data)
+        ) as region:
+            region.write_data(cx & 0x1F, cz & 0x1F, data)
+
+    def put_compressed_chunk_data(self, cx: int, cz: int, data: bytes):
+        """
+        Put data that has already been compressed.
+
+        :param data: The compression type byte followed by the compressed data. Eg from :meth:`get_compressed_chunk_data`.
+        """
+        key = world_utils.chunk_coords_to_region_coords(cx, cz)
+        with self._lock:
+            if self._batch_depth:
+                self._pop_pending(key, (cx & 0x1F, cz & 0x1F))
+                self._pending.setdefault(key, {})[(cx & 0x1F, cz & 0x1F)] = data
+                self._pending_size += len(data)
+                if self._pending_size > self._max_batch_size:
+                    self.flush()
+                return
+        with self._use_region(*key, create=True) as region:
+            region.write_compressed_data(cx & 0x1F, cz & 0x1F, data)
 
     def delete_chunk(self, cx: int, cz: int):
+        key = world_utils.chunk_coords_to_region_coords(cx, cz)
+        with self._lock:
+            if self._batch_depth:
+                self._pop_pending(key, (cx & 0x1F, cz & 0x1F))
+                if key in self._regions or self._has_region(*key):
+                    self._pending.setdefault(key, {})[(cx & 0x1F, cz & 0x1F)] = None
+                # otherwise the region has not been written yet so there is nothing to delete on disk
+                return
         try:
-            region = self._get_region(
-                *world_utils.chunk_coords_to_region_coords(cx, cz)
-            )
+            with self._use_region(*key) as region:
+                region.delete_data(cx & 0x1F, cz & 0x1F)
         except ChunkDoesNotExist:
             pass
-        else:
-            region.delete_data(cx & 0x1F, cz & 0x1F)
@@ -12,7 +12,9 @@ from typing import (
     Iterable,
     BinaryIO,
     Any,
+    Iterator,
 )
+from contextlib import contextmanager, ExitStack
 import time
 import glob
 import shutil
@@ -35,7 +37,7 @@ from amulet_nbt import (
 from amulet.api.player import Player, LOCAL_PLAYER
 from amulet.api.chunk import Chunk
 from amulet.api.selection import SelectionGroup, SelectionBox
-from amulet.api.wrapper import WorldFormatWrapper, DefaultSelection
+from amulet.api.wrapper import WorldFormatWrapper, FormatWrapper, DefaultSelection
 from amulet.utils.format_utils import check_all_exist
 from amulet.api.errors import (
     DimensionDoesNotExist,
@@ -53,6 +55,11 @@ from amulet.api.data_types import (
     Dimension,
 )
 from .dimension import AnvilDimensionManager, ChunkDataType
+from .region import (
+    RegionFileVersion,
+    DefaultCompressionLevel,
+    _validate_compression,
+)
 from amulet.api import level as api_level
 from amulet.level.interfaces.chunk.anvil.base_anvil_interface import BaseAnvilInterface
 from .data_pack import DataPack, DataPackManager
@@ -87,6 +94,11 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
         self._lock_time: Optional[bytes] = None
         self._lock: Optional[BinaryIO] = None
         self._data_pack: Optional[DataPackManager] = None
+        self._memory_map = False
+        self._chunk_index = False
+        self._max_regions: Optional[int] = None
+        self._compression = RegionFileVersion.VERSION_DEFLATE
+        self._compression_level = DefaultCompressionLevel
         self._shallow_load()
 
     def __del__(self):
@@ -199,6 +211,98 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
             self._data_pack = DataPackManager(packs)
         return self._data_pack
 
+    @property
+    def memory_map(self) -> bool:
+        """
+        Should region files be read through read-only memory maps.
+
+        This avoids opening and closing the region file for every chunk read
+        which makes reading large numbers of chunks faster. Defaults to False.
+        """
+        return self._memory_map
+
+    @memory_map.setter
+    def memory_map(self, memory_map: bool):
+        self._memory_map = bool(memory_map)
+        for level in self._levels.values():
+            level.memory_map = self._memory_map
+
+    @property
+    def chunk_index(self) -> bool:
+        """
+        Should the chunks in each region file be cached in a sidecar index file in each region directory.
+
+        Listing the chunks in a dimension normally reads the header of every region file.
+        With this enabled only the region files that have changed since the index was written are read.
+        Changes are detected from the modification time, change time and size of each region file, not its header.
+        A region file rewritten with the same size within the timestamp resolution of the file system may be missed.
+        Only enable this if the world is not edited by tools that do that.
+        Defaults to False.
+        """
+        return self._chunk_index
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: bool):
+        self._chunk_index = bool(chunk_index)
+        for level in self._levels.values():
+            level.chunk_index = self._chunk_index
+
+    @property
+    def max_regions(self) -> Optional[int]:
+        """
+        The maximum number of region files to keep loaded in each dimension layer.
+
+        The parsed header of the least recently used region is unloaded when this is exceeded.
+        None for no limit which is the default.
+        Use :meth:`AnvilDimensionManager.region_cache_info` to find a suitable value.
+        """
+        return self._max_regions
+
+    @max_regions.setter
+    def max_regions(self, max_regions: Optional[int]):
+        if max_regions is not None and max_regions < 1:
+            raise ValueError("max_regions must be at least 1")
+        self._max_regions = max_regions
+        for level in self._levels.values():
+            level.max_regions = max_regions
+
+    @property
+    def compression(self) -> RegionFileVersion:
+        """
+        The compression format used when saving chunk data.
+
+        One of :attr:`RegionFileVersion.VERSION_DEFLATE` (the default),
+        :attr:`RegionFileVersion.VERSION_LZ4` or :attr:`RegionFileVersion.VERSION_NONE`.
+        LZ4 is much faster to write but produces larger files.
+        Only Paper and vanilla 1.20.5 and newer can read LZ4 compressed chunks.
+
+        Chunks that are not modified keep their existing compression.
+        """
+        return self._compression
+
+    @compression.setter
+    def compression(self, compression: RegionFileVersion):
+        self._set_compression(compression, self._compression_level)
+
+    @property
+    def compression_level(self) -> int:
+        """
+        The zlib compression level used when saving chunk data. Between 1 (fastest) and 9 (smallest).
+        This is only used when :attr:`compression` is VERSION_DEFLATE. Defaults to 6.
+        """
+        return self._compression_level
+
+    @compression_level.setter
+    def compression_level(self, compression_level: int):
+        self._set_compression(self._compression, compression_level)
+
+    def _set_compression(self, compression: RegionFileVersion, compression_level: int):
+        _validate_compression(compression, compression_level)
+        self._compression = RegionFileVersion(compression)
+        self._compression_level = compression_level
+        for level in self._levels.values():
+            level.set_compression(self._compression, self._compression_level)
+
     @property
     def dimensions(self) -> List[Dimension]:
         return list(self._dimension_name_map.keys())
@@ -230,6 +334,11 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
                 path,
                 mcc=self._mcc_support,
                 layers=("region",) + ("entities",) * (self.version >= 2681),
+                memory_map=self._memory_map,
+                compression=self._compression,
+                compression_level=self._compression_level,
+                chunk_index=self._chunk_index,
+                max_regions=self._max_regions,
             )
             self._dimension_name_map[dimension_name] = relative_dimension_path
             self._bounds[dimension_name] = self._get_dimenion_bounds(dimension_name)
@@ -560,8 +669,23 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
                 yield i / chunk_count
         return changed
 
+    @contextmanager
+    def batch_write(self) -> Iterator[None]:
+        """
+        Buffer the chunk data committed within this context.
+
+        The data is written to the region files when the context exits or when :meth:`save` is called.
+        Each region file is then opened once and its header written once.
+        """
+        with ExitStack() as stack:
+            for level in self._levels.values():
+                stack.enter_context(level.batch())
+            yield
+
     def _save(self):
         """Save the data back to the disk database"""
+        for level in self._levels.values():
+            level.flush()
         os.makedirs(self.path, exist_ok=True)
         self.root_tag.save_to(os.path.join(self.path, "level.dat"))
         # TODO: save other world data
@@ -573,9 +697,19 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
             self._lock.close()
 
     def unload(self):
+        super().unload()
         for level in self._levels.values():
             level.unload()
 
+    def can_copy_compressed_chunks(self, wrapper: FormatWrapper) -> bool:
+        return isinstance(wrapper, AnvilFormat) and wrapper.version == self.version
+
+    def _copy_compressed_chunk(
+        self, cx: int, cz: int, dimension: Dimension, wrapper: AnvilFormat
+    ):
+        data = self._get_dimension(dimension).get_compressed_chunk_data_layers(cx, cz)
+        wrapper._get_dimension(dimension).put_compressed_chunk_data_layers(cx, cz, data)
+
     def _has_dimension(self, dimension: Dimension):
         return (
             dimension in self._dimension_name_map
@@ -619,6 +753,7 @@ class AnvilFormat(WorldFormatWrapper[VersionNumberInt]):
         """
         self._verify_has_lock()
         self._put_raw_chunk_data(cx, cz, {"region": data}, dimension)
+        self._neighbour_cache.invalidate((dimension, cx, cz))
 
     def _put_raw_chunk_data(
         self, cx: int, cz: int, data: ChunkDataType, dimension: Dimension
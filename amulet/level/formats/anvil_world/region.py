@@ -5,7 +5,8 @@ import struct
 import warnings
 import zlib
 import gzip
-from typing import Tuple, Dict, Union, Optional, BinaryIO, Generator
+import mmap
+from typing import Tuple, Dict, Union, Optional, BinaryIO, Generator, List, Iterable
 import numpy
 import time
 import re
@@ -13,6 +14,7 @@ import threading
 import logging
 from enum import IntEnum
 import lz4.block as lz4_block
+import xxhash
 
 from amulet_nbt import NamedTag, load as load_nbt
 
@@ -43,27 +45,109 @@ def _validate_region_coords(cx: int, cz: int):
         raise ValueError("coordinates must be in region space")
 
 
-def _compress(data: NamedTag) -> bytes:
-    """Convert an NBTFile into a compressed bytes object"""
-    data = data.save_to(compressed=False)
-    return b"\x02" + zlib.compress(data)
-
-
 LZ4_HEADER = struct.Struct("<8sBiii")
 LZ4_MAGIC = b"LZ4Block"
 COMPRESSION_METHOD_RAW = 0x10
 COMPRESSION_METHOD_LZ4 = 0x20
+# The defaults used by LZ4BlockOutputStream in lz4-java
+LZ4_BLOCK_SIZE = 0x10000
+LZ4_COMPRESSION_LEVEL = 6  # log2(LZ4_BLOCK_SIZE) - 10
+LZ4_CHECKSUM_SEED = 0x9747B28C
+
+DefaultCompressionLevel = 6
+
+
+def _compress_lz4(data: bytes) -> bytes:
+    """
+    Compress the data in the format written by LZ4BlockOutputStream in lz4-java.
+    This is the format used by Paper and vanilla servers configured to use LZ4.
+    """
+    compressed: list[bytes] = []
+    for index in range(0, len(data), LZ4_BLOCK_SIZE):
+        block = data[index : index + LZ4_BLOCK_SIZE]
+        # lz4-java masks the checksum to 28 bits
+        checksum = xxhash.xxh32_intdigest(block, LZ4_CHECKSUM_SEED) & 0xFFFFFFF
+        compressed_block = lz4_block.compress(block, store_size=False)
+        if len(compressed_block) >= len(block):
+            # the data did not compress so store it raw
+            compression_method = COMPRESSION_METHOD_RAW
+            compressed_block = block
+        else:
+            compression_method = COMPRESSION_METHOD_LZ4
+        compressed.append(
+            LZ4_HEADER.pack(
+                LZ4_MAGIC,
+                compression_method | LZ4_COMPRESSION_LEVEL,
+                len(compressed_block),
+                len(block),
+                checksum,
+            )
+        )
+        compressed.append(compressed_block)
+    # the stream is terminated with an empty block
+    compressed.append(
+        LZ4_HEADER.pack(
+            LZ4_MAGIC, COMPRESSION_METHOD_RAW | LZ4_COMPRESSION_LEVEL, 0, 0, 0
+        )
+    )
+    return b"".join(compressed)
+
+
+def _validate_compression(compression: RegionFileVersion, compression_level: int):
+    """Make sure that the compression settings can be used to write chunk data."""
+    if compression not in (
+        RegionFileVersion.VERSION_DEFLATE,
+        RegionFileVersion.VERSION_LZ4,
+        RegionFileVersion.VERSION_NONE,
+    ):
+        raise ValueError(f"Unsupported compression {compression!r}")
+    if not (1 <= compression_level <= 9):
+        raise ValueError("compression_level must be between 1 and 9")
+
+
+def _compress(
+    data: NamedTag,
+    compression: RegionFileVersion = RegionFileVersion.VERSION_DEFLATE,
+    compression_level: int = DefaultCompressionLevel,
+) -> bytes:
+    """
+    Convert an NBTFile into a compressed bytes object
 
+    :param data: The data to compress.
+    :param compression: The compression format to use.
+    :param compression_level: The zlib compression level. Only used by VERSION_DEFLATE.
+    :return: The compression type byte followed by the compressed data.
+    """
+    data = data.save_to(compressed=False)
+    if compression == RegionFileVersion.VERSION_DEFLATE:
+        return b"\x02" + zlib.compress(data, compression_level)
+    elif compression == RegionFileVersion.VERSION_LZ4:
+        return b"\x04" + _compress_lz4(data)
+    elif compression == RegionFileVersion.VERSION_NONE:
+        return b"\x03" + data
+    raise ValueError(f"Unsupported compression {compression!r}")
 
-def _decompress_lz4(data: bytes) -> bytes:
-    """The LZ4 compression format is a sequence of LZ4 blocks with some header data."""
+
+def _decompress_lz4(data: Union[bytes, memoryview]) -> bytes:
+    """
+    The LZ4 compression format is a sequence of LZ4 blocks with some header data.
+
+    The blocks are read through a memoryview so that the input data is not copied.
+    Raw blocks are not copied until the decompressed blocks are joined.
+    """
     # https://github.com/lz4/lz4-java/blob/7c931bef32d179ec3d3286ee71638b23ebde3459/src/java/net/jpountz/lz4/LZ4BlockInputStream.java#L200
-    decompressed: list[bytes] = []
+    view = memoryview(data)
+    data_length = len(view)
+    decompressed: list[Union[bytes, memoryview]] = []
     index = 0
-    while index < len(data):
-        magic, token, compressed_length, original_length, checksum = LZ4_HEADER.unpack(
-            data[index : index + LZ4_HEADER.size]
-        )
+    while index < data_length:
+        (
+            magic,
+            token,
+            compressed_length,
+            original_length,
+            checksum,
+        ) = LZ4_HEADER.unpack_from(view, index)
         index += LZ4_HEADER.size
         compression_method = token & 0xF0
         if (
@@ -76,26 +160,31 @@ def _decompress_lz4(data: bytes) -> bytes:
                 compression_method == COMPRESSION_METHOD_RAW
                 and original_length != compressed_length
             )
+            or index + compressed_length > data_length
         ):
             raise ValueError("LZ4 compressed block is corrupted.")
+        block = view[index : index + compressed_length]
+        index += compressed_length
         if compression_method == COMPRESSION_METHOD_RAW:
-            decompressed.append(data[index : index + original_length])
-            index += original_length
+            if original_length:
+                decompressed.append(block)
         elif compression_method == COMPRESSION_METHOD_LZ4:
-            decompressed.append(
-                lz4_block.decompress(
-                    data[index : index + compressed_length], original_length
-                )
-            )
-            index += compressed_length
+            decompressed.append(lz4_block.decompress(block, original_length))
         else:
             raise ValueError("LZ4 compressed block is corrupted.")
+    # joining a single bytes object does not copy it
     return b"".join(decompressed)
 
 
-def _decompress(data: bytes) -> NamedTag:
-    """Convert a bytes object into an NBTFile"""
-    compress_type, data = data[0], data[1:]
+def _decompress(data: Union[bytes, memoryview]) -> NamedTag:
+    """
+    Convert a bytes object into an NBTFile
+
+    :param data: The compression type byte followed by the compressed data.
+        A memoryview may be given to avoid copying the data out of a memory map.
+    """
+    # slice through a memoryview to avoid copying the data
+    compress_type, data = data[0], memoryview(data)[1:]
     if compress_type == RegionFileVersion.VERSION_GZIP:
         return load_nbt(gzip.decompress(data), compressed=False)
     elif compress_type == RegionFileVersion.VERSION_DEFLATE:
@@ -137,6 +226,10 @@ class AnvilRegionInterface:
         "_sector_manager",
         "_chunk_locations",
         "_lock",
+        "_memory_map",
+        "_mmap",
+        "_compression",
+        "_compression_level",
     )
 
     # The path to the region file
@@ -159,6 +252,18 @@ class AnvilRegionInterface:
     # A lock to limit access to multiple threads
     _lock: threading.RLock
 
+    # Should chunk data be read through a read-only memory map of the region file
+    _memory_map: bool
+
+    # The memory map of the region file if one is open
+    _mmap: Optional[mmap.mmap]
+
+    # The compression format used when writing chunk data
+    _compression: RegionFileVersion
+
+    # The zlib compression level used when writing chunk data
+    _compression_level: int
+
     @staticmethod
     def get_coords(file_path: str) -> Union[Tuple[None, None], Tuple[int, int]]:
         """Parse a region file path to get the region coordinates."""
@@ -168,18 +273,36 @@ class AnvilRegionInterface:
             return None, None
         return int(match.group("rx")), int(match.group("rz"))
 
-    def __init__(self, file_path: str, create=Depreciated, mcc=False):
+    def __init__(
+        self,
+        file_path: str,
+        create=Depreciated,
+        mcc=False,
+        memory_map=False,
+        compression: RegionFileVersion = RegionFileVersion.VERSION_DEFLATE,
+        compression_level: int = DefaultCompressionLevel,
+    ):
         """
         A class wrapper for a region file
         :param file_path: The file path of the region file
         :param create: bool - if true will create the region from scratch. If false will try loading from disk
+        :param mcc: Is support for .mcc files enabled
+        :param memory_map: If true chunk data will be read through a read-only memory map of the region file
+            that is kept open between reads. If false the file is opened for each read.
+        :param compression: The compression format used when writing chunk data. Reading supports all formats.
+        :param compression_level: The zlib compression level (1-9). Only used by VERSION_DEFLATE.
         """
+        _validate_compression(compression, compression_level)
         self._path = file_path
         self._rx, self._rz = self.get_coords(file_path)
         self._mcc = mcc  # create mcc file if the chunk is greater than 1MiB
         self._sector_manager = None
         self._chunk_locations = {}
         self._lock = threading.RLock()
+        self._memory_map = memory_map
+        self._mmap = None
+        self._compression = RegionFileVersion(compression)
+        self._compression_level = compression_level
 
         if create is not Depreciated:
             warnings.warn(
@@ -201,6 +324,77 @@ class AnvilRegionInterface:
         """The region z coordinate."""
         return self._rz
 
+    @property
+    def memory_map(self) -> bool:
+        """Is chunk data read through a memory map of the region file."""
+        return self._memory_map
+
+    @memory_map.setter
+    def memory_map(self, memory_map: bool):
+        with self._lock:
+            self._memory_map = bool(memory_map)
+            if not self._memory_map:
+                self.close_memory_map()
+
+    @property
+    def compression(self) -> RegionFileVersion:
+        """The compression format used when writing chunk data."""
+        return self._compression
+
+    @property
+    def compression_level(self) -> int:
+        """The zlib compression level used when writing chunk data."""
+        return self._compression_level
+
+    def set_compression(
+        self,
+        compression: RegionFileVersion,
+        compression_level: int = DefaultCompressionLevel,
+    ):
+        """
+        Set the compression used when writing chunk data.
+        Existing chunks are not modified.
+
+        :param compression: The compression format. One of VERSION_DEFLATE, VERSION_LZ4 or VERSION_NONE.
+        :param compression_level: The zlib compression level (1-9). Only used by VERSION_DEFLATE.
+        """
+        _validate_compression(compression, compression_level)
+        with self._lock:
+            self._compression = RegionFileVersion(compression)
+            self._compression_level = compression_level
+
+    def _compress(self, data: NamedTag) -> bytes:
+        """Compress the data using the compression settings of this region."""
+        return _compress(data, self._compression, self._compression_level)
+
+    @property
+    def is_memory_mapped(self) -> bool:
+        """Is there currently a memory map open for the region file."""
+        return self._mmap is not None
+
+    def close_memory_map(self):
+        """Close the memory map of the region file if one is open."""
+        with self._lock:
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    # A view into the map is still alive somewhere.
+                    # The map will be closed when the last view is released.
+                    pass
+                self._mmap = None
+
+    def _get_memory_map(self) -> Optional[mmap.mmap]:
+        """Get the memory map of the region file, opening it if required. None if the file is empty or missing."""
+        if self._mmap is None:
+            if not os.path.isfile(self._path):
+                return None
+            with open(self._path, "rb") as handler:
+                if not os.fstat(handler.fileno()).st_size:
+                    return None
+                self._mmap = mmap.mmap(handler.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
     def get_mcc_path(self, cx: int, cz: int):
         """Get the mcc path. Coordinates are global chunk coordinates."""
         return os.path.join(
@@ -235,29 +429,36 @@ class AnvilRegionInterface:
 
     def all_chunk_coords(self) -> Generator[ChunkCoordinates, None, None]:
         """An iterable of chunk coordinates in world space."""
-        self._load()
-        for cx, cz in list(self._chunk_locations):
+        with self._lock:
+            self._load()
+            chunk_coords = list(self._chunk_locations)
+        for cx, cz in chunk_coords:
             yield cx + self.rx * 32, cz + self.rz * 32
 
     def has_chunk(self, cx: int, cz: int) -> bool:
         """Does the chunk exists. Coords are in region space."""
         _validate_region_coords(cx, cz)
-        self._load()
-        return (cx, cz) in self._chunk_locations
+        with self._lock:
+            self._load()
+            return (cx, cz) in self._chunk_locations
 
     def unload(self):
         """Unload the data if it is not being used."""
         with self._lock:
+            self.close_memory_map()
             self._sector_manager = None
             self._chunk_locations.clear()
 
     def get_data(self, cx: int, cz: int) -> NamedTag:
         _validate_region_coords(cx, cz)
-        self._load()
-        sector = self._chunk_locations.get((cx, cz))
-        if sector is None:
-            raise ChunkDoesNotExist
         with self._lock:
+            # the header must not be unloaded between finding the sector and reading it
+            self._load()
+            sector = self._chunk_locations.get((cx, cz))
+            if sector is None:
+                raise ChunkDoesNotExist
+            if self._memory_map:
+                return self._get_mapped_data(cx, cz, sector)
             os.makedirs(os.path.dirname(self._path), exist_ok=True)
             with open(self._path, "rb+") as handler:
                 _sanitise_file(handler)
@@ -272,83 +473,288 @@ class AnvilRegionInterface:
                 buffer: bytes = handler.read(buffer_size)
 
                 if buffer:
-                    if buffer[0] & 128:  # if the "external" bit is set
-                        if self._mcc:
-                            mcc_path = self.get_mcc_path(cx, cz)
-                            if os.path.isfile(mcc_path):
-                                with open(mcc_path, "rb") as f:
-                                    return _decompress(
-                                        bytes([buffer[0] & 127]) + f.read()
-                                    )
-                    else:
-                        return _decompress(buffer)
+                    return self._decompress_buffer(cx, cz, buffer)
         raise ChunkDoesNotExist
 
-    def _write_data(self, cx: int, cz: int, data: Optional[bytes]):
+    def _read_buffers(
+        self, coords: Iterable[ChunkCoordinates]
+    ) -> List[Tuple[ChunkCoordinates, bytes]]:
+        """
+        Read the compressed data for many chunks in one sequential pass over the file.
+
+        The data is read in the order it appears in the file. Chunks that do not exist are skipped.
+        The returned buffers can be decompressed with :meth:`_decompress_buffer` on any thread.
+
+        :param coords: The chunk coordinates to read in region space.
+        :return: A list of the region space chunk coordinates and compressed data in file order.
+        """
+        coords = list(coords)
+        for cx, cz in coords:
+            _validate_region_coords(cx, cz)
+
+        buffers = []
+        with self._lock:
+            self._load()
+            sectors = []
+            for cx, cz in coords:
+                sector = self._chunk_locations.get((cx, cz))
+                if sector is not None:
+                    sectors.append((sector, (cx, cz)))
+            sectors.sort()
+            if not sectors or not os.path.isfile(self._path):
+                return buffers
+            with open(self._path, "rb") as handler:
+                handler.seek(0, os.SEEK_END)
+                file_size = handler.tell()
+                for sector, chunk_coords in sectors:
+                    if file_size < sector.stop:
+                        # if the sector is beyond the end of the file
+                        continue
+                    handler.seek(sector.start)
+                    buffer_size = struct.unpack(">I", handler.read(4))[0]
+                    buffer = handler.read(buffer_size)
+                    if buffer:
+                        buffers.append((chunk_coords, buffer))
+        return buffers
+
+    def get_compressed_data(self, cx: int, cz: int) -> bytes:
+        """
+        Get the data for a chunk without decompressing it.
+        If the data is stored in an external .mcc file it is read from there.
+
+        :param cx: The chunk x coordinate in region space.
+        :param cz: The chunk z coordinate in region space.
+        :return: The compression type byte followed by the compressed data.
+        """
         _validate_region_coords(cx, cz)
-        if isinstance(data, bytes) and len(data) + 4 > MaxRegionSize and not self._mcc:
-            # if the data is too large and mcc files are not supported then do nothing
-            log.error(
-                f"Could not save data {cx},{cz} in region file {self._path} because it was too large."
-            )
+        buffers = self._read_buffers([(cx, cz)])
+        if buffers:
+            buffer = buffers[0][1]
+            if not buffer[0] & 128:
+                return buffer
+            elif self._mcc:
+                # the data is stored externally
+                mcc_path = self.get_mcc_path(cx, cz)
+                if os.path.isfile(mcc_path):
+                    with open(mcc_path, "rb") as f:
+                        return bytes([buffer[0] & 127]) + f.read()
+        raise ChunkDoesNotExist
+
+    def _get_mapped_data(self, cx: int, cz: int, sector: Sector) -> NamedTag:
+        """Read and decompress the chunk data directly from the memory map without copying it."""
+        region_map = self._get_memory_map()
+        if region_map is None or len(region_map) < sector.stop:
+            # if the sector is beyond the end of the file
+            raise ChunkDoesNotExist
+        with memoryview(region_map) as view:
+            buffer_size = struct.unpack_from(">I", view, sector.start)[0]
+            start = sector.start + 4
+            with view[start : start + buffer_size] as buffer:
+                if buffer:
+                    return self._decompress_buffer(cx, cz, buffer)
+        raise ChunkDoesNotExist
+
+    def _decompress_buffer(
+        self, cx: int, cz: int, buffer: Union[bytes, memoryview]
+    ) -> NamedTag:
+        """Decompress the data stored in a sector. If the data is stored externally the mcc file is read."""
+        if buffer[0] & 128:  # if the "external" bit is set
+            if self._mcc:
+                mcc_path = self.get_mcc_path(cx, cz)
+                if os.path.isfile(mcc_path):
+                    with open(mcc_path, "rb") as f:
+                        return _decompress(bytes([buffer[0] & 127]) + f.read())
+        else:
+            return _decompress(buffer)
+        raise ChunkDoesNotExist
+
+    def _write_data(self, cx: int, cz: int, data: Optional[bytes]):
+        self._write_data_many({(cx, cz): data})
+
+    def _write_data_many(self, chunks: Dict[ChunkCoordinates, Optional[bytes]]):
+        """
+        Write or delete the compressed data for any number of chunks in one pass over the file.
+
+        New sectors are reserved for all the chunks before any data is written.
+        The data is then written in the order it appears in the file and the header is written once.
+        The old sectors are only freed after the header has been written so the
+        old data is never overwritten while the header on disk still points to it.
+
+        :param chunks: A dictionary mapping region space chunk coordinates to the compressed data or None to delete the chunk.
+        """
+        chunks = dict(chunks)
+        for (cx, cz), data in list(chunks.items()):
+            _validate_region_coords(cx, cz)
+            if (
+                isinstance(data, bytes)
+                and len(data) + 4 > MaxRegionSize
+                and not self._mcc
+            ):
+                # if the data is too large and mcc files are not supported then do nothing
+                log.error(
+                    f"Could not save data {cx},{cz} in region file {self._path} because it was too large."
+                )
+                del chunks[(cx, cz)]
+        if not chunks:
             return
 
-        self._load()
         with self._lock:
+            self._load()
+            # the map cannot see the file grow and some platforms do not allow resizing a mapped file
+            self.close_memory_map()
             os.makedirs(os.path.dirname(self._path), exist_ok=True)
             with open(
                 self._path, "rb+" if os.path.isfile(self._path) else "wb+"
             ) as handler:
                 handler: BinaryIO
                 _sanitise_file(handler)
-
-                old_sector = self._chunk_locations.pop((cx, cz), None)
-                if old_sector is not None:
-                    # the chunk used to exist
-                    handler.seek(old_sector.start + 4)
-                    if self._mcc and handler.read(1)[0] & 127:
-                        # if the file is stored externally delete the file
-                        mcc_path = self.get_mcc_path(cx, cz)
-                        if os.path.isfile(mcc_path):
-                            os.remove(mcc_path)
-                    self._sector_manager.free(old_sector)
-
-                location = b"\x00\x00\x00\x00"
-
-                if isinstance(data, bytes):
-                    # find a memory location large enough to fit the data
-                    if len(data) + 4 > MaxRegionSize:
-                        # save externally (if mcc files are not supported the check at the top will filter large files out)
-                        with open(self.get_mcc_path(cx, cz), "wb") as mcc:
-                            mcc.write(data[1:])
-                        data = bytes([data[0] | 128])
-                    data = struct.pack(">I", len(data)) + data
-                    sector_length = (len(data) | 0xFFF) + 1
-                    sector = self._sector_manager.reserve_space(sector_length)
-                    assert sector.start & 0xFFF == 0
-                    self._chunk_locations[(cx, cz)] = sector
-                    location = struct.pack(
-                        ">I", (sector.start >> 4) + (sector_length >> 12)
-                    )
+                handler.seek(0)
+                # the location table followed by the timestamp table
+                header = numpy.frombuffer(
+                    handler.read(SectorSize * 2), dtype=">u4"
+                ).copy()
+
+                old_sectors: List[Sector] = []
+                for cx, cz in chunks:
+                    old_sector = self._chunk_locations.pop((cx, cz), None)
+                    if old_sector is not None:
+                        # the chunk used to exist
+                        handler.seek(old_sector.start + 4)
+                        if self._mcc and handler.read(1)[0] & 127:
+                            # if the file is stored externally delete the file
+                            mcc_path = self.get_mcc_path(cx, cz)
+                            if os.path.isfile(mcc_path):
+                                os.remove(mcc_path)
+                        old_sectors.append(old_sector)
+
+                timestamp = int(time.time())
+                writes: List[Tuple[Sector, bytes]] = []
+                for (cx, cz), data in chunks.items():
+                    index = cx + cz * 32
+                    header[index] = 0
+                    if isinstance(data, bytes):
+                        # find a memory location large enough to fit the data
+                        if len(data) + 4 > MaxRegionSize:
+                            # save externally (if mcc files are not supported the check at the top will filter large files out)
+                            with open(self.get_mcc_path(cx, cz), "wb") as mcc:
+                                mcc.write(data[1:])
+                            data = bytes([data[0] | 128])
+                        data = struct.pack(">I", len(data)) + data
+                        sector_length = (len(data) | 0xFFF) + 1
+                        sector = self._sector_manager.reserve_space(sector_length)
+                        assert sector.start & 0xFFF == 0
+                        self._chunk_locations[(cx, cz)] = sector
+                        header[index] = (sector.start >> 4) + (sector_length >> 12)
+                        writes.append((sector, data))
+                    header[1024 + index] = timestamp
+
+                for sector, data in sorted(writes, key=lambda write: write[0].start):
                     handler.seek(sector.start)
                     handler.write(data)
-                    _sanitise_file(handler)
 
                 # write the header data
-                handler.seek(4 * (cx + cz * 32))
-                handler.write(location)
-                handler.seek(SectorSize - 4, os.SEEK_CUR)
-                handler.write(struct.pack(">I", int(time.time())))
+                handler.seek(0)
+                handler.write(header.tobytes())
+                _sanitise_file(handler)
+
+            for old_sector in old_sectors:
+                self._sector_manager.free(old_sector)
 
     def write_data(self, cx: int, cz: int, data: NamedTag):
         """Write the data to the region file."""
-        bytes_data = _compress(data)
+        bytes_data = self._compress(data)
         self._write_data(cx, cz, bytes_data)
 
+    def write_compressed_data(self, cx: int, cz: int, data: bytes):
+        """
+        Write data that has already been compressed to the region file.
+
+        :param cx: The chunk x coordinate in region space.
+        :param cz: The chunk z coordinate in region space.
+        :param data: The compression type byte followed by the compressed data. Eg from :meth:`get_compressed_data`.
+        """
+        self._write_data(cx, cz, data)
+
+    def write_many(self, chunks: Dict[ChunkCoordinates, Optional[NamedTag]]):
+        """
+        Write and delete the data for many chunks in the region file in one pass.
+
+        This is much faster than calling :meth:`write_data` for each chunk
+        because the file is opened once and the header is only written once.
+
+        :param chunks: A dictionary mapping region space chunk coordinates to the data or None to delete the chunk.
+        """
+        self._write_data_many(
+            {
+                coord: None if data is None else self._compress(data)
+                for coord, data in chunks.items()
+            }
+        )
+
     def delete_data(self, cx: int, cz: int):
         """Delete the data from the region file."""
         self._write_data(cx, cz, None)
 
+    def compact(self) -> int:
+        """
+        Rewrite the region file with the chunks stored contiguously in (x, z) order.
+
+        Sectors that are freed are only reused by chunks that fit in them so heavily edited region files
+        can contain a lot of unused space. This removes that unused space and truncates the file.
+        The chunk data and timestamps are not modified.
+
+        :return: The number of bytes the file shrunk by.
+        """
+        with self._lock:
+            self._load()
+            if not os.path.isfile(self._path):
+                return 0
+            self.close_memory_map()
+            with open(self._path, "rb") as handler:
+                handler.seek(0, os.SEEK_END)
+                old_size = handler.tell()
+                if old_size < SectorSize * 2:
+                    # the header is incomplete so there is nothing to compact
+                    return 0
+                handler.seek(0)
+                # the location table followed by the timestamp table
+                header = numpy.frombuffer(
+                    handler.read(SectorSize * 2), dtype=">u4"
+                ).copy()
+                header[:1024] = 0
+
+                sectors: List[bytes] = []
+                offset = SectorSize * 2
+                for (cx, cz), sector in sorted(self._chunk_locations.items()):
+                    if old_size < sector.stop:
+                        # if the sector is beyond the end of the file the chunk cannot be read
+                        continue
+                    handler.seek(sector.start)
+                    data = handler.read(sector.stop - sector.start)
+                    if len(data) < 4:
+                        continue
+                    buffer_size = struct.unpack_from(">I", data)[0]
+                    if buffer_size + 4 <= len(data):
+                        # drop any sectors beyond the end of the data
+                        data = data[: buffer_size + 4]
+                    sector_length = (len(data) | 0xFFF) + 1
+                    header[cx + cz * 32] = (offset >> 4) + (sector_length >> 12)
+                    sectors.append(data + bytes(sector_length - len(data)))
+                    offset += sector_length
+
+            # write to a temporary file first so that the original is not lost if this fails
+            temp_path = f"{self._path}.tmp"
+            with open(temp_path, "wb") as handler:
+                handler.write(header.tobytes())
+                for data in sectors:
+                    handler.write(data)
+            os.replace(temp_path, self._path)
+
+            # the sector manager and chunk locations are rebuilt from the new file when next needed
+            self._sector_manager = None
+            self._chunk_locations.clear()
+            return max(0, old_size - offset)
+
 
 class BufferedAnvilRegionInterface(AnvilRegionInterface):
     """An interface to an anvil region file with a buffer before writing."""
@@ -367,8 +773,8 @@ class BufferedAnvilRegionInterface(AnvilRegionInterface):
 
     def all_chunk_coords(self) -> Generator[ChunkCoordinates, None, None]:
         """An iterable of chunk coordinates in world space."""
-        self._load()
         with self._lock:
+            self._load()
             chunks = [
                 (cx + self.rx * 32, cz + self.rz * 32)
                 for cx, cz in self._chunk_locations
@@ -410,7 +816,7 @@ class BufferedAnvilRegionInterface(AnvilRegionInterface):
         """
         _validate_region_coords(cx, cz)
         with self._lock:
-            self._buffer[(cx, cz)] = _compress(data)
+            self._buffer[(cx, cz)] = self._compress(data)
 
     def delete_chunk_data(self, cx: int, cz: int):
         """
@@ -424,8 +830,7 @@ class BufferedAnvilRegionInterface(AnvilRegionInterface):
     def save(self):
         """Write the buffered data to the file and clear the buffer."""
         with self._lock:
-            for (cx, cz), data in self._buffer.items():
-                self._write_data(cx, cz, data)
+            self._write_data_many(self._buffer)
             self._buffer.clear()
 
 
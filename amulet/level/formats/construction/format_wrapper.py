@@ -40,8 +40,10 @@ from amulet.api.data_types import (
 from amulet.api.registry import BlockManager
 from amulet.api.wrapper import StructureFormatWrapper
 from amulet.api.chunk import Chunk
+from amulet.api.chunk.blocks import remap_sub_chunk
 from amulet.api.selection import SelectionGroup, SelectionBox
 from amulet.api.errors import ChunkDoesNotExist, ObjectWriteError
+from amulet.utils.world_utils import fast_unique
 
 from .section import ConstructionSection
 from .interface import Construction0Interface, ConstructionInterface
@@ -371,9 +373,9 @@ class ConstructionFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
                     ),
                 }
             )
-            section_index_table: List[Tuple[int, int, int, int, int, int, int, int]] = (
-                []
-            )
+            section_index_table: List[
+                Tuple[int, int, int, int, int, int, int, int]
+            ] = []
             if self._section_version == 0:
                 for section_list in self._chunk_to_section.values():
                     for section in section_list:
@@ -391,9 +393,7 @@ class ConstructionFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
                             _tag["blocks_array_type"] = ByteTag(-1)
                         else:
                             flattened_array = blocks.ravel()
-                            index, flattened_array = numpy.unique(
-                                flattened_array, return_inverse=True
-                            )
+                            index, flattened_array = fast_unique(flattened_array)
                             section_palette = numpy.array(
                                 section_palette, dtype=object
                             )[index]
@@ -438,7 +438,7 @@ class ConstructionFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         pass
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(
         self, dimension: Optional[Dimension] = None
@@ -482,7 +482,9 @@ class ConstructionFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         if len(palette.blocks) != len(chunk_palette):
             # if a blockstate was defined twice
             for cy in chunk.blocks.sub_chunks:
-                chunk.blocks.add_sub_chunk(cy, lut[chunk.blocks.get_sub_chunk(cy)])
+                chunk.blocks.add_sub_chunk(
+                    cy, remap_sub_chunk(lut, chunk.blocks.get_compact_sub_chunk(cy))
+                )
         return chunk
 
     def _delete_chunk(self, cx: int, cz: int, dimension: Optional[Dimension] = None):
@@ -5,6 +5,7 @@ from amulet_nbt import IntTag
 from amulet.api.wrapper import Interface
 from .section import ConstructionSection
 from amulet.api.chunk import Chunk
+from amulet.api.chunk.blocks import remap_sub_chunk
 from amulet.api.block import Block
 from amulet.api.selection import SelectionBox
 from amulet.level.loader import Translators
@@ -69,7 +70,7 @@ class ConstructionInterface(Interface):
         inverse: numpy.ndarray
         for cy in chunk.blocks.sub_chunks:
             chunk.blocks.add_sub_chunk(
-                cy, inverse[chunk.blocks.get_sub_chunk(cy)].astype(numpy.uint32)
+                cy, remap_sub_chunk(inverse, chunk.blocks.get_compact_sub_chunk(cy))
             )
         return chunk, np_palette
 
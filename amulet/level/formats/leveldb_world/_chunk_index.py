@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import logging
+from typing import Dict, Optional, List, Set
+
+import numpy
+
+from amulet.api.data_types import ChunkCoordinates
+
+log = logging.getLogger(__name__)
+
+ChunkIndexFileName = "amulet_chunk_index.npz"
+
+InternalDimension = Optional[int]
+
+
+def get_database_key(db_path: str) -> Optional[str]:
+    """
+    Get a string identifying the state of a closed leveldb database.
+
+    This is made from the name of the current manifest and the name, size and modification time of the manifest and log files.
+    Any write to the database changes at least one of these.
+
+    :param db_path: The path to the leveldb directory.
+    :return: The key or None if the database could not be read.
+    """
+    try:
+        with open(os.path.join(db_path, "CURRENT")) as f:
+            manifest = f.read().strip()
+        parts = [manifest]
+        for name in sorted(os.listdir(db_path)):
+            if name == manifest or name.endswith(".log"):
+                stat = os.stat(os.path.join(db_path, name))
+                parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    except OSError:
+        return None
+    return ";".join(parts)
+
+
+def _dimension_name(dimension: InternalDimension) -> str:
+    return "chunks" if dimension is None else f"chunks_{dimension}"
+
+
+class ChunkIndex:
+    """
+    A sidecar file caching which chunks exist in each dimension of a leveldb database.
+
+    The index is stored with the key of the database (see :func:`get_database_key`) when it was saved.
+    It is only used if the database has not changed since so the index never needs to be invalidated manually.
+    """
+
+    def __init__(self, path: str, key: Optional[str]):
+        """
+        :param path: The path of the index file.
+        :param key: The key of the database before it was opened.
+        """
+        self._path = path
+        self._key = key
+        self._dimensions: Optional[List[InternalDimension]] = None
+        self._chunks: Optional[Dict[InternalDimension, Set[ChunkCoordinates]]] = None
+
+    @property
+    def path(self) -> str:
+        """The path of the index file."""
+        return self._path
+
+    def _load(self) -> Dict[InternalDimension, Set[ChunkCoordinates]]:
+        if self._chunks is None:
+            self._chunks = {}
+            if self._key is not None and os.path.isfile(self._path):
+                try:
+                    with numpy.load(self._path) as data:
+                        if str(data["key"]) != self._key:
+                            # The database has changed since the index was written.
+                            return self._chunks
+                        if data["has_dimensions"]:
+                            # The overworld is stored as None which cannot go in an int array.
+                            self._dimensions = [None] + data["dimensions"].tolist()
+                        for name in data.files:
+                            if name == "chunks":
+                                dimension = None
+                            elif name.startswith("chunks_"):
+                                dimension = int(name[7:])
+                            else:
+                                continue
+                            self._chunks[dimension] = set(
+                                map(tuple, data[name].tolist())
+                            )
+                except Exception as e:
+                    # The index is only a cache. It will be rebuilt.
+                    log.warning(f"Could not load chunk index {self._path}. {e}")
+                    self._dimensions = None
+                    self._chunks = {}
+        return self._chunks
+
+    @property
+    def dimensions(self) -> Optional[List[InternalDimension]]:
+        """All the dimensions in the database or None if they have not been indexed."""
+        self._load()
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, dimensions: List[InternalDimension]):
+        self._load()
+        self._dimensions = list(dimensions)
+
+    def get(self, dimension: InternalDimension) -> Optional[Set[ChunkCoordinates]]:
+        """
+        Get the chunks in a dimension.
+
+        :param dimension: The internal dimension.
+        :return: The chunk coordinates or None if the dimension has not been indexed.
+        """
+        return self._load().get(dimension)
+
+    def set(self, dimension: InternalDimension, chunks: Set[ChunkCoordinates]):
+        """
+        Set the chunks in a dimension.
+        The set is stored by reference so later changes to it are saved.
+
+        :param dimension: The internal dimension.
+        :param chunks: The chunk coordinates in the dimension.
+        """
+        self._load()[dimension] = chunks
+
+    def save(self, key: Optional[str]):
+        """
+        Write the index to disk.
+        This must be called after the database has been closed.
+
+        :param key: The key of the closed database.
+        """
+        if key is None or self._chunks is None:
+            return
+        if not os.path.isdir(os.path.dirname(self._path)):
+            return
+        arrays = {
+            _dimension_name(dimension): numpy.array(
+                sorted(chunks), dtype=numpy.int32
+            ).reshape(-1, 2)
+            for dimension, chunks in self._chunks.items()
+        }
+        temp_path = f"{self._path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                numpy.savez(
+                    f,
+                    key=numpy.array(key),
+                    has_dimensions=numpy.array(self._dimensions is not None),
+                    dimensions=numpy.array(
+                        [
+                            dimension
+                            for dimension in self._dimensions or ()
+                            if dimension is not None
+                        ],
+                        dtype=numpy.int64,
+                    ),
+                    **arrays,
+                )
+            os.replace(temp_path, self._path)
+        except OSError as e:
+            log.warning(f"Could not save chunk index {self._path}. {e}")
+        else:
+            self._key = key
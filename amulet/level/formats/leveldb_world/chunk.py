@@ -1,4 +1,4 @@
-from typing import Dict, Union, Iterable, Tuple, List, Optional
+from typing import Dict, Union, Iterable, Tuple, List, Optional, Callable
 from amulet_nbt import NamedTag
 
 
@@ -13,6 +13,28 @@ class ChunkData(Dict[bytes, Optional[bytes]]):
         super().__init__(chunk_data)
         self._entity_actor = list(entity_actor)
         self._unknown_actor = list(unknown_actor)
+        self._actor_loader: Optional[
+            Callable[[], Tuple[Iterable[NamedTag], Iterable[NamedTag]]]
+        ] = None
+
+    def defer_actors(
+        self, loader: Callable[[], Tuple[Iterable[NamedTag], Iterable[NamedTag]]]
+    ):
+        """
+        Set a function to get the actors from when they are first accessed.
+        The actors it returns are added to the end of :attr:`entity_actor` and :attr:`unknown_actor`.
+
+        :param loader: A function returning the entity actors and unknown actors.
+        """
+        self._actor_loader = loader
+
+    def _load_actors(self):
+        if self._actor_loader is not None:
+            loader = self._actor_loader
+            self._actor_loader = None
+            entity_actor, unknown_actor = loader()
+            self._entity_actor.extend(entity_actor)
+            self._unknown_actor.extend(unknown_actor)
 
     @property
     def entity_actor(self) -> List[NamedTag]:
@@ -20,6 +42,7 @@ class ChunkData(Dict[bytes, Optional[bytes]]):
         A list of entity actor data.
         UniqueID is stripped out. internalComponents is stripped out if there is no other data.
         """
+        self._load_actors()
         return self._entity_actor
 
     @property
@@ -30,4 +53,5 @@ class ChunkData(Dict[bytes, Optional[bytes]]):
         internalComponents.{StorageKeyComponent}.StorageKey is replaced with a blank string.
         All keys matching this pattern will get replaced with the real storage key when saving (at least one must exist)
         """
+        self._load_actors()
         return self._unknown_actor
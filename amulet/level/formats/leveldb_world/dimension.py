@@ -8,10 +8,13 @@ from typing import (
     List,
     TYPE_CHECKING,
     Tuple,
+    Iterable,
+    Hashable,
+    Iterator,
 )
 from threading import RLock
 import logging
-from contextlib import suppress
+from contextlib import contextmanager
 
 from amulet_nbt import (
     NamedTag,
@@ -28,6 +31,7 @@ from amulet.api.errors import ChunkDoesNotExist
 from amulet.api.data_types import ChunkCoordinates
 from leveldb import LevelDB
 from .chunk import ChunkData
+from ._chunk_index import ChunkIndex
 
 if TYPE_CHECKING:
     from .format import LevelDBFormat
@@ -36,6 +40,20 @@ log = logging.getLogger(__name__)
 
 InternalDimension = Optional[int]
 
+# The key extensions that mark a chunk as existing. "," and "v"
+ChunkMarkerKeys = (b",", b"v")
+
+# The approximate number of bytes buffered in a write transaction before it is written.
+DefaultMaxBatchSize = 4 * 1024 * 1024
+
+
+def _key_successor(key: bytes) -> Optional[bytes]:
+    """Get the smallest key that is larger than all keys starting with key. None if there is no such key."""
+    key = key.rstrip(b"\xff")
+    if key:
+        return key[:-1] + bytes((key[-1] + 1,))
+    return None
+
 
 class ActorCounter:
     _lock: RLock
@@ -89,31 +107,188 @@ class LevelDBDimensionManager:
     # A class to keep track of unique actor ids
     _actor_counter: Optional[ActorCounter]
 
-    def __init__(self, level: LevelDBFormat):
+    def __init__(
+        self,
+        level: LevelDBFormat,
+        chunk_index: Optional[ChunkIndex] = None,
+        defer_actors: bool = False,
+        max_batch_size: int = DefaultMaxBatchSize,
+    ):
         """
         :param level: The leveldb format to read data from
+        :param chunk_index: An optional index to load the chunks in each dimension from and store them in.
+        :param defer_actors: If True the actors in a chunk are read when the chunk is read but are only parsed when first accessed.
+        :param max_batch_size: The approximate number of bytes to buffer in a write transaction before writing it.
         """
         self._db = level.level_db
+        self._defer_actors = defer_actors
         self._actor_counter = ActorCounter.from_level(level)
-        # self._levels format Dict[level, Dict[Tuple[cx, cz], List[Tuple[full_key, key_extension]]]]
+        self._chunk_index = chunk_index
+        # The dimensions found in the database. Vanilla dimensions are always included.
+        # Other dimensions are only found when this is first accessed.
+        self._dimensions: Optional[List[InternalDimension]] = None
+        # The chunks in each dimension. A dimension is only scanned when it is first accessed.
         self._levels: Dict[InternalDimension, Set[ChunkCoordinates]] = {}
         self._lock = RLock()
 
-        self.register_dimension(None)  # overworld
-        self.register_dimension(1)  # the nether
-        self.register_dimension(2)  # the end
+        self._max_batch_size = max_batch_size
+        self._batch_depth = 0
+        # Data waiting to be written in a write transaction. None means the key is to be deleted.
+        self._pending: Dict[bytes, Optional[bytes]] = {}
+        self._pending_size = 0
+        # The key prefixes of the chunks with data in the transaction.
+        self._pending_chunks: Set[bytes] = set()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Buffer the chunk writes and deletions made within this context.
 
-        for key in self._db.keys():
-            if 9 <= len(key) <= 10 and key[8] in [44, 118]:  # "," "v"
-                self._add_chunk(key)
+        The buffered data is written in atomic batches of about :attr:`max_batch_size` bytes.
+        The data for one chunk is never split between batches.
+        The remaining data is written when the outermost context exits or when :meth:`flush` is called.
+        Reading a chunk with buffered data writes the buffer first.
+        Data read directly from the database will not include the buffered data.
+
+        >>> with dimension_manager.transaction():
+        >>>     for cx, cz, chunk_data in chunks:
+        >>>         dimension_manager.put_chunk_data(cx, cz, chunk_data, dimension)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def flush(self):
+        """Write all data buffered in the write transaction to the database."""
+        with self._lock:
+            if self._pending:
+                pending = self._pending
+                self._pending = {}
+                self._pending_size = 0
+                self._pending_chunks.clear()
+                self._db.putBatch(pending)
+
+    @property
+    def max_batch_size(self) -> int:
+        """The approximate number of bytes to buffer in a write transaction before writing it."""
+        return self._max_batch_size
+
+    @max_batch_size.setter
+    def max_batch_size(self, max_batch_size: int):
+        if max_batch_size < 0:
+            raise ValueError("max_batch_size must be positive")
+        self._max_batch_size = max_batch_size
+
+    def _write(self, batch: Dict[bytes, Optional[bytes]], chunk_prefix: bytes):
+        """
+        Write or buffer the data for one chunk.
+
+        :param batch: A dictionary of keys to values. None values delete the key.
+        :param chunk_prefix: The key prefix of the chunk.
+        """
+        with self._lock:
+            if self._batch_depth:
+                self._pending.update(batch)
+                self._pending_chunks.add(chunk_prefix)
+                self._pending_size += sum(
+                    len(key) + (0 if val is None else len(val))
+                    for key, val in batch.items()
+                )
+                if self._pending_size >= self._max_batch_size:
+                    self.flush()
+            elif batch:
+                self._db.putBatch(batch)
+
+    def _get(self, key: bytes) -> bytes:
+        """Get the value of a key including buffered data. Raises KeyError if the key does not exist."""
+        if key in self._pending:
+            val = self._pending[key]
+            if val is None:
+                raise KeyError(key)
+            return val
+        return self._db.get(key)
+
+    def _flush_chunk(self, chunk_prefix: bytes):
+        """Write the buffered data if it contains data for the chunk."""
+        if chunk_prefix in self._pending_chunks:
+            self.flush()
+
+    @property
+    def defer_actors(self) -> bool:
+        """
+        Should actor data only be parsed when :attr:`ChunkData.entity_actor` or :attr:`ChunkData.unknown_actor` is accessed.
+
+        Decoding a chunk accesses both so this only helps code that reads the raw chunk data from this class.
+        """
+        return self._defer_actors
 
-            elif 13 <= len(key) <= 14 and key[12] in [44, 118]:  # "," "v"
-                self._add_chunk(key, has_level=True)
+    @defer_actors.setter
+    def defer_actors(self, defer_actors: bool):
+        self._defer_actors = bool(defer_actors)
+
+    @property
+    def chunk_index(self) -> Optional[ChunkIndex]:
+        """The index the chunks in each dimension are cached in."""
+        return self._chunk_index
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: Optional[ChunkIndex]):
+        with self._lock:
+            self._chunk_index = chunk_index
+            if chunk_index is not None:
+                for dimension, chunks in self._levels.items():
+                    chunk_index.set(dimension, chunks)
+                if self._dimensions is not None:
+                    chunk_index.dimensions = self._dimensions
 
     @property
     def dimensions(self) -> List[InternalDimension]:
-        """A list of all the levels contained in the world"""
-        return list(self._levels)
+        """
+        A list of all the levels contained in the world.
+
+        Finding dimensions other than the vanilla dimensions requires reading every chunk key in the database.
+        This is only done the first time this is accessed.
+        """
+        with self._lock:
+            if self._dimensions is None:
+                if self._chunk_index is not None:
+                    self._dimensions = self._chunk_index.dimensions
+                if self._dimensions is None:
+                    self._dimensions = self._find_dimensions()
+                    if self._chunk_index is not None:
+                        self._chunk_index.dimensions = self._dimensions
+            return list(self._dimensions)
+
+    def _find_dimensions(self) -> List[InternalDimension]:
+        self.flush()
+        dimensions = [None, 1, 2]  # overworld, the nether, the end
+        found = set(dimensions)
+        iterator = self._db.new_iterator()
+        iterator.seek_to_first()
+        while iterator.valid():
+            key = iterator.key()
+            if len(key) >= 12:
+                dimension_prefix = key[:12]
+                dimension = struct.unpack("<i", key[8:12])[0]
+                if dimension not in found and self._has_chunk_marker(
+                    iterator, dimension_prefix
+                ):
+                    found.add(dimension)
+                    dimensions.append(dimension)
+                # Skip the other keys in this chunk and dimension
+                next_key = _key_successor(dimension_prefix)
+                if next_key is None:
+                    break
+                iterator.seek(next_key)
+            else:
+                iterator.next()
+        return dimensions
 
     def register_dimension(self, dimension: InternalDimension):
         """
@@ -123,14 +298,70 @@ class LevelDBDimensionManager:
         :return:
         """
         with self._lock:
-            if dimension not in self._levels:
-                self._levels[dimension] = set()
+            dimensions = self.dimensions
+            if dimension not in dimensions:
+                self._dimensions.append(dimension)
+                if self._chunk_index is not None:
+                    self._chunk_index.dimensions = self._dimensions
+
+    def _get_chunks(self, dimension: InternalDimension) -> Set[ChunkCoordinates]:
+        """Get the chunks in a dimension. The dimension is scanned the first time it is requested."""
+        chunks = self._levels.get(dimension)
+        if chunks is None:
+            with self._lock:
+                chunks = self._levels.get(dimension)
+                if chunks is None:
+                    if self._chunk_index is not None:
+                        chunks = self._chunk_index.get(dimension)
+                    if chunks is None:
+                        chunks = self._find_chunks(dimension)
+                        if self._chunk_index is not None:
+                            self._chunk_index.set(dimension, chunks)
+                    self._levels[dimension] = chunks
+        return chunks
+
+    def _find_chunks(self, dimension: InternalDimension) -> Set[ChunkCoordinates]:
+        """
+        Find all the chunks in a dimension.
+
+        Chunk keys start with the chunk coordinates so the keys for one dimension are not contiguous.
+        Rather than reading every key this jumps between chunk coordinate prefixes and only checks for the chunk marker key.
+        """
+        self.flush()
+        dimension_suffix = b"" if dimension is None else struct.pack("<i", dimension)
+        chunks = set()
+        iterator = self._db.new_iterator()
+        iterator.seek_to_first()
+        while iterator.valid():
+            key = iterator.key()
+            if len(key) < 8:
+                iterator.next()
+                continue
+            coord_prefix = key[:8]
+            if self._has_chunk_marker(iterator, coord_prefix + dimension_suffix):
+                chunks.add(struct.unpack("<ii", coord_prefix))
+            # Skip all other keys for this chunk coordinate
+            next_key = _key_successor(coord_prefix)
+            if next_key is None:
+                break
+            iterator.seek(next_key)
+        return chunks
+
+    @staticmethod
+    def _has_chunk_marker(iterator, prefix: bytes) -> bool:
+        """Does a chunk marker key exist for the prefix. This moves the iterator."""
+        prefix_len = len(prefix)
+        for marker in ChunkMarkerKeys:
+            marker_key = prefix + marker
+            iterator.seek(marker_key)
+            if iterator.valid():
+                key = iterator.key()
+                if key.startswith(marker_key) and len(key) <= prefix_len + 2:
+                    return True
+        return False
 
     def all_chunk_coords(self, dimension: InternalDimension) -> Set[ChunkCoordinates]:
-        if dimension in self._levels:
-            return self._levels[dimension]
-        else:
-            return set()
+        return self._get_chunks(dimension)
 
     @staticmethod
     def _get_key(cx: int, cz: int, dimension: InternalDimension) -> bytes:
@@ -140,17 +371,13 @@ class LevelDBDimensionManager:
             return struct.pack("<iii", cx, cz, dimension)
 
     def has_chunk(self, cx: int, cz: int, dimension: InternalDimension) -> bool:
-        return dimension in self._levels and (cx, cz) in self._levels[dimension]
-
-    def _add_chunk(self, key_: bytes, has_level: bool = False):
-        if has_level:
-            cx, cz, level = struct.unpack("<iii", key_[:12])
-        else:
-            cx, cz = struct.unpack("<ii", key_[:8])
-            level = None
-        if level not in self._levels:
-            self.register_dimension(level)
-        self._levels[level].add((cx, cz))
+        chunks = self._levels.get(dimension)
+        if chunks is None:
+            # The dimension has not been scanned. Look up the chunk directly.
+            prefix = self._get_key(cx, cz, dimension)
+            self._flush_chunk(prefix)
+            return self._has_chunk_marker(self._db.new_iterator(), prefix)
+        return (cx, cz) in chunks
 
     def get_chunk_data(
         self, cx: int, cz: int, dimension: InternalDimension
@@ -161,6 +388,7 @@ class LevelDBDimensionManager:
         """
         if self.has_chunk(cx, cz, dimension):
             prefix = self._get_key(cx, cz, dimension)
+            self._flush_chunk(prefix)
             prefix_len = len(prefix)
             iter_end = prefix + b"\xff\xff\xff\xff"
 
@@ -169,88 +397,287 @@ class LevelDBDimensionManager:
                 if key[:prefix_len] == prefix and len(key) <= prefix_len + 2:
                     chunk_data[key[prefix_len:]] = val
 
-            with suppress(KeyError):
-                digp_key = b"digp" + prefix
-                digp = self._db.get(digp_key)
-                chunk_data[b"digp"] = (
-                    b""  # The presence of this key signals to the put method that this should be created and written
-                )
-                for i in range(0, (len(digp) // 8) * 8, 8):
-                    actor_key = b"actorprefix" + digp[i : i + 8]
-                    try:
-                        actor_bytes = self._db.get(actor_key)
-                        actor = load_nbt(
-                            actor_bytes,
-                            little_endian=True,
-                            string_decoder=utf8_escape_decoder,
-                        )
-                        actor_tag = actor.compound
-                    except KeyError:
-                        log.error(f"Could not find actor {actor_key}. Skipping.")
-                    except NBTLoadError:
-                        log.error(f"Failed to parse actor {actor_key}. Skipping.")
-                    else:
-                        actor_tag.pop("UniqueID", None)
-                        internal_components = actor_tag.setdefault(
-                            "internalComponents",
-                            CompoundTag(
-                                EntityStorageKeyComponent=CompoundTag(
-                                    StorageKey=StringTag()
-                                )
-                            ),
-                        )  # 717
-                        if (
-                            isinstance(internal_components, CompoundTag)
-                            and internal_components
-                        ):
-                            if "EntityStorageKeyComponent" in internal_components:
-                                # it is an entity
-                                entity_component = internal_components[
-                                    "EntityStorageKeyComponent"
-                                ]
-                                if isinstance(entity_component, CompoundTag):
-                                    # delete the storage key component
-                                    if isinstance(
-                                        entity_component.get("StorageKey"), StringTag
-                                    ):
-                                        del entity_component["StorageKey"]
-                                    # if there is no other data then delete internalComponents
-                                    if (
-                                        len(entity_component) == 0
-                                        and len(internal_components) == 1
-                                    ):
-                                        del actor_tag["internalComponents"]
-                                    else:
-                                        log.warning(
-                                            f"Extra components found {repr(entity_component)}"
-                                        )
-                                else:
-                                    log.warning(
-                                        f"Unrecognised EntityStorageKeyComponent type {repr(entity_component)}"
-                                    )
-
-                                chunk_data.entity_actor.append(actor)
-                            else:
-                                # it is an unknown actor
-                                log.warning(
-                                    f"Actor {actor_key} has an unknown format. Please report this to a developer {repr(internal_components)}"
-                                )
-                                for k, v in internal_components.items():
-                                    if isinstance(v, CompoundTag) and isinstance(
-                                        v.get("StorageKey"), StringTag
-                                    ):
-                                        v["StorageKey"] = StringTag()
-                                chunk_data.unknown_actor.append(actor)
-                        else:
-                            log.error(
-                                f"internalComponents was not valid for actor {actor_key}. Skipping."
-                            )
-                            continue
+            try:
+                digp = self._get(b"digp" + prefix)
+            except KeyError:
+                pass
+            else:
+                # The presence of this key signals to the put method that this should be created and written
+                chunk_data[b"digp"] = b""
+                self._set_actors(chunk_data, self.read_actors({None: digp})[None])
 
             return chunk_data
         else:
             raise ChunkDoesNotExist
 
+    def get_chunk_data_many(
+        self,
+        dimension: InternalDimension,
+        coords: Optional[Iterable[ChunkCoordinates]] = None,
+    ) -> Iterator[Tuple[ChunkCoordinates, ChunkData]]:
+        """
+        Get the raw data for many chunks in one sorted pass over the database.
+
+        If coords is None every key in the database is visited once in sorted order and the keys are grouped by chunk.
+        If coords is given the iterator seeks to each chunk in sorted key order.
+        The actors for each group of chunks are read in one sorted pass after the chunk data.
+        Chunks that do not exist are skipped.
+
+        >>> for (cx, cz), chunk_data in dimension_manager.get_chunk_data_many(None):
+        >>>     ...
+
+        :param dimension: The dimension to get the chunks from.
+        :param coords: The chunks to get. If None all chunks in the dimension are returned.
+        :return: An iterator of chunk coordinates and the data for that chunk in database key order.
+        """
+        self.flush()
+        chunks: List[Tuple[ChunkCoordinates, ChunkData]] = []
+        for chunk_coords, chunk_data in self._iter_chunk_keys(dimension, coords):
+            chunks.append((chunk_coords, chunk_data))
+            if len(chunks) >= 256:
+                self._load_chunk_actors(chunks, dimension)
+                yield from chunks
+                chunks.clear()
+        self._load_chunk_actors(chunks, dimension)
+        yield from chunks
+
+    def _iter_chunk_keys(
+        self,
+        dimension: InternalDimension,
+        coords: Optional[Iterable[ChunkCoordinates]],
+    ) -> Iterator[Tuple[ChunkCoordinates, ChunkData]]:
+        """Group the chunk keys by chunk. Does not include actors."""
+        dimension_suffix = b"" if dimension is None else struct.pack("<i", dimension)
+        prefix_len = 8 + len(dimension_suffix)
+        iterator = self._db.new_iterator()
+
+        def get_chunk_data(keys: Dict[bytes, bytes]) -> Optional[ChunkData]:
+            # The chunk only exists if it has a marker key
+            if any(key[0] in (44, 118) for key in keys):  # "," "v"
+                return ChunkData(keys)
+            return None
+
+        if coords is None:
+            # Walk the whole database. All keys starting with the same chunk coordinates are contiguous.
+            iterator.seek_to_first()
+            coord_prefix = None
+            chunk_keys: Dict[bytes, bytes] = {}
+            while iterator.valid():
+                key = iterator.key()
+                if (
+                    prefix_len < len(key) <= prefix_len + 2
+                    and key[8:prefix_len] == dimension_suffix
+                ):
+                    if key[:8] != coord_prefix:
+                        if chunk_keys:
+                            chunk_data = get_chunk_data(chunk_keys)
+                            if chunk_data is not None:
+                                yield struct.unpack("<ii", coord_prefix), chunk_data
+                        coord_prefix = key[:8]
+                        chunk_keys = {}
+                    chunk_keys[key[prefix_len:]] = iterator.value()
+                iterator.next()
+            if chunk_keys:
+                chunk_data = get_chunk_data(chunk_keys)
+                if chunk_data is not None:
+                    yield struct.unpack("<ii", coord_prefix), chunk_data
+        else:
+            prefixes = sorted(
+                {
+                    self._get_key(cx, cz, dimension): (cx, cz) for cx, cz in coords
+                }.items()
+            )
+            for prefix, chunk_coords in prefixes:
+                iterator.seek(prefix)
+                chunk_keys = {}
+                while iterator.valid():
+                    key = iterator.key()
+                    if not key.startswith(prefix):
+                        break
+                    if len(key) <= prefix_len + 2:
+                        chunk_keys[key[prefix_len:]] = iterator.value()
+                    iterator.next()
+                chunk_data = get_chunk_data(chunk_keys)
+                if chunk_data is not None:
+                    yield chunk_coords, chunk_data
+
+    def _load_chunk_actors(
+        self,
+        chunks: List[Tuple[ChunkCoordinates, ChunkData]],
+        dimension: InternalDimension,
+    ):
+        """Read the actors for many chunks and add them to the chunk data."""
+        chunk_datas = dict(chunks)
+        digp_keys = {
+            b"digp" + self._get_key(cx, cz, dimension): (cx, cz)
+            for cx, cz in chunk_datas
+        }
+        digps = {
+            digp_keys[digp_key]: digp
+            for digp_key, digp in self._get_many(digp_keys).items()
+        }
+        for chunk_coords, raw_actors in self.read_actors(digps).items():
+            chunk_data = chunk_datas[chunk_coords]
+            # The presence of this key signals to the put method that this should be created and written
+            chunk_data[b"digp"] = b""
+            self._set_actors(chunk_data, raw_actors)
+
+    def _set_actors(self, chunk_data: ChunkData, raw_actors: List[Tuple[bytes, bytes]]):
+        if self._defer_actors:
+            chunk_data.defer_actors(lambda: self.parse_actors(raw_actors))
+        else:
+            entity_actor, unknown_actor = self.parse_actors(raw_actors)
+            chunk_data.entity_actor.extend(entity_actor)
+            chunk_data.unknown_actor.extend(unknown_actor)
+
+    def _get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Get the values of many keys in one sorted pass over the database.
+        Keys that do not exist are not included in the returned dictionary.
+        """
+        values: Dict[bytes, bytes] = {}
+        keys = set(keys)
+        if self._pending:
+            # Use the buffered data where it exists
+            for key in [key for key in keys if key in self._pending]:
+                keys.remove(key)
+                val = self._pending[key]
+                if val is not None:
+                    values[key] = val
+        iterator = self._db.new_iterator()
+        for key in sorted(keys):
+            # Keys written together are often stored next to each other.
+            # Only seek if the next key is not the one we want.
+            if not (iterator.valid() and iterator.key() == key):
+                iterator.seek(key)
+            if iterator.valid() and iterator.key() == key:
+                values[key] = iterator.value()
+                iterator.next()
+        return values
+
+    def get_actors_many(
+        self, coords: Iterable[ChunkCoordinates], dimension: InternalDimension
+    ) -> Dict[ChunkCoordinates, Tuple[List[NamedTag], List[NamedTag]]]:
+        """
+        Get the actors in many chunks.
+
+        The digp keys and then the actor keys for all the chunks are each read in one sorted pass over the database.
+
+        :param coords: The chunk coordinates to get the actors from.
+        :param dimension: The dimension the chunks are in.
+        :return: A dictionary mapping chunk coordinates to the entity actors and unknown actors in that chunk.
+            Chunks without a digp key are not included.
+        """
+        digp_keys = {
+            b"digp" + self._get_key(cx, cz, dimension): (cx, cz) for cx, cz in coords
+        }
+        digps = {
+            digp_keys[key]: digp for key, digp in self._get_many(digp_keys).items()
+        }
+        return {
+            chunk_coords: self.parse_actors(raw_actors)
+            for chunk_coords, raw_actors in self.read_actors(digps).items()
+        }
+
+    def read_actors(
+        self, digps: Dict[Hashable, bytes]
+    ) -> Dict[Hashable, List[Tuple[bytes, bytes]]]:
+        """
+        Read the raw actor data pointed to by one or more digp values.
+
+        The actor keys from all the digp values are read in one sorted pass over the database.
+
+        :param digps: A dictionary mapping an arbitrary key (eg chunk coordinates) to the value of a digp key.
+        :return: A dictionary mapping the same keys to a list of actor keys and raw actor data in digp order.
+            Actors that do not exist are skipped.
+        """
+        actor_keys: Dict[Hashable, List[bytes]] = {
+            owner: [
+                b"actorprefix" + digp[i : i + 8]
+                for i in range(0, (len(digp) // 8) * 8, 8)
+            ]
+            for owner, digp in digps.items()
+        }
+        values = self._get_many(key for keys in actor_keys.values() for key in keys)
+
+        actors = {}
+        for owner, keys in actor_keys.items():
+            owner_actors = actors[owner] = []
+            for actor_key in keys:
+                if actor_key in values:
+                    owner_actors.append((actor_key, values[actor_key]))
+                else:
+                    log.error(f"Could not find actor {actor_key}. Skipping.")
+        return actors
+
+    @staticmethod
+    def parse_actors(
+        raw_actors: Iterable[Tuple[bytes, bytes]]
+    ) -> Tuple[List[NamedTag], List[NamedTag]]:
+        """
+        Parse raw actor data as returned by :meth:`read_actors`.
+
+        :param raw_actors: An iterable of actor key and raw actor data.
+        :return: The entity actors and unknown actors. See :class:`ChunkData` for details.
+        """
+        entity_actor = []
+        unknown_actor = []
+        for actor_key, actor_bytes in raw_actors:
+            try:
+                actor = load_nbt(
+                    actor_bytes,
+                    little_endian=True,
+                    string_decoder=utf8_escape_decoder,
+                )
+                actor_tag = actor.compound
+            except NBTLoadError:
+                log.error(f"Failed to parse actor {actor_key}. Skipping.")
+                continue
+            actor_tag.pop("UniqueID", None)
+            internal_components = actor_tag.setdefault(
+                "internalComponents",
+                CompoundTag(
+                    EntityStorageKeyComponent=CompoundTag(StorageKey=StringTag())
+                ),
+            )  # 717
+            if isinstance(internal_components, CompoundTag) and internal_components:
+                if "EntityStorageKeyComponent" in internal_components:
+                    # it is an entity
+                    entity_component = internal_components["EntityStorageKeyComponent"]
+                    if isinstance(entity_component, CompoundTag):
+                        # delete the storage key component
+                        if isinstance(entity_component.get("StorageKey"), StringTag):
+                            del entity_component["StorageKey"]
+                        # if there is no other data then delete internalComponents
+                        if len(entity_component) == 0 and len(internal_components) == 1:
+                            del actor_tag["internalComponents"]
+                        else:
+                            log.warning(
+                                f"Extra components found {repr(entity_component)}"
+                            )
+                    else:
+                        log.warning(
+                            f"Unrecognised EntityStorageKeyComponent type {repr(entity_component)}"
+                        )
+
+                    entity_actor.append(actor)
+                else:
+                    # it is an unknown actor
+                    log.warning(
+                        f"Actor {actor_key} has an unknown format. Please report this to a developer {repr(internal_components)}"
+                    )
+                    for k, v in internal_components.items():
+                        if isinstance(v, CompoundTag) and isinstance(
+                            v.get("StorageKey"), StringTag
+                        ):
+                            v["StorageKey"] = StringTag()
+                    unknown_actor.append(actor)
+            else:
+                log.error(
+                    f"internalComponents was not valid for actor {actor_key}. Skipping."
+                )
+        return entity_actor, unknown_actor
+
     def put_chunk_data(
         self,
         cx: int,
@@ -260,7 +687,8 @@ class LevelDBDimensionManager:
     ):
         """pass data to the region file class"""
         # get the region key
-        self._levels[dimension].add((cx, cz))
+        if dimension in self._levels:
+            self._levels[dimension].add((cx, cz))
         key_prefix = self._get_key(cx, cz, dimension)
 
         batch = {}
@@ -269,13 +697,13 @@ class LevelDBDimensionManager:
             # if writing the digp key we need to delete all actors pointed to by the old digp key otherwise there will be memory leaks
             digp_key = b"digp" + key_prefix
             try:
-                old_digp = self._db.get(digp_key)
+                old_digp = self._get(digp_key)
             except KeyError:
                 pass
             else:
                 for i in range(0, len(old_digp) // 8 * 8, 8):
                     actor_key = b"actorprefix" + old_digp[i : i + 8]
-                    self._db.delete(actor_key)
+                    batch[actor_key] = None
 
             digp = []
 
@@ -347,39 +775,32 @@ class LevelDBDimensionManager:
             batch[digp_key] = b"".join(digp)
 
         for key, val in chunk_data.items():
-            key = key_prefix + key
-            if val is None:
-                self._db.delete(key)
-            else:
-                batch[key] = val
-        if batch:
-            self._db.putBatch(batch)
+            batch[key_prefix + key] = val
+        self._write(batch, key_prefix)
 
     def delete_chunk(self, cx: int, cz: int, dimension: InternalDimension):
-        if dimension not in self._levels:
-            return  # dimension does not exists so chunk cannot
-
         if not self.has_chunk(cx, cz, dimension):
             return  # chunk does not exists
 
         prefix = self._get_key(cx, cz, dimension)
+        self._flush_chunk(prefix)
         prefix_len = len(prefix)
         iter_end = prefix + b"\xff\xff\xff\xff"
-        keys = []
+        batch: Dict[bytes, Optional[bytes]] = {}
         for key, _ in self._db.iterate(prefix, iter_end):
             if key[:prefix_len] == prefix and len(key) <= prefix_len + 2:
-                keys.append(key)
+                batch[key] = None
 
         try:
-            digp = self._db.get(b"digp" + prefix)
+            digp = self._get(b"digp" + prefix)
         except KeyError:
             pass
         else:
-            self._db.delete(b"digp" + prefix)
+            batch[b"digp" + prefix] = None
             for i in range(0, len(digp) // 8 * 8, 8):
                 actor_key = b"actorprefix" + digp[i : i + 8]
-                self._db.delete(actor_key)
+                batch[actor_key] = None
 
-        self._levels[dimension].remove((cx, cz))
-        for key in keys:
-            self._db.delete(key)
+        if dimension in self._levels:
+            self._levels[dimension].discard((cx, cz))
+        self._write(batch, prefix)
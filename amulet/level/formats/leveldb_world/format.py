@@ -3,11 +3,23 @@ from __future__ import annotations
 import os
 import struct
 import warnings
-from typing import Tuple, Dict, Union, Optional, List, BinaryIO, Iterable, Any
+from typing import (
+    Tuple,
+    Dict,
+    Union,
+    Optional,
+    List,
+    BinaryIO,
+    Iterable,
+    Any,
+    Iterator,
+)
 from io import BytesIO
+from contextlib import contextmanager
 import shutil
 import traceback
 import time
+import logging
 
 from amulet_nbt import (
     AbstractBaseTag,
@@ -50,8 +62,11 @@ from .interface.chunk.leveldb_chunk_versions import (
     game_to_chunk_version,
 )
 from .dimension import LevelDBDimensionManager, ChunkData, InternalDimension
+from ._chunk_index import ChunkIndex, ChunkIndexFileName, get_database_key
 from .interface.chunk import BaseLevelDBInterface, get_interface
 
+log = logging.getLogger(__name__)
+
 OVERWORLD = "minecraft:overworld"
 THE_NETHER = "minecraft:the_nether"
 THE_END = "minecraft:the_end"
@@ -179,6 +194,9 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
         self._db = None
         self._dimension_manager = None
         self._dimension_to_internal: dict[Dimension, InternalDimension] = {}
+        self._custom_dimensions_registered = False
+        self._chunk_index = False
+        self._database_key: Optional[str] = None
         self._shallow_load()
 
     def _shallow_load(self):
@@ -264,8 +282,58 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
     @property
     def dimensions(self) -> List[Dimension]:
         self._verify_has_lock()
+        self._register_custom_dimensions()
         return list(self._dimension_to_internal)
 
+    def _register_custom_dimensions(self):
+        """
+        Give all dimensions found in the database that are not already known an entry.
+        Finding them requires reading all chunk keys so this is only done when a non-vanilla dimension is requested.
+        """
+        if self._custom_dimensions_registered or self._dimension_manager is None:
+            return
+        self._custom_dimensions_registered = True
+        known_dimensions = set(self._dimension_to_internal.values())
+        for internal_dimension in self._dimension_manager.dimensions:
+            if internal_dimension not in known_dimensions:
+                dimension_name = f"DIM{internal_dimension}"
+                self._dimension_to_internal[dimension_name] = internal_dimension
+                self._bounds[dimension_name] = DefaultSelection
+
+    def _has_dimension(self, dimension: Dimension) -> bool:
+        if dimension not in self._dimension_to_internal:
+            self._register_custom_dimensions()
+        return dimension in self._dimension_to_internal
+
+    def bounds(self, dimension: Dimension) -> SelectionGroup:
+        if dimension not in self._bounds:
+            self._register_custom_dimensions()
+        return super().bounds(dimension)
+
+    @property
+    def chunk_index(self) -> bool:
+        """
+        Should the chunks in each dimension be cached in a sidecar index file in the world directory.
+
+        Listing the chunks in a dimension normally requires walking the keys in the database.
+        With this enabled the index written when the world was last closed is used if the database has not changed since.
+        Defaults to False.
+        """
+        return self._chunk_index
+
+    @chunk_index.setter
+    def chunk_index(self, chunk_index: bool):
+        self._chunk_index = bool(chunk_index)
+        if self._dimension_manager is not None:
+            self._dimension_manager.chunk_index = self._create_chunk_index()
+
+    def _create_chunk_index(self) -> Optional[ChunkIndex]:
+        if self._chunk_index:
+            return ChunkIndex(
+                os.path.join(self.path, ChunkIndexFileName), self._database_key
+            )
+        return None
+
     # def register_dimension(
     #     self, dimension_internal: int, dimension_name: Optional[Dimension] = None
     # ):
@@ -346,8 +414,13 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
         except:
             pass
         try:
+            # Opening the database modifies it so the key must be found first.
+            self._database_key = get_database_key(os.path.join(self.path, "db"))
             self._db = LevelDB(os.path.join(self.path, "db"))
-            self._dimension_manager = LevelDBDimensionManager(self)
+            self._dimension_manager = LevelDBDimensionManager(
+                self, self._create_chunk_index()
+            )
+            self._custom_dimensions_registered = False
             self._is_open = True
             self._has_lock = True
 
@@ -443,13 +516,7 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
                             )
                         )
 
-            # Give all other dimensions found an entry
-            known_dimensions = set(self._dimension_to_internal.values())
-            for internal_dimension in self._dimension_manager.dimensions:
-                if internal_dimension not in known_dimensions:
-                    dimension_name = f"DIM{internal_dimension}"
-                    self._dimension_to_internal[dimension_name] = internal_dimension
-                    self._bounds[dimension_name] = DefaultSelection
+            # Other dimensions found in the database are registered when first requested.
 
         except LevelDBEncrypted as e:
             self._is_open = self._has_lock = False
@@ -514,37 +581,55 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
             return True  # TODO: implement a check to ensure access to the database
         return False
 
+    @contextmanager
+    def batch_write(self) -> Iterator[None]:
+        """
+        Buffer the chunk data committed within this context in a write transaction.
+
+        The data is written to the database in size bounded atomic batches
+        and the remainder when the context exits or when :meth:`save` is called.
+        """
+        with self._dimension_manager.transaction():
+            yield
+
     def _save(self):
+        if self._dimension_manager is not None:
+            self._dimension_manager.flush()
         os.makedirs(self.path, exist_ok=True)
         self.root_tag.save()
         with open(os.path.join(self.path, "levelname.txt"), "w", encoding="utf-8") as f:
             f.write(self.level_name)
 
     def _close(self):
+        self._dimension_manager.flush()
         self._db.close()
         self._db = None
+        if self._dimension_manager.chunk_index is not None:
+            self._dimension_manager.chunk_index.save(
+                get_database_key(os.path.join(self.path, "db"))
+            )
         self._dimension_manager = None
         self._actor_counter = None
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(self, dimension: Dimension) -> Iterable[ChunkCoordinates]:
         self._verify_has_lock()
-        if dimension in self._dimension_to_internal:
+        if self._has_dimension(dimension):
             yield from self._dimension_manager.all_chunk_coords(
                 self._dimension_to_internal[dimension]
             )
 
     def has_chunk(self, cx: int, cz: int, dimension: Dimension) -> bool:
-        if dimension in self._dimension_to_internal:
+        if self._has_dimension(dimension):
             return self._dimension_manager.has_chunk(
                 cx, cz, self._dimension_to_internal[dimension]
             )
         return False
 
     def _delete_chunk(self, cx: int, cz: int, dimension: Dimension):
-        if dimension in self._dimension_to_internal:
+        if self._has_dimension(dimension):
             self._dimension_manager.delete_chunk(
                 cx, cz, self._dimension_to_internal[dimension]
             )
@@ -552,6 +637,7 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
     def _put_raw_chunk_data(
         self, cx: int, cz: int, data: ChunkData, dimension: Dimension
     ):
+        self._has_dimension(dimension)
         self._dimension_manager.put_chunk_data(
             cx, cz, data, self._dimension_to_internal[dimension]
         )
@@ -565,12 +651,44 @@ class LevelDBFormat(WorldFormatWrapper[VersionNumberTuple]):
         :param dimension: The dimension to load the data from.
         :return: The raw chunk data.
         """
-        if dimension not in self._dimension_to_internal:
+        if not self._has_dimension(dimension):
             raise ChunkDoesNotExist
         return self._dimension_manager.get_chunk_data(
             cx, cz, self._dimension_to_internal[dimension]
         )
 
+    def load_chunks(
+        self,
+        dimension: Dimension,
+        coords: Optional[Iterable[ChunkCoordinates]] = None,
+        lazy: bool = False,
+    ) -> Iterator[Chunk]:
+        """
+        Load many chunks reading the database in one sorted pass.
+
+        This is much faster than calling :meth:`load_chunk` for each chunk when processing a large part of a dimension.
+        The chunks are yielded in database key order.
+        Chunks that do not exist are skipped. Chunks that fail to load are logged and skipped.
+
+        >>> for chunk in level_wrapper.load_chunks("minecraft:overworld"):
+        >>>     ...
+
+        :param dimension: The dimension to load the chunks from.
+        :param coords: The chunks to load. If None all chunks in the dimension are loaded.
+        :param lazy: If True, only translate each chunk when its contents are first accessed. See :meth:`load_chunk`.
+        :return: An iterator of universal chunks.
+        """
+        self._verify_has_lock()
+        if not self._has_dimension(dimension):
+            return
+        for (cx, cz), chunk_data in self._dimension_manager.get_chunk_data_many(
+            self._dimension_to_internal[dimension], coords
+        ):
+            try:
+                yield self._load_raw_chunk(cx, cz, dimension, chunk_data, lazy=lazy)
+            except Exception:
+                log.error(f"Error loading chunk {cx} {cz} {dimension}", exc_info=True)
+
     def all_player_ids(self) -> Iterable[str]:
         """
         Returns a generator of all player ids that are present in the level
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Tuple, Dict, List, Union, Iterable, Optional, TYPE_CHECKING, Any
 import struct
 import logging
+from functools import lru_cache
 
 import numpy
 from amulet_nbt import (
@@ -12,7 +13,6 @@ from amulet_nbt import (
     CompoundTag,
     NamedTag,
     load as load_nbt,
-    load_many,
     ReadContext,
     utf8_escape_decoder,
     utf8_escape_encoder,
@@ -21,8 +21,10 @@ from amulet_nbt import (
 import amulet
 from amulet.api.block import Block
 from amulet.api.chunk import Chunk, StatusFormats
+from amulet.api.chunk.blocks import uniform_sub_chunk, remap_sub_chunk
 
 from amulet.utils.numpy_helpers import brute_sort_objects
+from amulet.utils.lru_cache import LRUCache, LRUCacheInfo
 from amulet.utils.world_utils import fast_unique, from_nibble_array
 from amulet.api.wrapper import Interface
 from amulet.api.data_types import (
@@ -46,9 +48,92 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=None)
+def _packed_shifts(bits_per_value: int) -> numpy.ndarray:
+    """The bit offset of each value within a 32 bit word of a packed array."""
+    shifts = numpy.arange(
+        0, 32 // bits_per_value * bits_per_value, bits_per_value, dtype=numpy.uint32
+    )
+    shifts.setflags(write=False)
+    return shifts
+
+
 # This is here to scale a 4x array to a 16x array. This can be removed when we natively support 16x array
 _scale_grid = tuple(numpy.meshgrid(*[numpy.arange(16) // 4] * 3, indexing="ij"))
 
+PaletteEntry = Tuple[Optional[int], Block]
+
+# The block used when a sub-chunk palette is empty
+_AirPaletteEntry: PaletteEntry = (
+    17694723,
+    Block(namespace="minecraft", base_name="air"),
+)
+
+
+# Statistics about a :class:`PaletteCache`.
+PaletteCacheInfo = LRUCacheInfo
+
+
+class PaletteCache(LRUCache[bytes, PaletteEntry]):
+    """
+    A thread safe, bounded cache of unpacked sub-chunk palette entries.
+
+    Most sub-chunks in a world contain the same few blocks so the raw bytes of most palette entries repeat.
+    The key is the raw little endian NBT of the palette entry and the value is the game version and :class:`Block` it unpacks to.
+    The least recently used entries are removed when the cache is full.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: The maximum number of palette entries to cache.
+        """
+        super().__init__(max_size)
+
+
+# The palette cache shared by all the leveldb interfaces.
+palette_cache = PaletteCache()
+
+# The payload size of the fixed size NBT tags by tag id.
+_NBTPayloadSizes = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+# The item size of the NBT array tags by tag id.
+_NBTArrayItemSizes = {7: 1, 11: 4, 12: 8}
+
+
+def _nbt_payload_end(data: bytes, offset: int, tag_id: int) -> int:
+    """Find the end of a little endian NBT payload without parsing it."""
+    size = _NBTPayloadSizes.get(tag_id)
+    if size is not None:
+        return offset + size
+    elif tag_id == 10:
+        while True:
+            child_id = data[offset]
+            if child_id == 0:
+                return offset + 1
+            name_length = struct.unpack_from("<H", data, offset + 1)[0]
+            offset = _nbt_payload_end(data, offset + 3 + name_length, child_id)
+    elif tag_id == 8:
+        return offset + 2 + struct.unpack_from("<H", data, offset)[0]
+    elif tag_id == 9:
+        child_id, length = struct.unpack_from("<bi", data, offset)
+        offset += 5
+        size = _NBTPayloadSizes.get(child_id)
+        if size is not None:
+            return offset + size * length
+        for _ in range(length):
+            offset = _nbt_payload_end(data, offset, child_id)
+        return offset
+    size = _NBTArrayItemSizes.get(tag_id)
+    if size is not None:
+        return offset + 4 + size * struct.unpack_from("<i", data, offset)[0]
+    raise ValueError(f"Unknown NBT tag id {tag_id}")
+
+
+def _named_tag_end(data: bytes, offset: int) -> int:
+    """Find the end of the little endian named NBT tag starting at offset without parsing it."""
+    name_length = struct.unpack_from("<H", data, offset + 1)[0]
+    return _nbt_payload_end(data, offset + 3 + name_length, data[offset])
+
 
 class BaseLevelDBInterface(Interface):
     chunk_version: int = None
@@ -425,38 +510,13 @@ class BaseLevelDBInterface(Interface):
                         palette_data,
                         data,
                     ) = self._load_palette_blocks(data)
-                    palette_data_out: List[Tuple[Optional[int], Block]] = []
-                    for block in palette_data:
-                        block = block.compound
-                        *namespace_, base_name = block["name"].py_str.split(":", 1)
-                        namespace = namespace_[0] if namespace_ else "minecraft"
-                        if "version" in block:
-                            version: Optional[int] = block.get_int("version").py_int
-                        else:
-                            version = None
-
-                        if "states" in block or "val" not in block:  # 1.13 format
-                            properties = block.get_compound(
-                                "states", CompoundTag()
-                            ).py_dict
-                            if version is None:
-                                version = 17694720  # 1, 14, 0, 0
-                        else:
-                            properties = {"block_data": IntTag(block["val"].py_int)}
-                        palette_data_out.append(
-                            (
-                                version,
-                                Block(
-                                    namespace=namespace,
-                                    base_name=base_name,
-                                    properties=properties,
-                                ),
-                            )
-                        )
-                    sub_chunk_palette.append(palette_data_out)
+                    sub_chunk_palette.append(palette_data)
 
                 if storage_count == 1:
-                    blocks[cy] = sub_chunk_blocks[:, :, :, 0] + len(palette)
+                    if len(sub_chunk_palette[0]) == 1:
+                        blocks[cy] = uniform_sub_chunk(len(palette))
+                    else:
+                        blocks[cy] = sub_chunk_blocks[:, :, :, 0] + len(palette)
                     palette += [(val,) for val in sub_chunk_palette[0]]
                 elif storage_count > 1:
                     # we have two or more storages so need to find the unique block combinations and merge them together
@@ -494,7 +554,7 @@ class BaseLevelDBInterface(Interface):
 
         numpy_palette, lut = brute_sort_objects(palette)
         for cy in blocks.keys():
-            blocks[cy] = lut[blocks[cy]]
+            blocks[cy] = remap_sub_chunk(lut, blocks[cy])
 
         return blocks, numpy_palette
 
@@ -531,7 +591,7 @@ class BaseLevelDBInterface(Interface):
         chunk = {}
         for cy in range(16):
             if cy in blocks:
-                palette_index, sub_chunk = fast_unique(blocks.get_sub_chunk(cy))
+                palette_index, sub_chunk = fast_unique(blocks.get_compact_sub_chunk(cy))
                 sub_chunk_palette = list(palette[palette_index])
                 chunk[cy] = b"\x01" + self._save_palette_subchunk(
                     sub_chunk.ravel(), sub_chunk_palette
@@ -561,20 +621,14 @@ class BaseLevelDBInterface(Interface):
                 -4096 // values_per_word
             )  # Ceiling divide is inverted floor divide
 
-            arr = numpy.packbits(
-                numpy.pad(
-                    numpy.unpackbits(
-                        numpy.frombuffer(
-                            bytes(reversed(data[: 4 * word_count])), dtype="uint8"
-                        )
-                    )
-                    .reshape(-1, 32)[:, -values_per_word * bits_per_value :]
-                    .reshape(-1, bits_per_value)[-4096:, :],
-                    [(0, 0), (16 - bits_per_value, 0)],
-                    "constant",
-                )
-            ).view(dtype=">i2")[::-1]
-            arr = arr.reshape((16, 16, 16)).swapaxes(1, 2)
+            # Each little endian word stores values_per_word values starting from the low bits.
+            # The high bits are padding if the bits per value does not divide 32.
+            words = numpy.frombuffer(data, dtype="<u4", count=word_count)
+            arr = (
+                (words[:, None] >> _packed_shifts(bits_per_value))
+                & numpy.uint32((1 << bits_per_value) - 1)
+            ).ravel()[:4096]
+            arr = arr.astype(">i2").reshape((16, 16, 16)).swapaxes(1, 2)
             data = data[4 * word_count :]
         else:
             arr = None
@@ -644,15 +698,11 @@ class BaseLevelDBInterface(Interface):
         for cy in range(floor_cy, floor_cy + 25):
             if cy in chunk.biomes:
                 arr = chunk.biomes.get_section(cy)
-                palette, arr_uniq = numpy.unique(arr, return_inverse=True)
+                palette, arr_uniq = fast_unique(arr)
                 if len(palette) == 1:
                     d2d.append(b"\x01")
                 else:
-                    d2d.append(
-                        self._encode_packed_array(
-                            arr_uniq.reshape(arr.shape)[_scale_grid]
-                        )
-                    )
+                    d2d.append(self._encode_packed_array(arr_uniq[_scale_grid]))
                     d2d.append(struct.pack("<I", len(palette)))
                 d2d.append(palette.astype("<i4").tobytes())
             else:
@@ -663,39 +713,59 @@ class BaseLevelDBInterface(Interface):
     def _load_palette_blocks(
         self,
         data: bytes,
-    ) -> Tuple[numpy.ndarray, List[NamedTag], bytes]:
+    ) -> Tuple[numpy.ndarray, List[PaletteEntry], bytes]:
         data, _, blocks = self._decode_packed_array(data)
         if blocks is None:
-            blocks = numpy.zeros((16, 16, 16), dtype=numpy.int16)
+            blocks = uniform_sub_chunk(0)
             palette_len = 1
         else:
             palette_len, data = struct.unpack("<I", data[:4])[0], data[4:]
 
         if palette_len:
-            read_context = ReadContext()
-            palette = load_many(
-                data,
-                compressed=False,
-                count=palette_len,
-                little_endian=True,
-                read_context=read_context,
-            )
-            data = data[read_context.offset :]
+            palette = []
+            offset = 0
+            for _ in range(palette_len):
+                # Only the length of the entry is found. The NBT is only parsed if it is not cached.
+                end = _named_tag_end(data, offset)
+                key = data[offset:end]
+                entry = palette_cache.get(key)
+                if entry is None:
+                    block = load_nbt(key, compressed=False, little_endian=True)
+                    entry = self._unpack_palette_entry(block.compound)
+                    palette_cache.set(key, entry)
+                palette.append(entry)
+                offset = end
+            data = data[offset:]
         else:
-            palette = [
-                NamedTag(
-                    CompoundTag(
-                        {
-                            "name": StringTag("minecraft:air"),
-                            "states": CompoundTag(),
-                            "version": IntTag(17694723),
-                        }
-                    )
-                )
-            ]
+            palette = [_AirPaletteEntry]
 
         return blocks, palette, data
 
+    @staticmethod
+    def _unpack_palette_entry(block: CompoundTag) -> PaletteEntry:
+        """Convert a sub-chunk palette entry to the game version and :class:`Block`."""
+        *namespace_, base_name = block["name"].py_str.split(":", 1)
+        namespace = namespace_[0] if namespace_ else "minecraft"
+        if "version" in block:
+            version: Optional[int] = block.get_int("version").py_int
+        else:
+            version = None
+
+        if "states" in block or "val" not in block:  # 1.13 format
+            properties = block.get_compound("states", CompoundTag()).py_dict
+            if version is None:
+                version = 17694720  # 1, 14, 0, 0
+        else:
+            properties = {"block_data": IntTag(block["val"].py_int)}
+        return (
+            version,
+            Block(
+                namespace=namespace,
+                base_name=base_name,
+                properties=properties,
+            ),
+        )
+
     @staticmethod
     def _encode_packed_array(arr: numpy.ndarray, min_bit_size=1) -> bytes:
         bits_per_value = max(int(numpy.amax(arr)).bit_length(), min_bit_size)
@@ -710,29 +780,17 @@ class BaseLevelDBInterface(Interface):
             -4096 // values_per_word
         )  # Ceiling divide is inverted floor divide
 
-        arr = arr.swapaxes(1, 2).ravel()
-        packed_arr = bytes(
-            reversed(
-                numpy.packbits(
-                    numpy.pad(
-                        numpy.pad(
-                            numpy.unpackbits(
-                                numpy.ascontiguousarray(arr[::-1], dtype=">i").view(
-                                    dtype="uint8"
-                                )
-                            ).reshape(4096, -1)[:, -bits_per_value:],
-                            [(word_count * values_per_word - 4096, 0), (0, 0)],
-                            "constant",
-                        ).reshape(-1, values_per_word * bits_per_value),
-                        [(0, 0), (32 - values_per_word * bits_per_value, 0)],
-                        "constant",
-                    )
-                )
-                .view(dtype=">i4")
-                .tobytes()
-            )
+        arr = arr.swapaxes(1, 2).ravel().astype(numpy.uint32) & numpy.uint32(
+            (1 << bits_per_value) - 1
+        )
+        if word_count * values_per_word != 4096:
+            # pad the last word
+            arr = numpy.pad(arr, (0, word_count * values_per_word - 4096), "constant")
+        words = numpy.bitwise_or.reduce(
+            arr.reshape(word_count, values_per_word) << _packed_shifts(bits_per_value),
+            axis=1,
         )
-        return header + packed_arr
+        return header + words.astype("<u4").tobytes()
 
     def _save_palette_subchunk(
         self, blocks: numpy.ndarray, palette: List[NamedTag]
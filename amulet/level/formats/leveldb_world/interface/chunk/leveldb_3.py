@@ -37,7 +37,7 @@ class LevelDB3Interface(LevelDB2Interface):
         for cy in range(16):
             if cy in blocks:
                 block_sub_array = palette[
-                    numpy.transpose(blocks.get_sub_chunk(cy), (0, 2, 1)).ravel()
+                    numpy.transpose(blocks.get_compact_sub_chunk(cy), (0, 2, 1)).ravel()
                 ]
                 if not numpy.any(block_sub_array):
                     sections[cy] = None
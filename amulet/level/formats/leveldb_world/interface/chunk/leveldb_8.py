@@ -14,6 +14,7 @@ from amulet_nbt import NamedTag, CompoundTag, StringTag, IntTag, ShortTag
 from amulet.api.block import Block, PropertyDataTypes
 
 from amulet.utils.numpy_helpers import brute_sort_objects_no_hash
+from amulet.utils.world_utils import fast_unique
 from amulet.api.data_types import (
     AnyNDArray,
     VersionIdentifierTuple,
@@ -111,8 +112,8 @@ class LevelDB8Interface(LevelDB7Interface):
             palette_depth = numpy.array([len(block) for block in packed_palette])
             for cy in range(min_y, max_y):
                 if cy in blocks:
-                    palette_index, sub_chunk = numpy.unique(
-                        blocks.get_sub_chunk(cy), return_inverse=True
+                    palette_index, sub_chunk = fast_unique(
+                        blocks.get_compact_sub_chunk(cy)
                     )
                     sub_chunk_palette: List[Tuple[NamedTag, ...]] = [
                         packed_palette[i] for i in palette_index
@@ -26,6 +26,7 @@ from amulet.api.chunk import Chunk
 from amulet.api.selection import SelectionGroup, SelectionBox
 from amulet.api.errors import ChunkDoesNotExist, ObjectWriteError
 from amulet.utils.numpy_helpers import brute_sort_objects_no_hash
+from amulet.utils.world_utils import fast_unique
 
 from .chunk import MCStructureChunk
 from .interface import MCStructureInterface
@@ -126,12 +127,30 @@ class MCStructureFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
                     selection.min, subtract=True
                 ).slice
                 chunk_blocks_: numpy.ndarray = blocks_array[array_slice]
-                chunk_palette_indexes, chunk_blocks = numpy.unique(
-                    chunk_blocks_.reshape((chunk_blocks_.shape[0], -1)).T,
-                    return_inverse=True,
-                    axis=0,
-                )
-                chunk_blocks = chunk_blocks.reshape(chunk_blocks_.shape[1:])
+                layer_count = chunk_blocks_.shape[0]
+                radix = len(block_palette) + 1
+                if radix**layer_count < 2**63:
+                    # Combine the palette index in each layer into one integer.
+                    # This sorts the same as the rows so it can be compacted with fast_unique.
+                    keys = numpy.zeros(chunk_blocks_.shape[1:], dtype=numpy.int64)
+                    for layer in chunk_blocks_:
+                        keys = keys * radix + layer + 1
+                    unique_keys, chunk_blocks = fast_unique(keys)
+                    chunk_palette_indexes = numpy.empty(
+                        (len(unique_keys), layer_count), dtype=numpy.int64
+                    )
+                    for layer_index in range(layer_count - 1, -1, -1):
+                        unique_keys, chunk_palette_indexes[:, layer_index] = divmod(
+                            unique_keys, radix
+                        )
+                    chunk_palette_indexes -= 1
+                else:
+                    chunk_palette_indexes, chunk_blocks = numpy.unique(
+                        chunk_blocks_.reshape((layer_count, -1)).T,
+                        return_inverse=True,
+                        axis=0,
+                    )
+                    chunk_blocks = chunk_blocks.reshape(chunk_blocks_.shape[1:])
 
                 chunk_palette = numpy.empty(len(chunk_palette_indexes), dtype=object)
                 for palette_index, indexes in enumerate(chunk_palette_indexes):
@@ -339,7 +358,7 @@ class MCStructureFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         self._chunks.clear()
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(
         self, dimension: Optional[Dimension] = None
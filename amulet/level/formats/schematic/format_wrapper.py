@@ -35,6 +35,7 @@ from amulet.api.data_types import (
 from amulet.api.registry import BlockManager
 from amulet.api.wrapper import StructureFormatWrapper
 from amulet.api.chunk import Chunk
+from amulet.api.chunk.blocks import remap_sub_chunk
 from amulet.api.selection import SelectionBox, SelectionGroup
 from amulet.api.errors import ObjectReadError, ObjectWriteError, ChunkDoesNotExist
 from .interface import (
@@ -273,7 +274,7 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         self._chunks.clear()
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(
         self, dimension: Optional[Dimension] = None
@@ -339,7 +340,9 @@ class SchematicFormatWrapper(StructureFormatWrapper[VersionNumberTuple]):
         if len(palette.blocks) != len(chunk_palette):
             # if a blockstate was defined twice
             for cy in chunk.blocks.sub_chunks:
-                chunk.blocks.add_sub_chunk(cy, lut[chunk.blocks.get_sub_chunk(cy)])
+                chunk.blocks.add_sub_chunk(
+                    cy, remap_sub_chunk(lut, chunk.blocks.get_compact_sub_chunk(cy))
+                )
 
         return chunk
 
@@ -5,6 +5,7 @@ from amulet.api.wrapper import Interface, EntityIDType, EntityCoordType
 from .chunk import SchematicChunk
 from amulet.api.chunk import Chunk
 from amulet.api.selection import SelectionBox
+from amulet.utils.world_utils import fast_unique
 from amulet.level.loader import Translators
 from amulet.api.data_types import (
     AnyNDArray,
@@ -41,10 +42,7 @@ class SchematicInterface(Interface):
         :return: Chunk object in version-specific format, along with the block_palette for that chunk.
         """
         chunk = Chunk(cx, cz)
-        block_palette, blocks = numpy.unique(
-            (data.blocks << 4) + (data.data & 0xF), return_inverse=True
-        )
-        blocks = blocks.reshape(data.blocks.shape)
+        block_palette, blocks = fast_unique((data.blocks << 4) + (data.data & 0xF))
         palette = numpy.empty(len(block_palette) + 1, dtype=object)
         palette[0] = (0, 0)
         for index, block_num in enumerate(block_palette):
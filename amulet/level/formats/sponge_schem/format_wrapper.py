@@ -28,6 +28,7 @@ from amulet.api.selection import SelectionGroup, SelectionBox
 from amulet.api.errors import ChunkDoesNotExist, ObjectWriteError, ObjectReadError
 from amulet.api.block import Block
 from amulet.utils.numpy_helpers import brute_sort_objects_no_hash
+from amulet.utils.world_utils import fast_unique
 
 from .chunk import SpongeSchemChunk
 from .interface import SpongeSchemInterface
@@ -189,11 +190,7 @@ class SpongeSchemFormatWrapper(StructureFormatWrapper[VersionNumberInt]):
                     selection.min, subtract=True
                 ).slice
                 chunk_blocks_: numpy.ndarray = blocks_array[array_slice]
-                chunk_palette_indexes, chunk_blocks = numpy.unique(
-                    chunk_blocks_,
-                    return_inverse=True,
-                )
-                chunk_blocks = chunk_blocks.reshape(chunk_blocks_.shape)
+                chunk_palette_indexes, chunk_blocks = fast_unique(chunk_blocks_)
 
                 chunk_palette = numpy.empty(len(chunk_palette_indexes), dtype=object)
                 for palette_index, index in enumerate(chunk_palette_indexes):
@@ -322,7 +319,9 @@ class SpongeSchemFormatWrapper(StructureFormatWrapper[VersionNumberInt]):
                 raise SpongeSchemWriteError(
                     "The structure is too large to be exported to a Sponge Schematic file. It must be 2^16 - 1 at most in each dimension."
                 )
-            overflowed_shape = [s if s < 2**15 else s - 2**16 for s in selection.shape]
+            overflowed_shape = [
+                s if s < 2**15 else s - 2**16 for s in selection.shape
+            ]
             tag = CompoundTag(
                 {
                     "Version": IntTag(2),
@@ -405,7 +404,7 @@ class SpongeSchemFormatWrapper(StructureFormatWrapper[VersionNumberInt]):
         self._chunks.clear()
 
     def unload(self):
-        pass
+        super().unload()
 
     def all_chunk_coords(
         self, dimension: Optional[Dimension] = None
@@ -17,11 +17,17 @@ import amulet
 from amulet.api.data_types import AnyNDArray, BlockCoordinates
 from amulet.api.block import Block
 from amulet.api.chunk import StatusFormats
+from amulet.api.chunk.blocks import (
+    uniform_sub_chunk,
+    is_uniform_sub_chunk,
+    remap_sub_chunk,
+)
 from .base_anvil_interface import ChunkDataType, ChunkPathType
 from .anvil_0 import Anvil0Interface as ParentInterface
 from amulet.utils.world_utils import (
     decode_long_array,
     encode_long_array,
+    fast_unique,
 )
 
 if TYPE_CHECKING:
@@ -93,10 +99,8 @@ class Anvil1444Interface(ParentInterface):
     def minor_is_valid(key: int):
         return 1444 <= key < 1466
 
-    def _decode_status(
-        self, chunk: Chunk, data: ChunkDataType, floor_cy: int, height_cy: int
-    ):
-        chunk.status = self.get_layer_obj(data, self.Status, pop_last=True).py_str
+    def _get_status(self, data: ChunkDataType, pop_last=False) -> str:
+        return self.get_layer_obj(data, self.Status, pop_last=pop_last).py_str
 
     def _decode_block_section(
         self, section: CompoundTag
@@ -104,6 +108,8 @@ class Anvil1444Interface(ParentInterface):
         if "Palette" not in section:  # 1.14 makes block_palette/blocks optional.
             return None
         section_palette = self._decode_block_palette(section.pop("Palette"))
+        if len(section_palette) == 1:
+            return uniform_sub_chunk(0), section_palette
         decoded = decode_long_array(
             section.get_long_array("BlockStates").np_array,
             4096,
@@ -123,7 +129,10 @@ class Anvil1444Interface(ParentInterface):
             data = self._decode_block_section(section)
             if data is not None:
                 arr, section_palette = data
-                blocks[cy] = arr + len(palette)
+                if is_uniform_sub_chunk(arr):
+                    blocks[cy] = uniform_sub_chunk(arr[0, 0, 0] + len(palette))
+                else:
+                    blocks[cy] = arr + len(palette)
                 palette += section_palette
 
         np_palette, inverse = numpy.unique(palette, return_inverse=True)
@@ -131,7 +140,7 @@ class Anvil1444Interface(ParentInterface):
         inverse: numpy.ndarray
         inverse = inverse.astype(numpy.uint32)
         for cy in blocks:
-            blocks[cy] = inverse[blocks[cy]]
+            blocks[cy] = remap_sub_chunk(inverse, blocks[cy])
         chunk.blocks = blocks
         chunk.misc["block_palette"] = np_palette
 
@@ -217,12 +226,8 @@ class Anvil1444Interface(ParentInterface):
         palette: AnyNDArray,
         cy: int,
     ) -> bool:
-        block_sub_array = numpy.transpose(
-            chunk.blocks.get_sub_chunk(cy), (1, 2, 0)
-        ).ravel()
-
-        sub_palette_, block_sub_array = numpy.unique(
-            block_sub_array, return_inverse=True
+        sub_palette_, block_sub_array = fast_unique(
+            chunk.blocks.get_compact_sub_chunk(cy)
         )
         sub_palette = self._encode_block_palette(palette[sub_palette_])
         if (
@@ -234,7 +239,9 @@ class Anvil1444Interface(ParentInterface):
         section = sections.setdefault(cy, CompoundTag())
         section["BlockStates"] = LongArrayTag(
             encode_long_array(
-                block_sub_array, dense=self.LongArrayDense, min_bits_per_entry=4
+                numpy.transpose(block_sub_array, (1, 2, 0)).ravel(),
+                dense=self.LongArrayDense,
+                min_bits_per_entry=4,
             )
         )
         section["Palette"] = sub_palette
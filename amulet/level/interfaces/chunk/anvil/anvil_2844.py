@@ -13,11 +13,13 @@ from amulet_nbt import (
 )
 
 from amulet.api.chunk import Chunk
+from amulet.api.chunk.blocks import uniform_sub_chunk
 from amulet.api.registry import BiomeManager
 from amulet.api.data_types import AnyNDArray, BiomeType
 from amulet.utils.world_utils import (
     decode_long_array,
     encode_long_array,
+    fast_unique,
 )
 
 from .base_anvil_interface import (
@@ -98,7 +100,7 @@ class Anvil2844Interface(ParentInterface):
             section_palette = self._decode_block_palette(block_states.pop("palette"))
             data = block_states.pop("data", None)
             if data is None:
-                arr = numpy.zeros((16, 16, 16), numpy.uint32)
+                arr = uniform_sub_chunk(0)
             else:
                 decoded = decode_long_array(
                     data.np_array,
@@ -191,12 +193,8 @@ class Anvil2844Interface(ParentInterface):
         palette: AnyNDArray,
         cy: int,
     ):
-        block_sub_array = numpy.transpose(
-            chunk.blocks.get_sub_chunk(cy), (1, 2, 0)
-        ).ravel()
-
-        sub_palette_, block_sub_array = numpy.unique(
-            block_sub_array, return_inverse=True
+        sub_palette_, block_sub_array = fast_unique(
+            chunk.blocks.get_compact_sub_chunk(cy)
         )
         sub_palette = self._encode_block_palette(palette[sub_palette_])
         section = sections.setdefault(cy, CompoundTag())
@@ -204,7 +202,9 @@ class Anvil2844Interface(ParentInterface):
         if len(sub_palette) != 1:
             block_states["data"] = LongArrayTag(
                 encode_long_array(
-                    block_sub_array, dense=self.LongArrayDense, min_bits_per_entry=4
+                    numpy.transpose(block_sub_array, (1, 2, 0)).ravel(),
+                    dense=self.LongArrayDense,
+                    min_bits_per_entry=4,
                 )
             )
 
@@ -222,9 +222,7 @@ class Anvil2844Interface(ParentInterface):
             chunk.biomes.get_section(cy), (1, 2, 0)
         ).ravel()
 
-        sub_palette_, biome_sub_array = numpy.unique(
-            biome_sub_array, return_inverse=True
-        )
+        sub_palette_, biome_sub_array = fast_unique(biome_sub_array)
         sub_palette = self._encode_biome_palette(chunk.biome_palette[sub_palette_])
         biomes = sections[cy]["biomes"] = CompoundTag({"palette": sub_palette})
         if len(sub_palette) != 1:
@@ -194,15 +194,21 @@ class AnvilNAInterface(BaseAnvilInterface):
             data, self.LastUpdate, pop_last=True
         ).py_int
 
-    def _decode_status(
-        self, chunk: Chunk, data: ChunkDataType, floor_cy: int, height_cy: int
-    ):
+    def decode_status(self, data: ChunkDataType) -> str:
+        return self._get_status(data)
+
+    def _get_status(self, data: ChunkDataType, pop_last=False) -> str:
         status = "empty"
-        if self.get_layer_obj(data, self.TerrainPopulated, pop_last=True):
+        if self.get_layer_obj(data, self.TerrainPopulated, pop_last=pop_last):
             status = "decorated"
-        if self.get_layer_obj(data, self.LightPopulated, pop_last=True):
+        if self.get_layer_obj(data, self.LightPopulated, pop_last=pop_last):
             status = "postprocessed"
-        chunk.status = status
+        return status
+
+    def _decode_status(
+        self, chunk: Chunk, data: ChunkDataType, floor_cy: int, height_cy: int
+    ):
+        chunk.status = self._get_status(data, pop_last=True)
 
     def _decode_v_tag(
         self, chunk: Chunk, data: ChunkDataType, floor_cy: int, height_cy: int
@@ -275,9 +281,7 @@ class AnvilNAInterface(BaseAnvilInterface):
             palette.append(section_palette)
 
         if palette:
-            final_palette, lut = numpy.unique(
-                numpy.concatenate(palette), return_inverse=True
-            )
+            final_palette, lut = world_utils.fast_unique(numpy.concatenate(palette))
             final_palette: numpy.ndarray = numpy.array(
                 [final_palette >> 4, final_palette & 15]
             ).T
@@ -419,7 +423,7 @@ class AnvilNAInterface(BaseAnvilInterface):
     ):
         block_sub_array = palette[
             numpy.transpose(
-                chunk.blocks.get_sub_chunk(cy), (1, 2, 0)
+                chunk.blocks.get_compact_sub_chunk(cy), (1, 2, 0)
             ).ravel()  # XYZ -> YZX
         ]
 
@@ -10,7 +10,9 @@ from amulet_nbt import IntTag
 from amulet.api.block import Block
 from amulet.api.registry import BlockManager
 from amulet.api.entity import Entity
+from amulet.api.chunk.blocks import remap_sub_chunk
 from amulet.api.wrapper.chunk.translator import Translator
+from amulet.api.wrapper.chunk.translation_cache import translation_cache
 from amulet.api.data_types import (
     GetBlockCallback,
     TranslateBlockCallbackReturn,
@@ -95,7 +97,9 @@ class BaseBedrockTranslator(Translator):
             # this means that the final palette is smaller than the original so the array needs remapping
             np_lut = numpy.array(lut)
             for cy in chunk.blocks.sub_chunks:
-                chunk.blocks.add_sub_chunk(cy, np_lut[chunk.blocks.get_sub_chunk(cy)])
+                chunk.blocks.add_sub_chunk(
+                    cy, remap_sub_chunk(np_lut, chunk.blocks.get_compact_sub_chunk(cy))
+                )
 
     def _blocks_entities_to_universal(
         self,
@@ -173,7 +177,9 @@ class BaseBedrockTranslator(Translator):
         self._translate(
             chunk,
             get_chunk_callback,
-            translate_block,
+            translation_cache.wrap(
+                "to_universal", self._translator_key(game_version), translate_block
+            ),
             translate_entity,
             full_translate,
         )
@@ -261,7 +267,11 @@ class BaseBedrockTranslator(Translator):
         self._translate(
             chunk,
             get_chunk_callback,
-            translate_block,
+            translation_cache.wrap(
+                "from_universal",
+                self._translator_key(max_world_version_number),
+                translate_block,
+            ),
             translate_entity,
             full_translate,
         )
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Optional, NamedTuple, Generic, TypeVar, Hashable
+from collections import OrderedDict
+from threading import RLock
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+class LRUCacheInfo(NamedTuple):
+    """Statistics about a :class:`LRUCache`."""
+
+    # The number of lookups that were found in the cache.
+    hits: int
+    # The number of lookups that were not found in the cache.
+    misses: int
+    # The maximum number of entries the cache can store.
+    max_size: int
+    # The number of entries currently in the cache.
+    current_size: int
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """
+    A thread safe, bounded cache.
+
+    The least recently used entries are removed when the cache is full.
+    A max_size of 0 disables the cache.
+    None cannot be cached because :meth:`get` uses it to mean the key is not cached.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: The maximum number of entries to cache.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be positive")
+        self._lock = RLock()
+        self._entries: OrderedDict[KeyT, ValueT] = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def max_size(self) -> int:
+        """The maximum number of entries to cache."""
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int):
+        if max_size < 0:
+            raise ValueError("max_size must be positive")
+        with self._lock:
+            self._max_size = max_size
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key: KeyT) -> Optional[ValueT]:
+        """Get the cached value. None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: KeyT, entry: ValueT):
+        """Cache the value."""
+        with self._lock:
+            if self._max_size:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                if len(self._entries) > self._max_size:
+                    self._entries.popitem(last=False)
+
+    def invalidate(self, key: KeyT):
+        """Remove an entry from the cache if it exists."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def cache_info(self) -> LRUCacheInfo:
+        """Get statistics about the cache. This can be used to choose :attr:`max_size`."""
+        with self._lock:
+            return LRUCacheInfo(
+                self._hits, self._misses, self._max_size, len(self._entries)
+            )
+
+    def clear(self):
+        """Remove all entries from the cache and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
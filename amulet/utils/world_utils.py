@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import math
 import sys
+from functools import lru_cache
 import gzip
 from io import StringIO
 from typing import Tuple, Optional
@@ -135,6 +136,28 @@ The functions below can be used to pack and unpack both formats.
 """
 
 
+@lru_cache(maxsize=256)
+def _dense_layout(
+    size: int, bits_per_entry: int
+) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Get the position of each entry in a dense long array where entries may span two longs.
+
+    :param size: The number of entries.
+    :param bits_per_entry: The number of bits per entry.
+    :return: The index of the long each entry starts in, the bit offset within that long,
+        the index of the first entry in each long and a bool array of the entries that overflow into the next long.
+    """
+    bit_index = numpy.arange(size, dtype=numpy.uint64) * numpy.uint64(bits_per_entry)
+    long_index = (bit_index >> numpy.uint64(6)).astype(numpy.intp)
+    offset = bit_index & numpy.uint64(63)
+    starts = numpy.flatnonzero(numpy.diff(long_index, prepend=-1))
+    overflow = offset + numpy.uint64(bits_per_entry) > numpy.uint64(64)
+    for arr in (long_index, offset, starts, overflow):
+        arr.setflags(write=False)
+    return long_index, offset, starts, overflow
+
+
 def decode_long_array(
     long_array: numpy.ndarray,
     size: int,
@@ -160,8 +183,8 @@ def decode_long_array(
         1 <= bits_per_entry <= 64
     ), f"bits_per_entry must be between 1 and 64 inclusive. Got {bits_per_entry}"
 
-    # force the array to be a signed long array
-    long_array = long_array.astype(">q")
+    # force the array to be an unsigned long array
+    long_array = long_array.astype(numpy.int64).view(numpy.uint64)
 
     if dense:
         expected_len = math.ceil(size * bits_per_entry / 64)
@@ -172,38 +195,39 @@ def decode_long_array(
             f"{'Dense e' if dense else 'E'}ncoded long array with {bits_per_entry} bits per entry should contain {expected_len} longs but got {len(long_array)}."
         )
 
-    # unpack the long array into a bit array
-    bits = numpy.unpackbits(long_array[::-1].astype(">i8").view("uint8"))
-    if dense:
-        if bits.size % bits_per_entry:
-            # if the array is densely packed and there is extra padding, remove it
-            bits = bits[bits.size % bits_per_entry :]
-    else:
-        # if not densely packed remove the padding per long
+    mask = numpy.uint64((1 << bits_per_entry) - 1)
+    if not dense or 64 % bits_per_entry == 0:
+        # No entries span two longs so each long can be unpacked on its own
         entry_per_long = 64 // bits_per_entry
-        bits = bits.reshape(-1, 64)[:, -entry_per_long * bits_per_entry :]
+        shifts = numpy.arange(
+            0, entry_per_long * bits_per_entry, bits_per_entry, dtype=numpy.uint64
+        )
+        arr = ((long_array[:, None] >> shifts) & mask).ravel()[:size]
+    else:
+        # Entries may span two longs. Get the low bits from the first and the high bits from the second.
+        long_index, offset, _, _ = _dense_layout(size, bits_per_entry)
+        long_array = numpy.append(long_array, numpy.uint64(0))
+        # Shift by one and then the rest so that an offset of 0 shifts out all the bits
+        arr = (
+            (long_array[long_index] >> offset)
+            | (
+                (long_array[long_index + 1] << numpy.uint64(1))
+                << (numpy.uint64(63) - offset)
+            )
+        ) & mask
 
     byte_length = 2 ** math.ceil(math.log(math.ceil(bits_per_entry / 8), 2))
-    dtype = {1: "B", 2: ">H", 4: ">I", 8: ">Q"}[byte_length]
-
-    # pad the bits to fill one of the above data types
-    arr = numpy.packbits(
-        numpy.pad(
-            bits.reshape(-1, bits_per_entry)[-size:, :],
-            [(0, 0), (byte_length * 8 - bits_per_entry, 0)],
-            "constant",
-        )
-    ).view(dtype=dtype)[::-1]
     if signed:
-        # convert to a signed array if requested
-        sarray = arr.astype({1: "b", 2: ">h", 4: ">i", 8: ">q"}[byte_length])
         if bits_per_entry < 64:
-            mask = arr >= 2 ** (bits_per_entry - 1)
-            sarray[mask] = numpy.subtract(
-                arr[mask], 2**bits_per_entry, dtype=numpy.int64
-            )
-        arr = sarray
-    return arr
+            # subtract 2**bits_per_entry from the values with the sign bit set
+            sign = (arr >> numpy.uint64(bits_per_entry - 1)) & numpy.uint64(1)
+            arr = arr - (sign << numpy.uint64(bits_per_entry))
+        # convert to a signed array
+        return arr.view(numpy.int64).astype(
+            {1: "b", 2: ">h", 4: ">i", 8: ">q"}[byte_length]
+        )
+    else:
+        return arr.astype({1: "B", 2: ">H", 4: ">I", 8: ">Q"}[byte_length])
 
 
 def encode_long_array(
@@ -225,7 +249,7 @@ def encode_long_array(
         1 <= min_bits_per_entry <= 64
     ), f"min_bits_per_entry must be between 1 and 64 inclusive. Got {bits_per_entry}"
     # cast to a signed longlong array
-    array = array.astype(">q")
+    array = numpy.asarray(array).astype(numpy.int64).ravel()
     # work out how many bits are required to store the
     required_bits_per_entry = max(
         max(
@@ -250,47 +274,41 @@ def encode_long_array(
         raise ValueError(
             "bits_per_entry must be an int between 1 and 64 inclusive or None."
         )
-    # make the negative values positive to make bit storage easier
-    uarray = array.astype(">Q")
-    if bits_per_entry < 64:
-        mask = array < 0
-        uarray[mask] = numpy.add(
-            array[mask], 2**bits_per_entry, dtype=numpy.uint64, casting="unsafe"
-        )
-    array = uarray
+    # Store the values as unsigned. Negative values are stored in two's complement.
+    array = array.view(numpy.uint64) & numpy.uint64((1 << bits_per_entry) - 1)
 
-    # unpack the individual values into a bit array
-    bits: numpy.ndarray = numpy.unpackbits(
-        numpy.ascontiguousarray(array[::-1]).view("uint8")
-    ).reshape(-1, 64)[:, -bits_per_entry:]
-    if dense:
-        if bits.size % 64:
-            # if the bit array does not fill a whole long
-            # add padding to the last long if required
-            bits = numpy.pad(
-                bits.ravel(),
-                [(64 - (bits.size % 64), 0)],
-                "constant",
-            )
-    else:
-        # if the array is not dense add padding
+    if not dense or 64 % bits_per_entry == 0:
+        # No entries span two longs so each long can be packed on its own
         entry_per_long = 64 // bits_per_entry
-        if bits.shape[0] % entry_per_long:
+        if array.size % entry_per_long:
             # add padding to the last long if required
-            bits = numpy.pad(
-                bits,
-                [(entry_per_long - (bits.shape[0] % entry_per_long), 0), (0, 0)],
-                "constant",
+            array = numpy.pad(
+                array, (0, entry_per_long - array.size % entry_per_long), "constant"
             )
-        # add padding for each long
-        bits = numpy.pad(
-            bits.reshape(-1, bits_per_entry * entry_per_long),
-            [(0, 0), (64 - bits_per_entry * entry_per_long, 0)],
-            "constant",
+        shifts = numpy.arange(
+            0, entry_per_long * bits_per_entry, bits_per_entry, dtype=numpy.uint64
+        )
+        long_array = numpy.bitwise_or.reduce(
+            array.reshape(-1, entry_per_long) << shifts, axis=1
+        )
+    else:
+        # Entries may span two longs.
+        # The low bits of each entry are stored in the long the entry starts in
+        # and the high bits of entries that overflow are stored in the next long.
+        long_index, offset, starts, overflow = _dense_layout(array.size, bits_per_entry)
+        long_array = numpy.zeros(
+            math.ceil(array.size * bits_per_entry / 64), dtype=numpy.uint64
+        )
+        # Every long except the last contains the start of at least one entry.
+        long_array[long_index[starts]] = numpy.bitwise_or.reduceat(
+            array << offset, starts
+        )
+        # Each long has at most one overflowing entry from the previous long.
+        long_array[long_index[overflow] + 1] |= array[overflow] >> (
+            numpy.uint64(64) - offset[overflow]
         )
 
-    # pack the bits into a long array
-    return numpy.packbits(bits).view(dtype=">q")[::-1]
+    return long_array.view(numpy.int64).astype(">q")
 
 
 def get_size(obj, seen=None):
@@ -341,9 +359,51 @@ def entity_position_to_chunk_coordinates(
     )
 
 
+# The largest value range fast_unique will build a lookup table for.
+# Arrays with a larger range are sorted.
+FastUniqueMaxLUTSize = 1 << 22
+
+
 def fast_unique(array: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
-    uni = numpy.unique(array)
-    lut = numpy.zeros(numpy.amax(uni) + 1, dtype=numpy.uint32)
-    lut[uni] = numpy.arange(uni.size)
-    inv = lut[array]
-    return uni, inv
+    """
+    Find the sorted unique values in an array and the index of each value in the unique array.
+
+    This is equivalent to ``numpy.unique(array, return_inverse=True)`` except the inverse has the same shape as the input and is uint32.
+
+    Integer arrays with a bounded range are compacted in linear time by marking the values present
+    and building a lookup table from value to index.
+    Other arrays and integer arrays with a huge range fall back to sorting.
+    If every entry in the array views the same value (like the uniform sub-chunks in :class:`~amulet.api.chunk.Blocks`)
+    the inverse is a read only array of zeros that is stored in the same way.
+
+    :param array: The array to compact.
+    :return: The unique values and the index of each value in the unique values.
+    """
+    array = numpy.asarray(array)
+    if array.size and array.ndim and not any(array.strides):
+        return numpy.array([array.flat[0]], dtype=array.dtype), numpy.broadcast_to(
+            numpy.uint32(0), array.shape
+        )
+    if array.size and array.dtype.kind in "ui":
+        min_value = int(numpy.amin(array))
+        max_value = int(numpy.amax(array))
+        value_range = max_value - min_value + 1
+        # Building the table is linear in the value range so it is only faster than sorting if the range is not much larger than the array.
+        if (
+            value_range <= min(max(4096, 8 * array.size), FastUniqueMaxLUTSize)
+            and max_value <= numpy.iinfo(numpy.intp).max
+        ):
+            flat_array = array.ravel().astype(numpy.intp, copy=False)
+            if min_value:
+                flat_array = flat_array - min_value
+            present = numpy.zeros(value_range, dtype=bool)
+            present[flat_array] = True
+            unique = numpy.flatnonzero(present)
+            lut = numpy.zeros(value_range, dtype=numpy.uint32)
+            lut[unique] = numpy.arange(unique.size, dtype=numpy.uint32)
+            return (unique + min_value).astype(array.dtype), lut[flat_array].reshape(
+                array.shape
+            )
+
+    unique, inverse = numpy.unique(array, return_inverse=True)
+    return unique, inverse.astype(numpy.uint32).reshape(array.shape)
@@ -0,0 +1,336 @@
+import unittest
+import os
+import struct
+
+from amulet_nbt import NamedTag, CompoundTag, StringTag, IntTag
+
+import amulet
+from amulet.level.formats.leveldb_world.format import LevelDBFormat
+from amulet.level.formats.leveldb_world.chunk import ChunkData
+from amulet.level.formats.leveldb_world._chunk_index import ChunkIndexFileName
+from data.util import WorldTemp
+
+WorldName = "bedrock/vanilla/1_18/vanilla"
+
+
+def find_chunks(wrapper: LevelDBFormat):
+    """Find the chunks in each dimension by reading every key in the database."""
+    chunks = {}
+    for key in wrapper.level_db.keys():
+        if 9 <= len(key) <= 10 and key[8] in (44, 118):
+            chunks.setdefault(None, set()).add(struct.unpack("<ii", key[:8]))
+        elif 13 <= len(key) <= 14 and key[12] in (44, 118):
+            cx, cz, dimension = struct.unpack("<iii", key[:12])
+            chunks.setdefault(dimension, set()).add((cx, cz))
+    return chunks
+
+
+class LevelDBChunkIndexTestCase(unittest.TestCase):
+    def test_lazy_chunk_coords(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                expected = find_chunks(wrapper)
+                self.assertTrue(expected)
+                for dimension, chunks in expected.items():
+                    # Before the dimension is scanned the chunks are looked up directly
+                    for cx, cz in chunks:
+                        self.assertTrue(manager.has_chunk(cx, cz, dimension))
+                    self.assertFalse(manager.has_chunk(10000, 10000, dimension))
+                    self.assertEqual(manager.all_chunk_coords(dimension), chunks)
+                self.assertEqual(manager.dimensions, [None, 1, 2])
+            finally:
+                wrapper.close()
+
+    def test_chunk_index(self):
+        with WorldTemp(WorldName) as world_temp:
+            index_path = os.path.join(world_temp.temp_path, ChunkIndexFileName)
+
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.chunk_index = True
+            wrapper.open()
+            expected = find_chunks(wrapper)
+            for dimension in wrapper.dimensions:
+                set(wrapper.all_chunk_coords(dimension))
+            wrapper.close()
+            self.assertTrue(os.path.isfile(index_path))
+
+            # The database has not changed so the chunks are loaded from the index
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.chunk_index = True
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                manager._find_chunks = None
+                manager._find_dimensions = None
+                self.assertEqual(manager.dimensions, [None, 1, 2])
+                for dimension, chunks in expected.items():
+                    self.assertEqual(manager.all_chunk_coords(dimension), chunks)
+                # delete a chunk so that the database changes
+                cx, cz = next(iter(expected[None]))
+                wrapper.delete_chunk(cx, cz, "minecraft:overworld")
+                expected[None].remove((cx, cz))
+            finally:
+                wrapper.close()
+
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.chunk_index = True
+            wrapper.open()
+            try:
+                self.assertEqual(find_chunks(wrapper), expected)
+                self.assertEqual(
+                    wrapper._dimension_manager.all_chunk_coords(None), expected[None]
+                )
+            finally:
+                wrapper.close()
+
+    def test_stale_chunk_index(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.chunk_index = True
+            wrapper.open()
+            set(wrapper.all_chunk_coords("minecraft:overworld"))
+            wrapper.close()
+
+            # modify the database without the index
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            cx, cz = next(iter(wrapper.all_chunk_coords("minecraft:overworld")))
+            wrapper.delete_chunk(cx, cz, "minecraft:overworld")
+            wrapper.close()
+
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.chunk_index = True
+            wrapper.open()
+            try:
+                self.assertNotIn(
+                    (cx, cz), set(wrapper.all_chunk_coords("minecraft:overworld"))
+                )
+            finally:
+                wrapper.close()
+
+
+def create_actor(index: int) -> NamedTag:
+    return NamedTag(
+        CompoundTag(identifier=StringTag("minecraft:cow"), Index=IntTag(index))
+    )
+
+
+class LevelDBActorTestCase(unittest.TestCase):
+    def test_actors(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                coords = sorted(manager.all_chunk_coords(None))[:10]
+                for i, (cx, cz) in enumerate(coords):
+                    chunk_data = manager.get_chunk_data(cx, cz, None)
+                    chunk_data[b"digp"] = b""
+                    chunk_data.entity_actor.extend(
+                        create_actor(i * 100 + j) for j in range(i)
+                    )
+                    manager.put_chunk_data(cx, cz, chunk_data, None)
+
+                def get_indexes(actors):
+                    return [actor.compound.get_int("Index").py_int for actor in actors]
+
+                actors = manager.get_actors_many(coords + [(10000, 10000)], None)
+                self.assertEqual(set(actors), set(coords))
+                for i, (cx, cz) in enumerate(coords):
+                    expected = [i * 100 + j for j in range(i)]
+                    entity_actor, unknown_actor = actors[(cx, cz)]
+                    self.assertEqual(get_indexes(entity_actor), expected)
+                    self.assertEqual(unknown_actor, [])
+                    chunk_data = manager.get_chunk_data(cx, cz, None)
+                    self.assertEqual(get_indexes(chunk_data.entity_actor), expected)
+
+                manager.defer_actors = True
+                cx, cz = coords[-1]
+                chunk_data = manager.get_chunk_data(cx, cz, None)
+                self.assertIsNotNone(chunk_data._actor_loader)
+                self.assertEqual(
+                    get_indexes(chunk_data.entity_actor),
+                    [900 + j for j in range(9)],
+                )
+                self.assertIsNone(chunk_data._actor_loader)
+            finally:
+                wrapper.close()
+
+
+class LevelDBTransactionTestCase(unittest.TestCase):
+    def test_transaction(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                db = wrapper.level_db
+                coords = sorted(manager.all_chunk_coords(None))[:10]
+                chunk_datas = {
+                    chunk_coords: manager.get_chunk_data(*chunk_coords, None)
+                    for chunk_coords in coords
+                }
+                new_coords = (10000, 10000)
+                new_prefix = manager._get_key(*new_coords, None)
+
+                with manager.transaction():
+                    for i, (cx, cz) in enumerate(coords):
+                        chunk_data = ChunkData(chunk_datas[(cx, cz)])
+                        chunk_data[b"digp"] = b""
+                        chunk_data.entity_actor.append(create_actor(i))
+                        manager.put_chunk_data(cx, cz, chunk_data, None)
+                    manager.put_chunk_data(
+                        *new_coords,
+                        ChunkData(chunk_datas[coords[0]]),
+                        None,
+                    )
+                    # nothing is written to the database until the transaction exits
+                    self.assertNotIn(b"digp" + manager._get_key(*coords[0], None), db)
+                    self.assertNotIn(new_prefix + b",", db)
+                    # reads include the buffered data
+                    self.assertTrue(manager.has_chunk(*new_coords, None))
+                    self.assertEqual(
+                        manager.get_actors_many(coords[:1], None)[coords[0]][0][
+                            0
+                        ].compound.get_int("Index"),
+                        IntTag(0),
+                    )
+                    chunk_data = manager.get_chunk_data(*coords[1], None)
+                    self.assertEqual(len(chunk_data.entity_actor), 1)
+                    # reading a chunk wrote the buffer
+                    self.assertIn(new_prefix + b",", db)
+                    manager.delete_chunk(*coords[2], None)
+
+                self.assertFalse(manager.has_chunk(*coords[2], None))
+                for i, (cx, cz) in enumerate(coords):
+                    if i == 2:
+                        continue
+                    chunk_data = manager.get_chunk_data(cx, cz, None)
+                    self.assertEqual(
+                        [
+                            actor.compound.get_int("Index").py_int
+                            for actor in chunk_data.entity_actor
+                        ],
+                        [i],
+                    )
+            finally:
+                wrapper.close()
+
+    def test_batch_size(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                db = wrapper.level_db
+                coords = sorted(manager.all_chunk_coords(None))[:20]
+                chunk_datas = {
+                    chunk_coords: manager.get_chunk_data(*chunk_coords, None)
+                    for chunk_coords in coords
+                }
+                writes = []
+                put_batch = db.putBatch
+
+                class DB:
+                    def __getattr__(self, item):
+                        return getattr(db, item)
+
+                    @staticmethod
+                    def putBatch(batch):
+                        writes.append(batch)
+                        put_batch(batch)
+
+                manager._db = DB()
+                manager.max_batch_size = 1
+                with manager.transaction():
+                    for chunk_coords, chunk_data in chunk_datas.items():
+                        manager.put_chunk_data(*chunk_coords, chunk_data, None)
+                # each batch contains exactly one chunk
+                self.assertEqual(len(writes), len(coords))
+                for batch, chunk_coords in zip(writes, chunk_datas):
+                    prefix = manager._get_key(*chunk_coords, None)
+                    self.assertTrue(all(key.startswith(prefix) for key in batch))
+
+                writes.clear()
+                manager.max_batch_size = 2**30
+                with manager.transaction():
+                    for chunk_coords, chunk_data in chunk_datas.items():
+                        manager.put_chunk_data(*chunk_coords, chunk_data, None)
+                self.assertEqual(len(writes), 1)
+            finally:
+                wrapper.close()
+
+
+class LevelDBChunkDataManyTestCase(unittest.TestCase):
+    def test_get_chunk_data_many(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                cx, cz = min(manager.all_chunk_coords(None))
+                chunk_data = manager.get_chunk_data(cx, cz, None)
+                chunk_data[b"digp"] = b""
+                chunk_data.entity_actor.extend(create_actor(i) for i in range(3))
+                manager.put_chunk_data(cx, cz, chunk_data, None)
+
+                for dimension in manager.dimensions:
+                    expected = {
+                        chunk_coords: manager.get_chunk_data(*chunk_coords, dimension)
+                        for chunk_coords in manager.all_chunk_coords(dimension)
+                    }
+                    chunk_datas = dict(manager.get_chunk_data_many(dimension))
+                    self.assertEqual(chunk_datas.keys(), expected.keys())
+                    for chunk_coords, chunk_data in chunk_datas.items():
+                        self.assertEqual(chunk_data, expected[chunk_coords])
+                        self.assertEqual(
+                            [actor.to_snbt() for actor in chunk_data.entity_actor],
+                            [
+                                actor.to_snbt()
+                                for actor in expected[chunk_coords].entity_actor
+                            ],
+                        )
+
+                    coords = sorted(expected)[::3]
+                    chunk_datas = dict(
+                        manager.get_chunk_data_many(
+                            dimension, coords + [(10000, 10000)]
+                        )
+                    )
+                    self.assertEqual(set(chunk_datas), set(coords))
+                    for chunk_coords, chunk_data in chunk_datas.items():
+                        self.assertEqual(chunk_data, expected[chunk_coords])
+
+                self.assertEqual(
+                    len(dict(manager.get_chunk_data_many(None))[(cx, cz)].entity_actor),
+                    3,
+                )
+            finally:
+                wrapper.close()
+
+    def test_load_chunks(self):
+        with WorldTemp(WorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                for dimension in ("minecraft:the_nether", "minecraft:the_end"):
+                    chunks = list(wrapper.load_chunks(dimension))
+                    self.assertEqual(
+                        {(chunk.cx, chunk.cz) for chunk in chunks},
+                        set(wrapper.all_chunk_coords(dimension)),
+                    )
+                    for chunk in chunks[:5]:
+                        expected = wrapper.load_chunk(chunk.cx, chunk.cz, dimension)
+                        self.assertEqual(
+                            chunk.block_palette.blocks, expected.block_palette.blocks
+                        )
+                self.assertEqual(list(wrapper.load_chunks("DIM100")), [])
+            finally:
+                wrapper.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
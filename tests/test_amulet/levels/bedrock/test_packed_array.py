@@ -0,0 +1,76 @@
+import unittest
+import struct
+
+import numpy
+
+from amulet.level.formats.leveldb_world.interface.chunk.base_leveldb_interface import (
+    BaseLevelDBInterface,
+)
+
+
+def reference_encode(arr: numpy.ndarray, bits_per_value: int) -> bytes:
+    """Pack the values one at a time as described in the format documentation."""
+    values_per_word = 32 // bits_per_value
+    values = [int(v) for v in arr.swapaxes(1, 2).ravel()]
+    words = []
+    for i in range(0, len(values), values_per_word):
+        word = 0
+        for j, value in enumerate(values[i : i + values_per_word]):
+            word |= value << (j * bits_per_value)
+        words.append(word)
+    return bytes([bits_per_value << 1]) + struct.pack(f"<{len(words)}I", *words)
+
+
+class PackedArrayTestCase(unittest.TestCase):
+    def test_bit_layout(self):
+        for bits_per_value in (1, 2, 3, 4, 5, 6, 8, 16):
+            arr = numpy.random.randint(0, 2**bits_per_value, (16, 16, 16))
+            # make sure the bits per value is not reduced
+            arr[0, 0, 0] = 2**bits_per_value - 1
+            packed = reference_encode(arr, bits_per_value)
+            self.assertEqual(
+                packed, BaseLevelDBInterface._encode_packed_array(arr), bits_per_value
+            )
+            data, decoded_bits, decoded = BaseLevelDBInterface._decode_packed_array(
+                packed + b"tail"
+            )
+            self.assertEqual(b"tail", data)
+            self.assertEqual(bits_per_value, decoded_bits)
+            # the decoded array is int16 so compare the unsigned bits
+            numpy.testing.assert_array_equal(arr, decoded.astype(numpy.uint16))
+
+    def test_padding(self):
+        # The unused high bits of each word should be ignored when decoding.
+        for bits_per_value in (3, 5, 6):
+            arr = numpy.random.randint(0, 2**bits_per_value, (16, 16, 16))
+            packed = BaseLevelDBInterface._encode_packed_array(arr, bits_per_value)
+            words = numpy.frombuffer(packed, "<u4", offset=1) | numpy.uint32(
+                0xFFFFFFFF << (32 // bits_per_value * bits_per_value) & 0xFFFFFFFF
+            )
+            _, _, decoded = BaseLevelDBInterface._decode_packed_array(
+                packed[:1] + words.astype("<u4").tobytes()
+            )
+            numpy.testing.assert_array_equal(arr, decoded)
+
+    def test_bits_per_value(self):
+        for max_value, bits_per_value in (
+            (0, 1),
+            (1, 1),
+            (7, 3),
+            (31, 5),
+            (63, 6),
+            (64, 8),
+            (255, 8),
+            (256, 16),
+        ):
+            arr = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+            arr[1, 2, 3] = max_value
+            packed = BaseLevelDBInterface._encode_packed_array(arr)
+            self.assertEqual(bits_per_value, packed[0] >> 1)
+            self.assertEqual(
+                4 * -(-4096 // (32 // bits_per_value)), len(packed) - 1, max_value
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
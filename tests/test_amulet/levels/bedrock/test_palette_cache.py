@@ -0,0 +1,139 @@
+import unittest
+
+import numpy
+from amulet_nbt import (
+    NamedTag,
+    CompoundTag,
+    StringTag,
+    IntTag,
+    ByteTag,
+    ShortTag,
+    LongTag,
+    FloatTag,
+    DoubleTag,
+    ListTag,
+    ByteArrayTag,
+    IntArrayTag,
+    LongArrayTag,
+    ReadContext,
+    load as load_nbt,
+)
+
+from amulet.api.block import Block
+from amulet.level.formats.leveldb_world.interface.chunk import get_interface
+from amulet.level.formats.leveldb_world.interface.chunk.base_leveldb_interface import (
+    PaletteCache,
+    PaletteCacheInfo,
+    palette_cache,
+    _named_tag_end,
+)
+
+
+def create_block(name: str, **states) -> NamedTag:
+    return NamedTag(
+        CompoundTag(
+            name=StringTag(name),
+            states=CompoundTag(states),
+            version=IntTag(17959425),
+        )
+    )
+
+
+class PaletteCacheTestCase(unittest.TestCase):
+    def test_load_palette_blocks(self):
+        interface = get_interface(40)
+        palette = [
+            create_block("minecraft:air"),
+            create_block("minecraft:stone", stone_type=StringTag("granite")),
+            create_block("minecraft:water", liquid_depth=IntTag(0)),
+            create_block("dirt", dirt_type=StringTag("normal")),
+            NamedTag(CompoundTag(name=StringTag("minecraft:log"), val=ByteTag(1))),
+        ]
+        blocks = numpy.arange(4096).reshape(16, 16, 16) % len(palette)
+        data = interface._save_palette_subchunk(blocks, palette) + b"extra"
+
+        expected_palette = [
+            (
+                17959425,
+                Block("minecraft", "air", {}),
+            ),
+            (
+                17959425,
+                Block("minecraft", "stone", {"stone_type": StringTag("granite")}),
+            ),
+            (
+                17959425,
+                Block("minecraft", "water", {"liquid_depth": IntTag(0)}),
+            ),
+            (
+                17959425,
+                Block("minecraft", "dirt", {"dirt_type": StringTag("normal")}),
+            ),
+            (None, Block("minecraft", "log", {"block_data": IntTag(1)})),
+        ]
+
+        palette_cache.clear()
+        for i in range(3):
+            loaded_blocks, loaded_palette, remaining = interface._load_palette_blocks(
+                data
+            )
+            numpy.testing.assert_array_equal(loaded_blocks, blocks)
+            self.assertEqual(loaded_palette, expected_palette)
+            self.assertEqual(remaining, b"extra")
+            info = palette_cache.cache_info()
+            self.assertEqual(info.misses, len(palette))
+            self.assertEqual(info.hits, len(palette) * i)
+            self.assertEqual(info.current_size, len(palette))
+
+    def test_named_tag_end(self):
+        tag = NamedTag(
+            CompoundTag(
+                byte=ByteTag(1),
+                short=ShortTag(2),
+                int=IntTag(3),
+                long=LongTag(4),
+                float=FloatTag(5),
+                double=DoubleTag(6),
+                string=StringTag("seven"),
+                byte_array=ByteArrayTag([1, 2, 3]),
+                int_array=IntArrayTag([1, 2, 3]),
+                long_array=LongArrayTag([1, 2, 3]),
+                int_list=ListTag([IntTag(1), IntTag(2)]),
+                compound_list=ListTag([CompoundTag(a=StringTag("b")), CompoundTag()]),
+                empty_list=ListTag(),
+                compound=CompoundTag(nested=CompoundTag(c=StringTag("c"))),
+            ),
+            "name",
+        )
+        data = b"prefix" + tag.to_nbt(compressed=False, little_endian=True) + b"extra"
+        read_context = ReadContext()
+        load_nbt(
+            data[6:], compressed=False, little_endian=True, read_context=read_context
+        )
+        self.assertEqual(6 + read_context.offset, _named_tag_end(data, 6))
+
+    def test_bounded(self):
+        cache = PaletteCache(2)
+        entry = (None, Block("minecraft", "air"))
+        cache.set(b"a", entry)
+        cache.set(b"b", entry)
+        self.assertIs(cache.get(b"a"), entry)
+        cache.set(b"c", entry)
+        # b was the least recently used
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIs(cache.get(b"a"), entry)
+        self.assertIs(cache.get(b"c"), entry)
+        self.assertEqual(cache.cache_info(), PaletteCacheInfo(3, 1, 2, 2))
+
+        cache.max_size = 1
+        self.assertEqual(cache.cache_info().current_size, 1)
+        cache.max_size = 0
+        cache.set(b"d", entry)
+        self.assertEqual(cache.cache_info().current_size, 0)
+
+        cache.clear()
+        self.assertEqual(cache.cache_info(), PaletteCacheInfo(0, 0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
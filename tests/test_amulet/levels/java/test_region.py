@@ -0,0 +1,445 @@
+import unittest
+import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+
+from amulet.api.errors import ChunkDoesNotExist
+import numpy
+from amulet_nbt import NamedTag, CompoundTag, ByteArrayTag
+
+from amulet.level.formats.anvil_world.region import (
+    AnvilRegionInterface,
+    RegionFileVersion,
+    _compress,
+    _decompress,
+    _decompress_lz4,
+)
+from amulet.level.formats.anvil_world.dimension import (
+    AnvilRegionManager,
+    AnvilDimensionManager,
+)
+from amulet.level.formats.anvil_world._chunk_index import ChunkIndexFileName
+from data.util import WorldTemp
+
+
+def _region_dir(world_temp: WorldTemp) -> str:
+    return os.path.join(world_temp.temp_path, "region")
+
+
+def _read_all(manager: AnvilRegionManager) -> int:
+    count = 0
+    for cx, cz in manager.all_chunk_coords():
+        try:
+            manager.get_chunk_data(cx, cz)
+        except ChunkDoesNotExist:
+            pass
+        else:
+            count += 1
+    return count
+
+
+class AnvilRegionTestCase(unittest.TestCase):
+    def test_memory_map_read(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            for region_path in glob.glob(os.path.join(region_dir, "*.mca")):
+                file_region = AnvilRegionInterface(region_path)
+                mapped_region = AnvilRegionInterface(region_path, memory_map=True)
+                for cx, cz in file_region.all_chunk_coords():
+                    cx &= 0x1F
+                    cz &= 0x1F
+                    self.assertEqual(
+                        file_region.get_data(cx, cz), mapped_region.get_data(cx, cz)
+                    )
+                self.assertTrue(mapped_region.is_memory_mapped)
+                mapped_region.unload()
+                self.assertFalse(mapped_region.is_memory_mapped)
+
+    def test_memory_map_write(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_path = os.path.join(_region_dir(world_temp), "r.0.0.mca")
+            region = AnvilRegionInterface(region_path, memory_map=True)
+            cx, cz = next(region.all_chunk_coords())
+            cx &= 0x1F
+            cz &= 0x1F
+            data = region.get_data(cx, cz)
+            self.assertTrue(region.is_memory_mapped)
+            # write the data to a new location. This will grow the file.
+            new_cx, new_cz = next(
+                (x, z)
+                for x in range(32)
+                for z in range(32)
+                if not region.has_chunk(x, z)
+            )
+            region.write_data(new_cx, new_cz, data)
+            self.assertFalse(region.is_memory_mapped)
+            self.assertEqual(data, region.get_data(new_cx, new_cz))
+            region.delete_data(new_cx, new_cz)
+            with self.assertRaises(ChunkDoesNotExist):
+                region.get_data(new_cx, new_cz)
+
+    def test_memory_map_limit(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            manager = AnvilRegionManager(
+                _region_dir(world_temp), memory_map=True, max_memory_maps=2
+            )
+            _read_all(manager)
+            self.assertLessEqual(
+                sum(region.is_memory_mapped for region in manager._regions.values()),
+                2,
+            )
+            manager.memory_map = False
+            self.assertFalse(
+                any(region.is_memory_mapped for region in manager._regions.values())
+            )
+
+    def test_write_many(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_path = os.path.join(_region_dir(world_temp), "r.0.0.mca")
+            region = AnvilRegionInterface(region_path)
+            coords = [(cx & 0x1F, cz & 0x1F) for cx, cz in region.all_chunk_coords()]
+            data = {coord: region.get_data(*coord) for coord in coords}
+            # move every chunk to the mirrored location and delete the rest
+            moved = {(31 - cx, 31 - cz): tag for (cx, cz), tag in data.items()}
+            batch = {coord: None for coord in coords}
+            batch.update(moved)
+            region.write_many(batch)
+
+            region = AnvilRegionInterface(region_path)
+            self.assertEqual(
+                set(moved),
+                {(cx & 0x1F, cz & 0x1F) for cx, cz in region.all_chunk_coords()},
+            )
+            for coord, tag in moved.items():
+                self.assertEqual(tag, region.get_data(*coord))
+
+    def test_batch(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            coords = list(manager.all_chunk_coords())
+            data = manager.get_chunk_data(*coords[0])
+            with manager.batch():
+                manager.put_chunk_data(1000, 1000, data)
+                manager.delete_chunk(*coords[0])
+                # the buffered changes are visible before they are written
+                self.assertTrue(manager.has_chunk(1000, 1000))
+                self.assertEqual(data, manager.get_chunk_data(1000, 1000))
+                self.assertFalse(manager.has_chunk(*coords[0]))
+                all_coords = set(manager.all_chunk_coords())
+                self.assertIn((1000, 1000), all_coords)
+                self.assertNotIn(coords[0], all_coords)
+                # nothing has been written yet
+                self.assertFalse(manager._has_region(31, 31))
+
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            self.assertEqual(data, manager.get_chunk_data(1000, 1000))
+            self.assertFalse(manager.has_chunk(*coords[0]))
+
+    def test_batch_size(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            coords = list(manager.all_chunk_coords())
+            data = manager.get_chunk_data(*coords[0])
+            manager.max_batch_size = 1
+            with manager.batch():
+                manager.put_chunk_data(1000, 1000, data)
+                # the buffer was written when it became larger than max_batch_size
+                self.assertEqual({}, manager._pending)
+                self.assertTrue(manager._has_region(31, 31))
+                manager.put_chunk_data(1001, 1000, data)
+                self.assertEqual({}, manager._pending)
+            with self.assertRaises(ValueError):
+                manager.max_batch_size = -1
+
+            # replacing buffered data does not count towards the size twice
+            manager.max_batch_size = 1_000_000_000
+            with manager.batch():
+                for _ in range(3):
+                    manager.put_chunk_data(1002, 1000, data)
+                size = manager._pending_size
+                self.assertEqual(len(manager._get_pending(1002, 1000)), size)
+                manager.delete_chunk(1002, 1000)
+                self.assertEqual(0, manager._pending_size)
+
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            self.assertEqual(data, manager.get_chunk_data(1000, 1000))
+            self.assertEqual(data, manager.get_chunk_data(1001, 1000))
+
+    def test_write_old_sector(self):
+        """The old data must not be overwritten before the header points to the new data."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            path = glob.glob(os.path.join(_region_dir(world_temp), "*.mca"))[0]
+            region = AnvilRegionInterface(path)
+            cx, cz = next(region.all_chunk_coords())
+            cx, cz = cx & 0x1F, cz & 0x1F
+            data = region.get_compressed_data(cx, cz)
+            old_sector = region._chunk_locations[(cx, cz)]
+            region.write_compressed_data(cx, cz, data)
+            new_sector = region._chunk_locations[(cx, cz)]
+            self.assertFalse(old_sector.intersects(new_sector))
+            self.assertEqual(data, region.get_compressed_data(cx, cz))
+
+    def test_get_chunk_data_many(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            dimension = AnvilDimensionManager(world_temp.temp_path)
+            coords = list(dimension.all_chunk_coords())
+            missing = (10000, 10000)
+            chunks = dict(dimension.get_chunk_data_many(coords + [missing], 4))
+            self.assertEqual(set(coords), set(chunks))
+            for (cx, cz), data in chunks.items():
+                self.assertEqual(dimension.get_chunk_data(cx, cz), data)
+
+            with dimension.batch():
+                dimension.put_chunk_data(*missing, chunks[coords[0]])
+                dimension.delete_chunk(*coords[0])
+                loaded = dict(dimension.get_chunk_data_many(coords + [missing]))
+                self.assertNotIn(coords[0], loaded)
+                self.assertEqual(chunks[coords[0]], loaded[missing])
+
+    def test_compression(self):
+        # larger than one lz4 block and partly incompressible
+        data = NamedTag(
+            CompoundTag(
+                {
+                    "zeros": ByteArrayTag(numpy.zeros(100_000, numpy.int8)),
+                    "random": ByteArrayTag(
+                        numpy.frombuffer(os.urandom(100_000), numpy.int8)
+                    ),
+                }
+            )
+        )
+        for compression in (
+            RegionFileVersion.VERSION_DEFLATE,
+            RegionFileVersion.VERSION_LZ4,
+            RegionFileVersion.VERSION_NONE,
+        ):
+            with self.subTest(compression=compression):
+                compressed = _compress(data, compression, 1)
+                self.assertEqual(compression, compressed[0])
+                self.assertEqual(data, _decompress(compressed))
+        with self.assertRaises(ValueError):
+            _compress(data, RegionFileVersion.VERSION_GZIP)
+        with self.assertRaises(ValueError):
+            AnvilRegionManager("", compression_level=10)
+
+    def test_write_compression(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            cx, cz = next(iter(manager.all_chunk_coords()))
+            data = manager.get_chunk_data(cx, cz)
+            manager.set_compression(RegionFileVersion.VERSION_LZ4)
+            manager.put_chunk_data(cx, cz, data)
+
+            region = AnvilRegionInterface(
+                os.path.join(_region_dir(world_temp), f"r.{cx >> 5}.{cz >> 5}.mca")
+            )
+            ((_, buffer),) = region._read_buffers([(cx & 0x1F, cz & 0x1F)])
+            self.assertEqual(RegionFileVersion.VERSION_LZ4, buffer[0])
+            self.assertEqual(data, region.get_data(cx & 0x1F, cz & 0x1F))
+
+    def test_compact(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            manager = AnvilRegionManager(region_dir)
+            chunks = {
+                (cx, cz): manager.get_chunk_data(cx, cz)
+                for cx, cz in manager.all_chunk_coords()
+            }
+            # delete every other chunk to leave holes in the files
+            deleted = list(chunks)[::2]
+            for coord in deleted:
+                manager.delete_chunk(*coord)
+                del chunks[coord]
+            old_size = sum(
+                os.path.getsize(path)
+                for path in glob.glob(os.path.join(region_dir, "*.mca"))
+            )
+            reclaimed = manager.compact()
+            new_size = sum(
+                os.path.getsize(path)
+                for path in glob.glob(os.path.join(region_dir, "*.mca"))
+            )
+            self.assertGreater(reclaimed, 0)
+            self.assertEqual(old_size - new_size, reclaimed)
+            # compacting again does nothing
+            self.assertEqual(0, manager.compact())
+
+            for manager in (manager, AnvilRegionManager(region_dir)):
+                self.assertEqual(set(chunks), set(manager.all_chunk_coords()))
+                for (cx, cz), data in chunks.items():
+                    self.assertEqual(data, manager.get_chunk_data(cx, cz))
+
+            # the chunks are stored in order with no gaps
+            for path in glob.glob(os.path.join(region_dir, "*.mca")):
+                region = AnvilRegionInterface(path)
+                region._load()
+                sectors = [
+                    sector for _, sector in sorted(region._chunk_locations.items())
+                ]
+                offset = 0x2000
+                for sector in sectors:
+                    self.assertEqual(offset, sector.start)
+                    offset = sector.stop
+                self.assertEqual(offset, os.path.getsize(path))
+
+    def test_compact_short_header(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_path = glob.glob(os.path.join(_region_dir(world_temp), "*.mca"))[0]
+            region = AnvilRegionInterface(region_path)
+            region._load()
+            # the file is truncated after it was loaded
+            with open(region_path, "r+b") as f:
+                f.truncate(100)
+            self.assertEqual(0, region.compact())
+            # the file is not rewritten
+            self.assertEqual(100, os.path.getsize(region_path))
+
+    def test_chunk_index(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            index_path = os.path.join(region_dir, ChunkIndexFileName)
+            coords = set(AnvilRegionManager(region_dir).all_chunk_coords())
+            self.assertFalse(os.path.isfile(index_path))
+
+            manager = AnvilRegionManager(region_dir, chunk_index=True)
+            self.assertEqual(coords, set(manager.all_chunk_coords()))
+            self.assertTrue(os.path.isfile(index_path))
+            # a new manager uses the index
+            self.assertEqual(
+                coords,
+                set(
+                    AnvilRegionManager(region_dir, chunk_index=True).all_chunk_coords()
+                ),
+            )
+
+            # modify the regions without the index
+            other = AnvilRegionManager(region_dir)
+            removed = next(iter(coords))
+            data = other.get_chunk_data(*removed)
+            other.delete_chunk(*removed)
+            other.put_chunk_data(1000, 1000, data)
+            coords.remove(removed)
+            coords.add((1000, 1000))
+            self.assertEqual(
+                coords,
+                set(
+                    AnvilRegionManager(region_dir, chunk_index=True).all_chunk_coords()
+                ),
+            )
+
+            if os.name != "nt":
+                # clear a header entry and restore the modification time
+                region_path = os.path.join(region_dir, "r.31.31.mca")
+                stat = os.stat(region_path)
+                with open(region_path, "r+b") as f:
+                    f.seek(((1000 & 31) + (1000 & 31) * 32) * 4)
+                    f.write(b"\x00" * 4)
+                os.utime(region_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                self.assertEqual(stat.st_size, os.path.getsize(region_path))
+                coords.remove((1000, 1000))
+                self.assertEqual(
+                    coords,
+                    set(
+                        AnvilRegionManager(
+                            region_dir, chunk_index=True
+                        ).all_chunk_coords()
+                    ),
+                )
+
+            # delete a region
+            os.remove(os.path.join(region_dir, "r.31.31.mca"))
+            coords.discard((1000, 1000))
+            self.assertEqual(
+                coords,
+                set(
+                    AnvilRegionManager(region_dir, chunk_index=True).all_chunk_coords()
+                ),
+            )
+
+            # a corrupt index is rebuilt
+            with open(index_path, "wb") as f:
+                f.write(b"corrupt")
+            self.assertEqual(
+                coords,
+                set(
+                    AnvilRegionManager(region_dir, chunk_index=True).all_chunk_coords()
+                ),
+            )
+
+    def test_max_regions(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            chunks = {
+                coord: data
+                for coord, data in AnvilDimensionManager(
+                    world_temp.temp_path
+                ).get_chunk_data_many(AnvilRegionManager(region_dir).all_chunk_coords())
+            }
+            region_count = len(glob.glob(os.path.join(region_dir, "*.mca")))
+            self.assertGreater(region_count, 1)
+
+            manager = AnvilRegionManager(region_dir, max_regions=1)
+            for (cx, cz), data in chunks.items():
+                self.assertEqual(data, manager.get_chunk_data(cx, cz))
+                self.assertLessEqual(len(manager._regions), 1)
+            info = manager.region_cache_info()
+            self.assertEqual(1, info.max_regions)
+            self.assertEqual(1, info.current_regions)
+            self.assertGreaterEqual(info.misses, region_count)
+            self.assertEqual(len(chunks), info.hits + info.misses)
+
+            # writing still works after the region has been evicted
+            (cx, cz), data = next(iter(chunks.items()))
+            manager.put_chunk_data(cx, cz, data)
+            self.assertEqual(set(chunks), set(manager.all_chunk_coords()))
+            self.assertEqual(data, manager.get_chunk_data(cx, cz))
+
+            manager.max_regions = None
+            list(manager.all_chunk_coords())
+            self.assertEqual(region_count, manager.region_cache_info().current_regions)
+            manager.max_regions = 2
+            self.assertEqual(2, manager.region_cache_info().current_regions)
+            with self.assertRaises(ValueError):
+                manager.max_regions = 0
+
+    def test_max_regions_threaded(self):
+        """Regions in use by one thread must not be evicted by another."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            chunks = dict(
+                AnvilRegionManager(region_dir).get_chunk_data_many(
+                    AnvilRegionManager(region_dir).all_chunk_coords()
+                )
+            )
+            self.assertGreater(len(glob.glob(os.path.join(region_dir, "*.mca"))), 1)
+
+            manager = AnvilRegionManager(region_dir, max_regions=1)
+
+            def read_write(coord):
+                cx, cz = coord
+                for _ in range(4):
+                    self.assertEqual(chunks[coord], manager.get_chunk_data(cx, cz))
+                    manager.put_chunk_data(cx, cz, chunks[coord])
+
+            with ThreadPoolExecutor(8) as executor:
+                list(executor.map(read_write, chunks))
+            self.assertLessEqual(len(manager._regions), 1)
+
+            # if two interfaces had written to the same file the sectors would overlap
+            manager = AnvilRegionManager(region_dir)
+            self.assertEqual(set(chunks), set(manager.all_chunk_coords()))
+            for (cx, cz), data in chunks.items():
+                self.assertEqual(data, manager.get_chunk_data(cx, cz))
+
+    def test_lz4_corrupt(self):
+        data = NamedTag(
+            CompoundTag({"zeros": ByteArrayTag(numpy.zeros(100_000, numpy.int8))})
+        )
+        compressed = _compress(data, RegionFileVersion.VERSION_LZ4)
+        with self.assertRaises(ValueError):
+            # truncate the data in the middle of the first block
+            _decompress_lz4(compressed[1:100])
+
+
+if __name__ == "__main__":
+    unittest.main()
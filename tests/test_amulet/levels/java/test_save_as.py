@@ -0,0 +1,92 @@
+import unittest
+import os
+import glob
+
+import amulet
+from amulet.api.block import Block
+from amulet.api.chunk import StatusFormats
+from amulet.level.formats.anvil_world.dimension import AnvilRegionManager
+from data.util import WorldTemp
+
+OVERWORLD = "minecraft:overworld"
+
+
+class AnvilSaveAsTestCase(unittest.TestCase):
+    def test_chunk_status(self):
+        """The status read from the raw data must match the status of the decoded chunk."""
+        for world in (
+            "java/vanilla/1_12_2",
+            "java/vanilla/1_13",
+            "java/vanilla/1_18/vanilla",
+        ):
+            with self.subTest(world=world), WorldTemp(world) as world_temp:
+                wrapper = amulet.load_format(world_temp.temp_path)
+                wrapper.open()
+                statuses = set()
+                for cx, cz in wrapper.all_chunk_coords(OVERWORLD):
+                    status = wrapper.get_chunk_status(cx, cz, OVERWORLD).value
+                    statuses.add(status)
+                    self.assertEqual(
+                        wrapper.load_chunk(cx, cz, OVERWORLD, lazy=True).status.value,
+                        status,
+                    )
+                self.assertTrue(statuses)
+                wrapper.close()
+
+    def test_copy_compressed(self):
+        with WorldTemp("java/vanilla/1_13") as src_temp, WorldTemp(
+            "java/vanilla/1_13", "java/vanilla/1_13_save_as"
+        ) as dst_temp:
+            src_region_dir = os.path.join(src_temp.temp_path, "region")
+            dst_region_dir = os.path.join(dst_temp.temp_path, "region")
+            for path in glob.glob(os.path.join(dst_region_dir, "*.mca")):
+                os.remove(path)
+
+            level = amulet.load_level(src_temp.temp_path)
+            wrapper = amulet.load_format(dst_temp.temp_path)
+            wrapper.open()
+            self.assertTrue(level.level_wrapper.can_copy_compressed_chunks(wrapper))
+            cx, cz = next(iter(level.all_chunk_coords(OVERWORLD)))
+            # Chunks that are not fully generated are not saved, the same as when the chunks are translated.
+            full_chunks = {
+                chunk_coords
+                for chunk_coords in level.all_chunk_coords(OVERWORLD)
+                if level.level_wrapper.get_chunk_status(
+                    *chunk_coords, OVERWORLD
+                ).as_type(StatusFormats.Java_14)
+                == "full"
+            }
+            full_chunks.add((cx, cz))
+            level.set_version_block(
+                cx * 16,
+                70,
+                cz * 16,
+                OVERWORLD,
+                ("java", (1, 13, 2)),
+                Block("minecraft", "diamond_block"),
+            )
+            level.save(wrapper)
+            level.close()
+            wrapper.close()
+
+            src = AnvilRegionManager(src_region_dir)
+            dst = AnvilRegionManager(dst_region_dir)
+            self.assertLess(len(full_chunks), len(set(src.all_chunk_coords())))
+            self.assertEqual(full_chunks, set(dst.all_chunk_coords()))
+            for chunk_coords in full_chunks:
+                if chunk_coords == (cx, cz):
+                    # the modified chunk is re-encoded
+                    self.assertNotEqual(
+                        src.get_compressed_chunk_data(*chunk_coords),
+                        dst.get_compressed_chunk_data(*chunk_coords),
+                    )
+                else:
+                    # the other chunks are copied without modification
+                    self.assertEqual(
+                        src.get_compressed_chunk_data(*chunk_coords),
+                        dst.get_compressed_chunk_data(*chunk_coords),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
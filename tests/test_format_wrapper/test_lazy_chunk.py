@@ -0,0 +1,92 @@
+import unittest
+import copy
+
+from amulet import load_level
+from amulet.api.chunk import Chunk
+from data.util import WorldTemp
+
+
+def chunk_data(chunk: Chunk):
+    return (
+        list(chunk.block_palette),
+        {
+            cy: chunk.blocks.get_sub_chunk(cy).tobytes()
+            for cy in chunk.blocks.sub_chunks
+        },
+        set(chunk.block_entities.keys()),
+        list(chunk.biome_palette),
+        len(chunk.entities),
+    )
+
+
+class LazyChunkTestCase(unittest.TestCase):
+    def test_chunk(self):
+        calls = []
+
+        def translate(chunk_: Chunk):
+            calls.append(chunk_)
+            chunk_.blocks.add_sub_chunk(0, chunk_.blocks.get_sub_chunk(0) + 1)
+
+        chunk = Chunk(1, 2)
+        chunk._lazy_translate = translate
+        chunk.status = 2.0
+        self.assertTrue(chunk.is_lazy)
+        self.assertEqual(2.0, chunk.status.value)
+        self.assertEqual({}, chunk.misc)
+        self.assertEqual([], calls)
+        self.assertEqual(1, chunk.blocks[0, 0, 0])
+        self.assertFalse(chunk.is_lazy)
+        self.assertEqual(1, chunk.blocks[0, 0, 0])
+        self.assertEqual([chunk], calls)
+
+        # copying or pickling a chunk translates it first
+        for copy_chunk in (
+            copy.deepcopy,
+            lambda c: Chunk.unpickle(c.pickle(), c.block_palette, c.biome_palette),
+        ):
+            chunk = Chunk(1, 2)
+            chunk._lazy_translate = translate
+            chunk_copy = copy_chunk(chunk)
+            self.assertFalse(chunk.is_lazy)
+            self.assertFalse(chunk_copy.is_lazy)
+            self.assertEqual(1, chunk_copy.blocks[0, 0, 0])
+
+    def _load_chunks(self, world_name: str, lazy: bool):
+        with WorldTemp(world_name) as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                wrapper = level.level_wrapper
+                dimension = level.dimensions[0]
+                coords = sorted(wrapper.all_chunk_coords(dimension))[:100]
+
+                chunks = [
+                    wrapper.load_chunk(cx, cz, dimension, lazy=lazy)
+                    for cx, cz in coords
+                ]
+                self.assertEqual(lazy, all(chunk.is_lazy for chunk in chunks))
+                status = [chunk.status.value for chunk in chunks]
+                misc = [set(chunk.misc) for chunk in chunks]
+                self.assertEqual(lazy, all(chunk.is_lazy for chunk in chunks))
+                self.assertFalse(any(chunk.changed for chunk in chunks))
+                data = [chunk_data(chunk) for chunk in chunks]
+                self.assertFalse(any(chunk.is_lazy for chunk in chunks))
+                self.assertFalse(any(chunk.changed for chunk in chunks))
+                return status, misc, data
+            finally:
+                level.close()
+
+    def test_levels(self):
+        for world_name in (
+            "java/vanilla/1_12_2",
+            "java/vanilla/1_18/vanilla",
+            "bedrock/vanilla/1_18/vanilla",
+        ):
+            with self.subTest(world_name=world_name):
+                self.assertEqual(
+                    self._load_chunks(world_name, False),
+                    self._load_chunks(world_name, True),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+from amulet import load_level
+from amulet.api.chunk import Chunk
+from amulet.api.wrapper.neighbour_cache import NeighbourCache, NeighbourCacheInfo
+from data.util import WorldTemp
+
+
+class NeighbourCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = NeighbourCache(2)
+        chunks = [Chunk(cx, 0) for cx in range(3)]
+        cache.set(("overworld", 0, 0), chunks[0])
+        cache.set(("overworld", 1, 0), chunks[1])
+        self.assertIs(chunks[0], cache.get(("overworld", 0, 0)))
+        # (1, 0) is now the least recently used
+        cache.set(("overworld", 2, 0), chunks[2])
+        self.assertIsNone(cache.get(("overworld", 1, 0)))
+        self.assertIsNone(cache.get(("nether", 0, 0)))
+        cache.invalidate(("overworld", 2, 0))
+        cache.invalidate(("overworld", 3, 0))
+        self.assertIsNone(cache.get(("overworld", 2, 0)))
+        self.assertEqual(NeighbourCacheInfo(1, 3, 2, 1), cache.cache_info())
+
+        cache.max_size = 0
+        self.assertEqual(0, cache.cache_info().current_size)
+        cache.set(("overworld", 0, 0), chunks[0])
+        self.assertEqual(0, cache.cache_info().current_size)
+        with self.assertRaises(ValueError):
+            cache.max_size = -1
+        cache.clear()
+        self.assertEqual(NeighbourCacheInfo(0, 0, 0, 0), cache.cache_info())
+
+    def _load_chunks(self, max_size: int):
+        with WorldTemp("java/vanilla/1_12_2") as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                wrapper = level.level_wrapper
+                wrapper.neighbour_cache.max_size = max_size
+                dimension = level.dimensions[0]
+                chunks = {}
+                for cx, cz in sorted(wrapper.all_chunk_coords(dimension)):
+                    chunk = wrapper.load_chunk(cx, cz, dimension)
+                    chunks[(cx, cz)] = (
+                        list(chunk.block_palette),
+                        {
+                            cy: chunk.blocks.get_sub_chunk(cy).tobytes()
+                            for cy in chunk.blocks.sub_chunks
+                        },
+                    )
+                return chunks, wrapper.neighbour_cache.cache_info()
+            finally:
+                level.close()
+
+    def test_sequential_scan(self):
+        uncached_chunks, uncached_info = self._load_chunks(0)
+        cached_chunks, cached_info = self._load_chunks(128)
+        self.assertEqual(uncached_chunks, cached_chunks)
+        self.assertGreater(cached_info.hits, 0)
+        self.assertEqual(uncached_info.misses, cached_info.hits + cached_info.misses)
+
+    def test_invalidate(self):
+        with WorldTemp("java/vanilla/1_12_2") as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                wrapper = level.level_wrapper
+                dimension = level.dimensions[0]
+                cache = wrapper.neighbour_cache
+                for cx, cz in sorted(wrapper.all_chunk_coords(dimension)):
+                    wrapper.load_chunk(cx, cz, dimension)
+                    if cache.cache_info().current_size:
+                        break
+                key = next(iter(cache._entries))
+                _, cx, cz = key
+
+                # Changing the stored chunk removes it from the cache.
+                wrapper.commit_chunk(wrapper.load_chunk(cx, cz, dimension), dimension)
+                self.assertNotIn(key, cache._entries)
+                cache.set(key, Chunk(cx, cz))
+                wrapper.put_raw_chunk_data(
+                    cx, cz, wrapper.get_raw_chunk_data(cx, cz, dimension), dimension
+                )
+                self.assertNotIn(key, cache._entries)
+                cache.set(key, Chunk(cx, cz))
+                wrapper.delete_chunk(cx, cz, dimension)
+                self.assertNotIn(key, cache._entries)
+
+                cache.set(key, Chunk(cx, cz))
+                wrapper.unload()
+                self.assertEqual(0, cache.cache_info().current_size)
+            finally:
+                level.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,59 @@
 import unittest
+import os
+import glob
 import time
 
-from amulet.api.errors import ChunkLoadError
+import numpy
+
+from amulet.api.errors import ChunkLoadError, ChunkDoesNotExist
+import amulet
 from amulet import load_level
-from data.util import create_temp_world, clean_temp_world
+from amulet.api.wrapper import Translator
+from amulet.utils.world_utils import (
+    fast_unique,
+    decode_long_array,
+    encode_long_array,
+)
+from amulet.level.formats.anvil_world.region import (
+    AnvilRegionInterface,
+    RegionFileVersion,
+    _compress,
+    _decompress_lz4,
+)
+from amulet.level.formats.anvil_world.dimension import (
+    AnvilRegionManager,
+    AnvilDimensionManager,
+)
+from amulet.level.formats.leveldb_world.chunk import ChunkData
+from amulet.level.formats.leveldb_world.interface.chunk.base_leveldb_interface import (
+    BaseLevelDBInterface,
+)
+from data.util import create_temp_world, clean_temp_world, WorldTemp
 from data import worlds_src
+from test_format_wrapper.test_translator import (
+    create_chunk,
+    translate_block,
+    translate_entity,
+)
+from test_amulet.levels.bedrock.test_leveldb import create_actor
+
+LevelDBWorldName = "bedrock/vanilla/1_18/vanilla"
+
+
+def _region_dir(world_temp: WorldTemp) -> str:
+    return os.path.join(world_temp.temp_path, "region")
+
+
+def _read_all(manager: AnvilRegionManager) -> int:
+    count = 0
+    for cx, cz in manager.all_chunk_coords():
+        try:
+            manager.get_chunk_data(cx, cz)
+        except ChunkDoesNotExist:
+            pass
+        else:
+            count += 1
+    return count
 
 
 class WorldTestBaseCases:
@@ -44,6 +93,339 @@ class Anvil2WorldTestCase(WorldTestBaseCases.WorldTestCase):
         self._setUp(worlds_src.java_vanilla_1_13)
 
 
+class TranslatorSpeedTestCase(unittest.TestCase):
+    def test_translate(self):
+        for palette_size in (16, 256, 1024, 4096):
+            chunk = create_chunk(palette_size)
+            start_time = time.perf_counter()
+            Translator._translate(
+                chunk, lambda cx, cz: chunk, translate_block, translate_entity, True
+            )
+            print(
+                f"Palette size {palette_size}: {time.perf_counter() - start_time:.3f}s"
+            )
+
+
+class LazyChunkSpeedTestCase(unittest.TestCase):
+    def _status_sweep(self, world_name: str, lazy: bool) -> float:
+        with WorldTemp(world_name) as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                wrapper = level.level_wrapper
+                dimension = level.dimensions[0]
+                coords = sorted(wrapper.all_chunk_coords(dimension))[:100]
+                start_time = time.perf_counter()
+                for cx, cz in coords:
+                    wrapper.load_chunk(cx, cz, dimension, lazy=lazy).status.value
+                return time.perf_counter() - start_time
+            finally:
+                level.close()
+
+    def test_status_sweep(self):
+        """Compare reading the status of chunks loaded eagerly and lazily."""
+        for world_name in (
+            "java/vanilla/1_12_2",
+            "java/vanilla/1_18/vanilla",
+            "bedrock/vanilla/1_18/vanilla",
+        ):
+            eager_time = self._status_sweep(world_name, False)
+            lazy_time = self._status_sweep(world_name, True)
+            print(
+                f"{world_name} status sweep: eager {eager_time:.2f}s lazy {lazy_time:.2f}s"
+            )
+
+
+class LongArraySpeedTestCase(unittest.TestCase):
+    def test_long_array(self):
+        """Print the encode and decode time of a sub-chunk sized array for each bits per entry."""
+        size = 4096
+        count = 200
+        for dense in (True, False):
+            for bits_per_entry in range(1, 17):
+                arr = numpy.random.randint(0, 2**bits_per_entry, size)
+                start_time = time.perf_counter()
+                for _ in range(count):
+                    packed = encode_long_array(arr, bits_per_entry, dense)
+                encode_time = time.perf_counter() - start_time
+                start_time = time.perf_counter()
+                for _ in range(count):
+                    decode_long_array(packed, size, bits_per_entry, dense)
+                decode_time = time.perf_counter() - start_time
+                print(
+                    f"Dense: {dense}, bits per entry: {bits_per_entry}: "
+                    f"encode {encode_time / count * 1_000_000:.0f}us "
+                    f"decode {decode_time / count * 1_000_000:.0f}us"
+                )
+
+
+class PackedArraySpeedTestCase(unittest.TestCase):
+    def test_packed_array(self):
+        count = 500
+        for bits_per_value in (1, 2, 3, 4, 5, 6, 8, 16):
+            arr = numpy.random.randint(0, 2**bits_per_value, (16, 16, 16))
+            start_time = time.perf_counter()
+            for _ in range(count):
+                packed = BaseLevelDBInterface._encode_packed_array(arr)
+            encode_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            for _ in range(count):
+                BaseLevelDBInterface._decode_packed_array(packed)
+            decode_time = time.perf_counter() - start_time
+            print(
+                f"Bits per value: {bits_per_value}: "
+                f"encode {encode_time / count * 1_000_000:.0f}us "
+                f"decode {decode_time / count * 1_000_000:.0f}us"
+            )
+
+
+class FastUniqueSpeedTestCase(unittest.TestCase):
+    def test_fast_unique(self):
+        count = 1000
+        for value_range in (2, 16, 256, 4096, 65536):
+            arr = numpy.random.randint(0, value_range, 4096).astype(numpy.uint32)
+            start_time = time.perf_counter()
+            for _ in range(count):
+                numpy.unique(arr, return_inverse=True)
+            unique_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            for _ in range(count):
+                fast_unique(arr)
+            fast_unique_time = time.perf_counter() - start_time
+            print(
+                f"Value range {value_range}: "
+                f"numpy.unique {unique_time / count * 1_000_000:.0f}us "
+                f"fast_unique {fast_unique_time / count * 1_000_000:.0f}us"
+            )
+
+
+class AnvilRegionSpeedTestCase(unittest.TestCase):
+    def test_write(self):
+        """Compare writing chunks one at a time with writing them in a batch."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            manager = AnvilRegionManager(_region_dir(world_temp))
+            chunks = [
+                (cx, cz, manager.get_chunk_data(cx, cz))
+                for cx, cz in manager.all_chunk_coords()
+            ]
+            for batch in (False, True):
+                start_time = time.perf_counter()
+                if batch:
+                    with manager.batch():
+                        for cx, cz, data in chunks:
+                            manager.put_chunk_data(cx, cz, data)
+                else:
+                    for cx, cz, data in chunks:
+                        manager.put_chunk_data(cx, cz, data)
+                end_time = time.perf_counter()
+                print(
+                    f"batch={batch}: {len(chunks) / (end_time - start_time):.0f} chunks/s"
+                )
+
+    def test_get_chunk_data_many(self):
+        """Compare the chunks per second read one at a time and in parallel."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            dimension = AnvilDimensionManager(world_temp.temp_path)
+            coords = list(dimension.all_chunk_coords())
+            start_time = time.perf_counter()
+            for cx, cz in coords:
+                dimension.get_chunk_data(cx, cz)
+            end_time = time.perf_counter()
+            print(
+                f"get_chunk_data: {len(coords) / (end_time - start_time):.0f} chunks/s"
+            )
+            start_time = time.perf_counter()
+            count = sum(1 for _ in dimension.get_chunk_data_many(coords))
+            end_time = time.perf_counter()
+            print(
+                f"get_chunk_data_many: {count / (end_time - start_time):.0f} chunks/s"
+            )
+
+    def test_compression(self):
+        """Compare the save time and file size of each compression setting."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            chunks = list(
+                AnvilDimensionManager(world_temp.temp_path).get_chunk_data_many(
+                    AnvilDimensionManager(world_temp.temp_path).all_chunk_coords()
+                )
+            )
+            for compression, compression_level in (
+                (RegionFileVersion.VERSION_DEFLATE, 1),
+                (RegionFileVersion.VERSION_DEFLATE, 6),
+                (RegionFileVersion.VERSION_DEFLATE, 9),
+                (RegionFileVersion.VERSION_LZ4, 6),
+                (RegionFileVersion.VERSION_NONE, 6),
+            ):
+                name = f"{compression.name}_{compression_level}"
+                directory = os.path.join(world_temp.temp_path, name)
+                manager = AnvilRegionManager(
+                    directory,
+                    compression=compression,
+                    compression_level=compression_level,
+                )
+                start_time = time.perf_counter()
+                with manager.batch():
+                    for (cx, cz), data in chunks:
+                        manager.put_chunk_data(cx, cz, data)
+                end_time = time.perf_counter()
+                # the region files are padded to 4KiB sectors so also report the compressed size
+                file_size = sum(
+                    os.path.getsize(path)
+                    for path in glob.glob(os.path.join(directory, "*.mca"))
+                )
+                data_size = sum(
+                    len(_compress(data, compression, compression_level))
+                    for _, data in chunks
+                )
+                print(
+                    f"{name}: {len(chunks) / (end_time - start_time):.0f} chunks/s "
+                    f"{data_size / 1024:.0f} KiB compressed {file_size / 1024:.0f} KiB on disk"
+                )
+
+    def test_chunk_index(self):
+        """Compare the time to list the chunks with and without the index."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            region_dir = _region_dir(world_temp)
+            # build the index
+            list(AnvilRegionManager(region_dir, chunk_index=True).all_chunk_coords())
+            for chunk_index in (False, True):
+                start_time = time.perf_counter()
+                for _ in range(10):
+                    list(
+                        AnvilRegionManager(
+                            region_dir, chunk_index=chunk_index
+                        ).all_chunk_coords()
+                    )
+                end_time = time.perf_counter()
+                print(
+                    f"chunk_index={chunk_index}: {(end_time - start_time) * 100:.2f} ms"
+                )
+
+    def test_lz4(self):
+        """The decompression speed of an LZ4 compressed region written in the format used by Paper."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            dimension = AnvilDimensionManager(world_temp.temp_path)
+            lz4_dir = os.path.join(world_temp.temp_path, "lz4")
+            lz4_manager = AnvilRegionManager(
+                lz4_dir, compression=RegionFileVersion.VERSION_LZ4
+            )
+            with lz4_manager.batch():
+                for (cx, cz), data in dimension.get_chunk_data_many(
+                    dimension.all_chunk_coords()
+                ):
+                    lz4_manager.put_chunk_data(cx, cz, data)
+
+            buffers = []
+            for path in glob.glob(os.path.join(lz4_dir, "*.mca")):
+                region = AnvilRegionInterface(path)
+                buffers += [
+                    buffer[1:]
+                    for _, buffer in region._read_buffers(
+                        (cx & 0x1F, cz & 0x1F) for cx, cz in region.all_chunk_coords()
+                    )
+                ]
+            size = sum(len(_decompress_lz4(buffer)) for buffer in buffers)
+            start_time = time.perf_counter()
+            for _ in range(10):
+                for buffer in buffers:
+                    _decompress_lz4(buffer)
+            end_time = time.perf_counter()
+            print(
+                f"lz4: {len(buffers) * 10 / (end_time - start_time):.0f} chunks/s "
+                f"{size * 10 / (end_time - start_time) / 1_000_000:.0f} MB/s"
+            )
+
+    def test_read(self):
+        """Compare the chunks per second read with and without memory maps."""
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            for memory_map in (False, True):
+                manager = AnvilRegionManager(
+                    _region_dir(world_temp), memory_map=memory_map
+                )
+                # load the headers before timing
+                list(manager.all_chunk_coords())
+                start_time = time.perf_counter()
+                count = _read_all(manager)
+                end_time = time.perf_counter()
+                manager.unload()
+                print(
+                    f"memory_map={memory_map}: {count / (end_time - start_time):.0f} chunks/s"
+                )
+
+
+class LevelDBSpeedTestCase(unittest.TestCase):
+    def test_actors(self):
+        with WorldTemp(LevelDBWorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                cx, cz = next(iter(manager.all_chunk_coords(None)))
+                chunk_data = manager.get_chunk_data(cx, cz, None)
+                chunk_data[b"digp"] = b""
+                chunk_data.entity_actor.extend(create_actor(i) for i in range(5000))
+                manager.put_chunk_data(cx, cz, chunk_data, None)
+
+                start_time = time.perf_counter()
+                chunk_data = manager.get_chunk_data(cx, cz, None)
+                self.assertEqual(len(chunk_data.entity_actor), 5000)
+                print(f"5000 actors: {time.perf_counter() - start_time:.3f}s")
+
+                manager.defer_actors = True
+                start_time = time.perf_counter()
+                manager.get_chunk_data(cx, cz, None)
+                print(f"5000 actors deferred: {time.perf_counter() - start_time:.3f}s")
+            finally:
+                wrapper.close()
+
+    def test_save(self):
+        with WorldTemp(LevelDBWorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                chunk_datas = {
+                    chunk_coords: manager.get_chunk_data(*chunk_coords, None)
+                    for chunk_coords in sorted(manager.all_chunk_coords(None))[:1000]
+                }
+                start_time = time.perf_counter()
+                for chunk_coords, chunk_data in chunk_datas.items():
+                    manager.put_chunk_data(*chunk_coords, ChunkData(chunk_data), None)
+                print(f"put 1000 chunks: {time.perf_counter() - start_time:.3f}s")
+                start_time = time.perf_counter()
+                with manager.transaction():
+                    for chunk_coords, chunk_data in chunk_datas.items():
+                        manager.put_chunk_data(
+                            *chunk_coords, ChunkData(chunk_data), None
+                        )
+                print(
+                    f"put 1000 chunks in a transaction: {time.perf_counter() - start_time:.3f}s"
+                )
+            finally:
+                wrapper.close()
+
+    def test_get_chunk_data_many(self):
+        with WorldTemp(LevelDBWorldName) as world_temp:
+            wrapper = amulet.load_format(world_temp.temp_path)
+            wrapper.open()
+            try:
+                manager = wrapper._dimension_manager
+                coords = manager.all_chunk_coords(None)
+                start_time = time.perf_counter()
+                for chunk_coords in coords:
+                    manager.get_chunk_data(*chunk_coords, None)
+                print(
+                    f"get_chunk_data {len(coords)} chunks: {time.perf_counter() - start_time:.3f}s"
+                )
+                start_time = time.perf_counter()
+                for _ in manager.get_chunk_data_many(None):
+                    pass
+                print(
+                    f"get_chunk_data_many {len(coords)} chunks: {time.perf_counter() - start_time:.3f}s"
+                )
+            finally:
+                wrapper.close()
+
+
 # class BedrockWorldTestCase(WorldTestBaseCases.WorldTestCase):
 #     def setUp(self):
 #         self._setUp(worlds_src.bedrock_vanilla_1_16)
@@ -0,0 +1,203 @@
+import unittest
+import os
+import glob
+import tempfile
+
+from amulet_nbt import NamedTag
+
+from amulet import load_level
+from amulet.api.block import Block
+from amulet.api.entity import Entity
+from amulet.api.wrapper.chunk.translation_cache import (
+    TranslationCache,
+    TranslationCacheInfo,
+    translation_cache,
+)
+from data.util import WorldTemp
+
+
+class TranslationCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = TranslationCache(2)
+        stone = Block("minecraft", "stone")
+        dirt = Block("minecraft", "dirt")
+        grass = Block("minecraft", "grass")
+        cache.set(("to_universal", "a", stone), (stone, None, [], False))
+        cache.set(("to_universal", "a", dirt), (dirt, None, [], False))
+        self.assertIsNotNone(cache.get(("to_universal", "a", stone)))
+        # dirt is now the least recently used
+        cache.set(("to_universal", "a", grass), (grass, None, [], False))
+        self.assertIsNone(cache.get(("to_universal", "a", dirt)))
+        self.assertIsNotNone(cache.get(("to_universal", "a", stone)))
+        self.assertIsNone(cache.get(("from_universal", "a", stone)))
+        self.assertIsNone(cache.get(("to_universal", "b", stone)))
+        self.assertEqual(TranslationCacheInfo(2, 3, 2, 2), cache.cache_info())
+
+        cache.max_size = 1
+        self.assertEqual(1, cache.cache_info().current_size)
+        with self.assertRaises(ValueError):
+            cache.max_size = -1
+        cache.clear()
+        self.assertEqual(TranslationCacheInfo(0, 0, 1, 0), cache.cache_info())
+
+    def test_wrap(self):
+        cache = TranslationCache()
+        calls = []
+        entity = Entity("minecraft", "cow", 0.0, 0.0, 0.0, NamedTag())
+
+        def translate_block(block, get_block_callback, block_location):
+            calls.append(block)
+            if block.base_name == "door":
+                return None, None, [], True
+            return Block("universal_minecraft", block.base_name), None, [entity], False
+
+        translate = cache.wrap("to_universal", ("java", 1), translate_block)
+        stone = Block("minecraft", "stone")
+        door = Block("minecraft", "door")
+
+        first = translate(stone, None, (0, 0, 0))
+        second = translate(stone, None, (0, 0, 0))
+        self.assertEqual(first, second)
+        self.assertIsNot(first[2], second[2])
+        self.assertEqual([stone], calls)
+
+        # Blocks that need more information are not cached.
+        translate(door, None, (0, 0, 0))
+        translate(door, None, (0, 0, 0))
+        self.assertEqual([stone, door, door], calls)
+
+        # Translations with a block callback are never cached.
+        translate(stone, lambda pos: (stone, None), (1, 2, 3))
+        self.assertEqual([stone, door, door, stone], calls)
+
+        # A different translator version is a different key.
+        cache.wrap("to_universal", ("java", 2), translate_block)(stone, None, (0, 0, 0))
+        self.assertEqual(5, len(calls))
+        self.assertEqual(2, cache.cache_info().current_size)
+
+    def test_persistent(self):
+        calls = []
+
+        def translate_block(block, get_block_callback, block_location):
+            calls.append(block)
+            return Block("universal_minecraft", block.base_name), None, [], False
+
+        stone = Block("minecraft", "stone")
+        dirt = Block("minecraft", "dirt")
+        with tempfile.TemporaryDirectory() as directory:
+            # Each cache acts like a new process.
+            cache = TranslationCache(persistent_directory=directory)
+            cache.wrap("to_universal", ("java", 1), translate_block)(
+                stone, None, (0, 0, 0)
+            )
+            self.assertEqual([stone], calls)
+            cache.save()
+            self.assertEqual(
+                1, len(glob.glob(os.path.join(directory, "*", "to_universal_java_1.*")))
+            )
+
+            cache2 = TranslationCache(persistent_directory=directory)
+            cache3 = TranslationCache(persistent_directory=directory)
+            translate2 = cache2.wrap("to_universal", ("java", 1), translate_block)
+            self.assertEqual(
+                (Block("universal_minecraft", "stone"), None, [], False),
+                translate2(stone, None, (0, 0, 0)),
+            )
+            self.assertEqual([stone], calls)
+            self.assertEqual(1, cache2.cache_info().persistent_hits)
+            # Other versions and directions are stored separately.
+            cache2.wrap("from_universal", ("java", 1), translate_block)(
+                stone, None, (0, 0, 0)
+            )
+            cache2.wrap("to_universal", ("bedrock", (1, 18, 0)), translate_block)(
+                stone, None, (0, 0, 0)
+            )
+            self.assertEqual([stone, stone, stone], calls)
+
+            # Translations saved by other processes are kept.
+            cache3.wrap("to_universal", ("java", 1), translate_block)(
+                dirt, None, (0, 0, 0)
+            )
+            cache3.save()
+            cache2.save()
+            calls.clear()
+            cache4 = TranslationCache(persistent_directory=directory)
+            translate4 = cache4.wrap("to_universal", ("java", 1), translate_block)
+            translate4(stone, None, (0, 0, 0))
+            translate4(dirt, None, (0, 0, 0))
+            self.assertEqual([], calls)
+            self.assertEqual(2, cache4.cache_info().persistent_hits)
+
+            # A corrupt file is ignored.
+            for path in glob.glob(os.path.join(directory, "*", "*.pickle")):
+                with open(path, "wb") as f:
+                    f.write(b"corrupt")
+            cache5 = TranslationCache(persistent_directory=directory)
+            cache5.wrap("to_universal", ("java", 1), translate_block)(
+                stone, None, (0, 0, 0)
+            )
+            self.assertEqual([stone], calls)
+            cache5.save()
+            cache6 = TranslationCache(persistent_directory=directory)
+            cache6.wrap("to_universal", ("java", 1), translate_block)(
+                stone, None, (0, 0, 0)
+            )
+            self.assertEqual([stone], calls)
+
+    def _load_chunks(self, world_name: str):
+        with WorldTemp(world_name) as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                dimension = level.dimensions[0]
+                chunks = {}
+                for cx, cz in sorted(level.all_chunk_coords(dimension))[:50]:
+                    chunk = level.get_chunk(cx, cz, dimension)
+                    chunks[(cx, cz)] = (
+                        {
+                            cy: [
+                                chunk.block_palette[i]
+                                for i in chunk.blocks.get_sub_chunk(cy).ravel()
+                            ]
+                            for cy in chunk.blocks.sub_chunks
+                        },
+                        set(chunk.block_entities.keys()),
+                    )
+                return chunks
+            finally:
+                level.close()
+
+    def test_levels(self):
+        for world_name in ("java/vanilla/1_13", "bedrock/vanilla/1_18/vanilla"):
+            with self.subTest(world_name=world_name):
+                translation_cache.clear()
+                max_size = translation_cache.max_size
+                translation_cache.max_size = 0
+                try:
+                    uncached_chunks = self._load_chunks(world_name)
+                finally:
+                    translation_cache.max_size = max_size
+                # cold
+                self.assertEqual(uncached_chunks, self._load_chunks(world_name))
+                # warm
+                self.assertEqual(uncached_chunks, self._load_chunks(world_name))
+                self.assertGreater(translation_cache.cache_info().hits, 0)
+
+                with tempfile.TemporaryDirectory() as directory:
+                    translation_cache.persistent_directory = directory
+                    try:
+                        translation_cache.clear()
+                        self._load_chunks(world_name)
+                        translation_cache.save()
+                        # Emulate a new process.
+                        translation_cache.clear()
+                        self.assertEqual(uncached_chunks, self._load_chunks(world_name))
+                        self.assertGreater(
+                            translation_cache.cache_info().persistent_hits, 0
+                        )
+                    finally:
+                        translation_cache.persistent_directory = None
+                        translation_cache.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
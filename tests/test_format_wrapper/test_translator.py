@@ -0,0 +1,83 @@
+import unittest
+
+import numpy
+from amulet_nbt import NamedTag, CompoundTag
+
+from amulet.api.block import Block
+from amulet.api.block_entity import BlockEntity
+from amulet.api.chunk import Chunk
+from amulet.api.wrapper import Translator
+
+SubChunkCount = 16
+
+
+def create_chunk(palette_size: int) -> Chunk:
+    """Create a chunk with a random block in each location from a palette of the given size."""
+    chunk = Chunk(1, 2)
+    for i in range(palette_size):
+        chunk.block_palette.get_add_block(Block("test", f"block{i}"))
+    for cy in range(SubChunkCount):
+        chunk.blocks.add_sub_chunk(
+            cy,
+            numpy.random.randint(0, palette_size, (16, 16, 16)).astype(numpy.uint32),
+        )
+    return chunk
+
+
+def translate_block(block: Block, get_block_callback, block_location):
+    """
+    Rename the block.
+    Every 100th block has a block entity and every 250th block needs the block below it to translate.
+    """
+    index = int(block.base_name[5:])
+    block_entity = None
+    if index % 100 == 0:
+        block_entity = BlockEntity("test", "block_entity", 0, 0, 0, NamedTag())
+    if index % 250 == 0:
+        if get_block_callback is None:
+            return None, None, [], True
+        below, _ = get_block_callback((0, -1, 0))
+        return Block("test", f"{block.base_name}_{below.base_name}"), None, [], True
+    return Block("test", f"new_{block.base_name}"), block_entity, [], False
+
+
+def translate_entity(entity):
+    return None, None, []
+
+
+class TranslatorTestCase(unittest.TestCase):
+    def test_translate(self):
+        palette_size = 1000
+        chunk = create_chunk(palette_size)
+        # make sure the extra context blocks have a block below them
+        for cy in range(SubChunkCount):
+            chunk.blocks.get_sub_chunk(cy)[:, 0, :] = 1
+        chunk.blocks.get_sub_chunk(0)[:, :, :] = 1
+        old_blocks = {cy: chunk.blocks.get_sub_chunk(cy) for cy in range(16)}
+        old_palette = list(chunk.block_palette)
+
+        Translator._translate(
+            chunk, lambda cx, cz: chunk, translate_block, translate_entity, True
+        )
+
+        expected_block_entities = set()
+        for cy, old_sub_chunk in old_blocks.items():
+            new_sub_chunk = chunk.blocks.get_sub_chunk(cy)
+            for (x, y, z), old_index in numpy.ndenumerate(old_sub_chunk):
+                old_name = old_palette[old_index].base_name
+                if old_index % 250 == 0:
+                    below = old_palette[old_sub_chunk[x, y - 1, z]].base_name
+                    expected_name = f"{old_name}_{below}"
+                else:
+                    expected_name = f"new_{old_name}"
+                self.assertEqual(
+                    expected_name,
+                    chunk.block_palette[new_sub_chunk[x, y, z]].base_name,
+                )
+                if old_index % 100 == 0 and old_index % 250:
+                    expected_block_entities.add((x + 16, y + cy * 16, z + 32))
+        self.assertEqual(expected_block_entities, set(chunk.block_entities.keys()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import asyncio
+
+import amulet
+from amulet.api.errors import ChunkDoesNotExist
+from amulet.api.selection import SelectionBox
+from data.util import WorldTemp
+
+OVERWORLD = "minecraft:overworld"
+
+
+class AsyncLevelTestCase(unittest.TestCase):
+    def test_aget_chunk(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            level = amulet.load_level(world_temp.temp_path)
+            try:
+                cx, cz = next(iter(level.all_chunk_coords(OVERWORLD)))
+                chunk = asyncio.run(level.aget_chunk(cx, cz, OVERWORLD))
+                self.assertIs(chunk, level.get_chunk(cx, cz, OVERWORLD))
+
+                with self.assertRaises(ChunkDoesNotExist):
+                    asyncio.run(level.aget_chunk(10000, 10000, OVERWORLD))
+            finally:
+                level.close()
+
+    def test_coalesce(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            level = amulet.load_level(world_temp.temp_path)
+            try:
+                load_count = 0
+                load_chunk = level.level_wrapper.load_chunk
+
+                def counted_load_chunk(*args, **kwargs):
+                    nonlocal load_count
+                    load_count += 1
+                    return load_chunk(*args, **kwargs)
+
+                level.level_wrapper.load_chunk = counted_load_chunk
+
+                cx, cz = next(iter(level.all_chunk_coords(OVERWORLD)))
+
+                async def load():
+                    return await asyncio.gather(
+                        *[level.aget_chunk(cx, cz, OVERWORLD) for _ in range(20)]
+                    )
+
+                chunks = asyncio.run(load())
+                self.assertEqual(load_count, 1)
+                for chunk in chunks:
+                    self.assertIs(chunk, chunks[0])
+            finally:
+                level.close()
+
+    def test_aget_chunk_boxes(self):
+        with WorldTemp("java/vanilla/1_13") as world_temp:
+            level = amulet.load_level(world_temp.temp_path)
+            try:
+                selection = SelectionBox((-64, 0, -64), (64, 256, 64))
+
+                async def load():
+                    return [
+                        (chunk, box)
+                        async for chunk, box in level.aget_chunk_boxes(
+                            OVERWORLD, selection
+                        )
+                    ]
+
+                async_chunk_boxes = asyncio.run(load())
+                chunk_boxes = list(level.get_chunk_boxes(OVERWORLD, selection))
+                self.assertTrue(chunk_boxes)
+                self.assertEqual(len(async_chunk_boxes), len(chunk_boxes))
+                for (async_chunk, async_box), (chunk, box) in zip(
+                    async_chunk_boxes, chunk_boxes
+                ):
+                    self.assertIs(async_chunk, chunk)
+                    self.assertEqual(async_box, box)
+            finally:
+                level.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
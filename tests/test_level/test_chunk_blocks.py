@@ -0,0 +1,243 @@
+import unittest
+import copy
+import pickle
+
+import numpy
+
+from amulet import load_level
+from amulet.api.chunk import Blocks, Chunk
+from amulet.api.chunk.blocks import (
+    uniform_sub_chunk,
+    is_uniform_sub_chunk,
+    remap_sub_chunk,
+)
+from amulet.api.registry import BlockManager
+from amulet.api.registry.biome_manager import BiomeManager
+from data.util import WorldTemp
+
+
+def block_lut(level) -> numpy.ndarray:
+    lut = numpy.empty(len(level.block_palette), dtype=object)
+    lut[:] = level.block_palette.blocks
+    return lut
+
+
+class ChunkBlocksTestCase(unittest.TestCase):
+    def test_compact_dtype(self):
+        blocks = Blocks()
+        for max_value, dtype in (
+            (0, numpy.uint8),
+            (255, numpy.uint8),
+            (256, numpy.uint16),
+            (65535, numpy.uint16),
+            (65536, numpy.uint32),
+        ):
+            with self.subTest(max_value=max_value):
+                arr = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+                arr[1, 2, 3] = max_value
+                blocks.add_sub_chunk(0, arr)
+                self.assertEqual(dtype, blocks.get_compact_sub_chunk(0).dtype)
+                self.assertEqual(max_value, blocks[1, 2, 3])
+                numpy.testing.assert_array_equal(arr, numpy.asarray(blocks[:, 0:16, :]))
+                self.assertEqual(numpy.uint32, numpy.asarray(blocks[:, 0:16, :]).dtype)
+
+        # signed arrays are stored the same as they were cast to uint32
+        blocks.add_sub_chunk(0, numpy.full((16, 16, 16), -1, dtype=numpy.int64))
+        self.assertEqual(2**32 - 1, blocks[0, 0, 0])
+
+        # new sections are compact
+        blocks.get_compact_sub_chunk(1)
+        self.assertEqual(numpy.uint8, blocks.get_compact_sub_chunk(1).dtype)
+        self.assertEqual(numpy.uint32, blocks.dtype)
+
+        # copies stay compact
+        self.assertEqual(numpy.uint8, Blocks(blocks).get_compact_sub_chunk(1).dtype)
+
+    def test_get_sub_chunk(self):
+        blocks = Blocks({0: numpy.ones((16, 16, 16), dtype=numpy.uint32)})
+        self.assertEqual(numpy.uint8, blocks.get_compact_sub_chunk(0).dtype)
+        # The returned array can store any value so it must be uint32
+        sub_chunk = blocks.get_sub_chunk(0)
+        self.assertEqual(numpy.uint32, sub_chunk.dtype)
+        sub_chunk[0, 0, 0] = 100_000
+        self.assertEqual(100_000, blocks[0, 0, 0])
+        self.assertEqual(1, blocks[0, 1, 0])
+        self.assertEqual(numpy.uint32, blocks.get_sub_chunk(5).dtype)
+
+        # Reading through get_section does not store the uint32 array
+        blocks.add_sub_chunk(1, numpy.arange(16**3).reshape((16, 16, 16)) % 200)
+        self.assertEqual(numpy.uint32, blocks.get_section(1).dtype)
+        self.assertEqual(numpy.uint8, blocks.get_compact_sub_chunk(1).dtype)
+
+    def test_get_writable_sub_chunk(self):
+        blocks = Blocks()
+        # Small values keep the array compact
+        sub_chunk = blocks.get_writable_sub_chunk(0, 5)
+        self.assertEqual(numpy.uint8, sub_chunk.dtype)
+        self.assertTrue(sub_chunk.flags.writeable)
+        sub_chunk[0, 0, 0] = 5
+        self.assertEqual(5, blocks[0, 0, 0])
+        self.assertEqual(0, blocks[0, 1, 0])
+        # Larger values promote the array
+        sub_chunk = blocks.get_writable_sub_chunk(0, numpy.array([1, 1000]))
+        self.assertEqual(numpy.uint16, sub_chunk.dtype)
+        sub_chunk[0, 1, 0] = 1000
+        self.assertEqual(1000, blocks[0, 1, 0])
+        self.assertEqual(5, blocks[0, 0, 0])
+
+    def test_promotion(self):
+        blocks = Blocks()
+        blocks[0, 0, 0] = 1
+        self.assertEqual(numpy.uint8, blocks.get_compact_sub_chunk(0).dtype)
+        blocks[0, 1, 0] = 300
+        self.assertEqual(numpy.uint16, blocks.get_compact_sub_chunk(0).dtype)
+        self.assertEqual((1, 300), (blocks[0, 0, 0], blocks[0, 1, 0]))
+
+        # slices
+        blocks[:, 16:20, :] = 70_000
+        self.assertEqual(numpy.uint32, blocks.get_compact_sub_chunk(1).dtype)
+        self.assertEqual(70_000, blocks[5, 19, 5])
+        self.assertEqual(0, blocks[5, 20, 5])
+
+        # arrays
+        arr = numpy.arange(16 * 4 * 16, dtype=numpy.uint32).reshape((16, 4, 16))
+        blocks[:, 30:34, :] = arr
+        self.assertEqual(numpy.uint16, blocks.get_compact_sub_chunk(2).dtype)
+        numpy.testing.assert_array_equal(arr, numpy.asarray(blocks[:, 30:34, :]))
+
+        # bool masks
+        view = blocks[:, 48:64, :]
+        mask = numpy.zeros((16, 16, 16), dtype=bool)
+        mask[0, 0, 0] = mask[1, 1, 1] = True
+        view[mask] = 1000
+        self.assertEqual(numpy.uint16, blocks.get_compact_sub_chunk(3).dtype)
+        view[mask] = numpy.array([5, 100_000])
+        self.assertEqual(numpy.uint32, blocks.get_compact_sub_chunk(3).dtype)
+        self.assertEqual((5, 100_000), (blocks[0, 48, 0], blocks[1, 49, 1]))
+        self.assertEqual(numpy.uint32, view[mask].dtype)
+
+    def test_pickle(self):
+        chunk = Chunk(0, 0)
+        chunk.blocks.add_sub_chunk(0, numpy.full((16, 16, 16), 7, dtype=numpy.uint32))
+        chunk.blocks[0, 16, 0] = 1000
+        chunk2 = Chunk.unpickle(chunk.pickle(), BlockManager(), BiomeManager())
+        self.assertEqual(numpy.uint8, chunk2.blocks.get_compact_sub_chunk(0).dtype)
+        self.assertEqual(numpy.uint16, chunk2.blocks.get_compact_sub_chunk(1).dtype)
+        self.assertEqual((7, 1000), (chunk2.blocks[0, 0, 0], chunk2.blocks[0, 16, 0]))
+
+        # promoted sections are compacted again when unpickled
+        chunk.blocks.get_sub_chunk(1)
+        self.assertEqual(numpy.uint32, chunk.blocks.get_compact_sub_chunk(1).dtype)
+        chunk2 = Chunk.unpickle(chunk.pickle(), BlockManager(), BiomeManager())
+        self.assertEqual(numpy.uint16, chunk2.blocks.get_compact_sub_chunk(1).dtype)
+
+    def test_uniform(self):
+        blocks = Blocks({0: numpy.full((16, 16, 16), 300, dtype=numpy.uint32)})
+        sub_chunk = blocks.get_compact_sub_chunk(0)
+        self.assertTrue(is_uniform_sub_chunk(sub_chunk))
+        self.assertFalse(sub_chunk.flags.writeable)
+        self.assertEqual(numpy.uint16, sub_chunk.dtype)
+        self.assertEqual(300, blocks[5, 5, 5])
+        # new sections are uniform
+        self.assertTrue(is_uniform_sub_chunk(blocks.get_compact_sub_chunk(1)))
+        self.assertEqual(0, blocks[0, 16, 0])
+
+        # remapping and copying keeps the sections uniform
+        lut = numpy.arange(400, dtype=numpy.uint32)[::-1]
+        remapped = remap_sub_chunk(lut, sub_chunk)
+        self.assertTrue(is_uniform_sub_chunk(remapped))
+        self.assertEqual(99, remapped[0, 0, 0])
+        for blocks_copy in (Blocks(blocks), copy.deepcopy(blocks)):
+            self.assertTrue(is_uniform_sub_chunk(blocks_copy.get_compact_sub_chunk(0)))
+        self.assertFalse(
+            is_uniform_sub_chunk(
+                Blocks(
+                    {0: numpy.arange(16**3).reshape((16, 16, 16))}
+                ).get_compact_sub_chunk(0)
+            )
+        )
+
+        # writing creates the full array
+        blocks[0, 0, 0] = 1
+        sub_chunk = blocks.get_compact_sub_chunk(0)
+        self.assertFalse(is_uniform_sub_chunk(sub_chunk))
+        self.assertTrue(sub_chunk.flags.writeable)
+        self.assertEqual((1, 300), (blocks[0, 0, 0], blocks[0, 1, 0]))
+        blocks[:, 16:20, :] = 5
+        self.assertEqual((5, 0), (blocks[0, 16, 0], blocks[0, 20, 0]))
+
+        blocks.add_sub_chunk(2, uniform_sub_chunk(7))
+        sub_chunk = blocks.get_sub_chunk(2)
+        self.assertEqual(numpy.uint32, sub_chunk.dtype)
+        sub_chunk[0, 0, 0] = 8
+        self.assertEqual((8, 7), (blocks[0, 32, 0], blocks[0, 33, 0]))
+
+    def test_uniform_pickle(self):
+        chunk = Chunk(0, 0)
+        chunk.blocks.add_sub_chunk(0, uniform_sub_chunk(70_000))
+        pickled = chunk.pickle()
+        self.assertLess(len(pickled), 1000)
+        chunk2 = Chunk.unpickle(pickled, BlockManager(), BiomeManager())
+        self.assertTrue(is_uniform_sub_chunk(chunk2.blocks.get_compact_sub_chunk(0)))
+        self.assertEqual(70_000, chunk2.blocks[0, 0, 0])
+        self.assertLess(len(pickle.dumps(copy.deepcopy(chunk))), 1000)
+
+    def test_level_uniform(self):
+        with WorldTemp("java/vanilla/1_18/vanilla") as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                dimension = level.dimensions[0]
+                coords = sorted(level.all_chunk_coords(dimension))[:20]
+                original = {}
+                uniform_count = 0
+                for cx, cz in coords:
+                    chunk = level.get_chunk(cx, cz, dimension)
+                    original[(cx, cz)] = sub_chunks = {}
+                    for cy in chunk.blocks.sub_chunks:
+                        sub_chunk = chunk.blocks.get_compact_sub_chunk(cy)
+                        uniform_count += is_uniform_sub_chunk(sub_chunk)
+                        sub_chunks[cy] = block_lut(level)[sub_chunk]
+                    chunk.changed = True
+                self.assertGreater(uniform_count, 0)
+                level.save()
+            finally:
+                level.close()
+
+            level = load_level(world_temp.temp_path)
+            try:
+                for (cx, cz), sub_chunks in original.items():
+                    blocks = level.get_chunk(cx, cz, dimension).blocks
+                    for cy, sub_chunk in sub_chunks.items():
+                        if (sub_chunk == sub_chunk[0, 0, 0]).all():
+                            # uniform sections are still uniform after saving and loading
+                            self.assertTrue(
+                                is_uniform_sub_chunk(blocks.get_compact_sub_chunk(cy))
+                            )
+                        numpy.testing.assert_array_equal(
+                            sub_chunk,
+                            block_lut(level)[blocks.get_compact_sub_chunk(cy)],
+                        )
+            finally:
+                level.close()
+
+    def test_level_memory(self):
+        with WorldTemp("bedrock/vanilla/1_18/vanilla") as world_temp:
+            level = load_level(world_temp.temp_path)
+            try:
+                dimension = level.dimensions[0]
+                section_count = 0
+                nbytes = 0
+                for cx, cz in sorted(level.all_chunk_coords(dimension))[:100]:
+                    blocks = level.get_chunk(cx, cz, dimension).blocks
+                    for cy in blocks.sub_chunks:
+                        section_count += 1
+                        nbytes += blocks.get_compact_sub_chunk(cy).nbytes
+                uint32_nbytes = section_count * 16**3 * 4
+                self.assertGreater(section_count, 0)
+                self.assertLessEqual(nbytes * 2, uint32_nbytes)
+            finally:
+                level.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
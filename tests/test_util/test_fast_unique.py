@@ -0,0 +1,51 @@
+import unittest
+
+import numpy
+
+from amulet.utils.world_utils import fast_unique
+
+
+class FastUniqueTestCase(unittest.TestCase):
+    def _check(self, arr: numpy.ndarray):
+        unique, inverse = fast_unique(arr)
+        expected_unique, expected_inverse = numpy.unique(arr, return_inverse=True)
+        self.assertEqual(expected_unique.dtype, unique.dtype)
+        numpy.testing.assert_array_equal(expected_unique, unique)
+        self.assertEqual(numpy.uint32, inverse.dtype)
+        self.assertEqual(arr.shape, inverse.shape)
+        numpy.testing.assert_array_equal(expected_inverse, inverse.ravel())
+
+    def test_lookup(self):
+        for dtype in (
+            numpy.uint8,
+            numpy.int8,
+            numpy.uint16,
+            numpy.uint32,
+            numpy.int32,
+            numpy.uint64,
+            numpy.int64,
+        ):
+            info = numpy.iinfo(dtype)
+            for value_range in (1, 16, 300, 4000):
+                with self.subTest(dtype=dtype, value_range=value_range):
+                    low = max(info.min, -value_range // 2)
+                    high = min(info.max, low + value_range)
+                    self._check(
+                        numpy.random.randint(low, high + 1, (16, 16, 16)).astype(dtype)
+                    )
+
+    def test_sort_fallback(self):
+        # large value ranges
+        self._check(numpy.random.randint(0, 2**32, (16, 16, 16), dtype=numpy.uint32))
+        self._check(numpy.array([2**64 - 1, 0, 2**64 - 1], dtype=numpy.uint64))
+        self._check(numpy.array([-(2**63), 2**63 - 1], dtype=numpy.int64))
+        # other types
+        self._check(numpy.array([1.5, 0.5, 1.5]))
+        self._check(numpy.array(["b", "a", "b"], dtype=object))
+
+    def test_empty(self):
+        self._check(numpy.zeros((0, 16), dtype=numpy.uint32))
+
+
+if __name__ == "__main__":
+    unittest.main()
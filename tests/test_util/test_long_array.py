@@ -62,6 +62,46 @@ class LongArrayTestCase(unittest.TestCase):
                             f"Long array does not equal. Dense: {dense}, bits per entry: {bits_per_entry}, size: {size}",
                         )
 
+    def test_bit_layout(self):
+        """Check the packed longs against the format described in world_utils for all bits per entry."""
+        size = 100
+        for bits_per_entry in range(1, 65):
+            arr = numpy.random.randint(0, 2**64, size, dtype=numpy.uint64) >> (
+                64 - bits_per_entry
+            )
+            values = [int(v) for v in arr]
+
+            # The dense format is one bit stream starting from the low bits of the first long.
+            stream = sum(v << (i * bits_per_entry) for i, v in enumerate(values))
+            dense = [
+                (stream >> (64 * i)) & (2**64 - 1)
+                for i in range(-(-size * bits_per_entry // 64))
+            ]
+            # The sparse format packs as many entries into each long as will fit.
+            entry_per_long = 64 // bits_per_entry
+            sparse = [
+                sum(
+                    v << (j * bits_per_entry)
+                    for j, v in enumerate(values[i : i + entry_per_long])
+                )
+                for i in range(0, size, entry_per_long)
+            ]
+
+            for is_dense, longs in ((True, dense), (False, sparse)):
+                expected = numpy.array(longs, dtype=numpy.uint64).astype(numpy.int64)
+                packed = encode_long_array(arr, bits_per_entry, is_dense)
+                self.assertEqual(numpy.dtype(">q"), packed.dtype)
+                numpy.testing.assert_array_equal(
+                    expected,
+                    packed,
+                    f"Dense: {is_dense}, bits per entry: {bits_per_entry}",
+                )
+                numpy.testing.assert_array_equal(
+                    arr,
+                    decode_long_array(expected, size, bits_per_entry, is_dense),
+                    f"Dense: {is_dense}, bits per entry: {bits_per_entry}",
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
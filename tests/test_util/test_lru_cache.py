@@ -0,0 +1,52 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from amulet.utils.lru_cache import LRUCache, LRUCacheInfo
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # setting an existing key makes it the most recently used
+        cache.set("a", 3)
+        cache.set("c", 4)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(3, cache.get("a"))
+        self.assertEqual(4, cache.get("c"))
+        self.assertEqual(LRUCacheInfo(2, 1, 2, 2), cache.cache_info())
+
+        cache.invalidate("a")
+        cache.invalidate("d")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(1, cache.cache_info().current_size)
+
+        cache.max_size = 0
+        cache.set("a", 1)
+        self.assertEqual(0, cache.cache_info().current_size)
+        with self.assertRaises(ValueError):
+            cache.max_size = -1
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+        cache.clear()
+        self.assertEqual(LRUCacheInfo(0, 0, 0, 0), cache.cache_info())
+
+    def test_threaded(self):
+        cache = LRUCache(16)
+
+        def use(i: int):
+            for j in range(1000):
+                key = (i * j) % 32
+                if cache.get(key) is None:
+                    cache.set(key, key)
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(use, range(8)))
+        info = cache.cache_info()
+        self.assertEqual(8000, info.hits + info.misses)
+        self.assertLessEqual(info.current_size, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()